@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the canvas hot paths against the recording Tk stub in
+benchmarks/tk_stub, so that no display is needed.
+
+Each scenario reports the Tcl calls it makes (itemconfigure, coords,
+create_*, put, ...) and its wall time. The results are compared with a
+stored baseline: a scenario regresses if it makes more calls of any kind,
+or takes longer than the baseline time multiplied by the tolerance (plus a
+few milliseconds of slack for the shortest scenarios).
+
+Usage: python benchmarks/canvas_hot_paths.py [--update-baseline]
+    [--tolerance FACTOR] [--slack MS] [--baseline PATH] [--repeat N]
+Exit status: 1 if any scenario regresses, otherwise 0.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from time import perf_counter
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_DIRECTORY, 'tk_stub'))
+sys.path.insert(1, os.path.join(_DIRECTORY, '..', 'src'))
+
+import tkinter
+
+from py_fumen_py import Field, Flags, Mino, Operation, Page, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.config import _canvas_config
+from Better_Than_Fumen.fumen_canvas._field_canvas_frame import (
+    _FieldCanvasFrame
+)
+from Better_Than_Fumen.fumen_canvas._mino_picker_frame import (
+    _MinoPickerFrame
+)
+from Better_Than_Fumen.fumen_canvas.fumen_canvas_frame import (
+    FumenCanvasFrame
+)
+from Better_Than_Fumen.page_store import PageStore
+
+BASELINE = os.path.join(_DIRECTORY, 'canvas_hot_paths_baseline.json')
+
+class _Event:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+def random_field(rng, height=Consts.HEIGHT // 2):
+    field = Field()
+    for y in range(-Consts.GARBAGE_HEIGHT, height):
+        for x in range(Consts.WIDTH):
+            field.fill(x, y, Mino(rng.randrange(len(Mino))))
+    return field
+
+def random_pages(rng, count):
+    return [Page(field=random_field(rng, rng.randrange(1, 8)),
+                 operation=None, flags=Flags(), comment=None)
+            for i in range(count)]
+
+def cell_event(frame, x, y):
+    """Return an event at the center of the field cell (x, y)."""
+    size = frame._mino_size
+    return _Event(x=x*size + size//2,
+                  y=(Consts.TOTAL_HEIGHT-2-y)*size + size//2)
+
+def full_repaint(root, rng, repeat):
+    frame = _FieldCanvasFrame(root, _canvas_config.MINO_SIZE)
+    fields = [random_field(rng) for i in range(repeat)]
+    yield
+    for field in fields:
+        frame.replace_field(field)
+        frame.repaint(diff=False)
+        tkinter.update()
+
+def full_repaint_image(root, rng, repeat):
+    _canvas_config.RENDER_BACKEND = 'image'
+    try:
+        yield from full_repaint(root, rng, repeat)
+    finally:
+        _canvas_config.RENDER_BACKEND = 'item'
+
+def page_switch(root, rng, repeat):
+    frame = FumenCanvasFrame(root)
+    frame._pages = PageStore(random_pages(rng, repeat))
+    frame._to_page(0)
+    tkinter.update()
+    yield
+    for i in range(repeat - 1):
+        frame._next_page()
+        tkinter.update()
+    for i in range(repeat - 1):
+        frame._prev_page()
+        tkinter.update()
+
+def drag_stroke(root, rng, repeat):
+    frame = _FieldCanvasFrame(root, _canvas_config.MINO_SIZE)
+    frame._mode.mino = Mino.S
+    frame._mode.direct_place = False
+    frame._mode.placement = Operation(Mino.T, Rotation.SPAWN, 4, 18)
+    frame.repaint()
+    tkinter.update()
+    strokes = [[(rng.randrange(Consts.WIDTH), rng.randrange(12))
+                for j in range(20)] for i in range(repeat)]
+    yield
+    for stroke in strokes:
+        frame._on_draw(cell_event(frame, *stroke[0]))
+        for x, y in stroke[1:]:
+            frame._on_draw_motion(cell_event(frame, x, y))
+            if rng.random() < 0.25:
+                tkinter.update()
+        frame._on_draw_reset(None)
+        tkinter.update()
+    frame._mode.placement = None
+
+def ghost_update(root, rng, repeat):
+    frame = _FieldCanvasFrame(root, _canvas_config.MINO_SIZE)
+    frame.replace_field(random_field(rng, 6))
+    frame._mode.mino = Mino.T
+    frame._mode.rotation = Rotation.SPAWN
+    frame._mode.direct_place = True
+    frame.repaint()
+    tkinter.update()
+    cells = [(rng.randrange(1, Consts.WIDTH-1), rng.randrange(10, 18))
+             for i in range(repeat)]
+    yield
+    for x, y in cells:
+        frame._on_draw(cell_event(frame, x, y))
+        frame._on_draw_reset(None)
+        tkinter.update()
+    frame._mode.placement = None
+    frame._mode.direct_place = False
+
+def picker_scroll(root, rng, repeat):
+    frame = _MinoPickerFrame(root, _canvas_config.MINO_SIZE)
+    frame.repaint()
+    yield
+    for i in range(repeat):
+        frame._mode.mino = frame._mode.mino.shifted(1)
+        frame._mode.rotation = frame._mode.rotation.shifted(1)
+        frame.repaint()
+        tkinter.update()
+
+def resize(root, rng, repeat):
+    frame = FumenCanvasFrame(root)
+    tkinter.update()
+    yield
+    for i in range(repeat):
+        for width in range(600, 900, 10):
+            frame._on_resize(_Event(width=width + i, height=width*2))
+        tkinter.update()
+
+def export(root, rng, repeat):
+    frame = FumenCanvasFrame(root)
+    frame._pages = PageStore(random_pages(rng, repeat * 20))
+    frame._to_page(0)
+    tkinter.update()
+    yield
+
+    def export_and_wait():
+        # Export to the clipboard, and poll until the worker is done.
+        frame._export()
+        tkinter.update()
+        assert frame._encoder is None
+
+    export_and_wait()
+    for i in range(repeat):
+        frame._field_frame._fill(i % Consts.WIDTH, 0, Mino.I)
+        export_and_wait()
+
+SCENARIOS = {
+    'full_repaint': full_repaint,
+    'full_repaint_image': full_repaint_image,
+    'page_switch': page_switch,
+    'drag_stroke': drag_stroke,
+    'ghost_update': ghost_update,
+    'picker_scroll': picker_scroll,
+    'resize': resize,
+    'export': export,
+}
+
+def run_scenario(scenario, repeat):
+    """Run a scenario with a fresh root and seed. Only the part after its
+    setup (the first yield) is recorded.
+    Return (the Tcl call counts, the time spent in them, the wall time).
+    """
+    tkinter.reset()
+    root = tkinter.Tk()
+    steps = scenario(root, random.Random(0), repeat)
+    next(steps)
+    tkinter.RECORDER.reset()
+    start = perf_counter()
+    for step in steps:
+        pass
+    elapsed = perf_counter() - start
+    calls, tcl_seconds = tkinter.RECORDER.snapshot()
+    return calls, tcl_seconds, elapsed
+
+def compare(name, result, baseline, tolerance, slack):
+    """Return the regressions of a result against its baseline."""
+    if baseline is None:
+        return []
+    regressions = []
+    for call, number in sorted(result['calls'].items()):
+        expected = baseline['calls'].get(call, 0)
+        if number > expected:
+            regressions.append(f'{name}: {number} {call} calls '
+                               f'(baseline: {expected})')
+    if result['seconds'] > baseline['seconds']*tolerance + slack:
+        regressions.append(f'{name}: {result["seconds"]*1000:.1f} ms '
+                           f'(baseline: {baseline["seconds"]*1000:.1f} ms)')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='allowed wall time factor (default: 1.5)')
+    parser.add_argument('--slack', type=float, default=5,
+                        help='allowed extra wall time in ms (default: 5)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as file:
+            baselines = json.load(file)
+
+    results = {}
+    regressions = []
+    print(f'{"scenario":<20}{"wall ms":>10}{"tcl ms":>9}{"calls":>8}'
+          '  by kind')
+    for name, scenario in SCENARIOS.items():
+        calls, tcl_seconds, seconds = run_scenario(scenario, args.repeat)
+        results[name] = {'calls': calls, 'seconds': round(seconds, 4)}
+        kinds = ', '.join(f'{call} {number}'
+                          for call, number in sorted(calls.items()))
+        print(f'{name:<20}{seconds*1000:>10.1f}{tcl_seconds*1000:>9.1f}'
+              f'{sum(calls.values()):>8}  {kinds}')
+        regressions += compare(name, results[name], baselines.get(name),
+                               args.tolerance, args.slack/1000)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f'Baseline written to {args.baseline}')
+    elif regressions:
+        print('Regressions:', *regressions, sep='\n  ')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Time the searches of the PageIndex of a long fumen: pages containing a
+row pattern, and pages whose field equals a given one. The results are
+checked against a linear scan of the pages, and after random page
+insertions, deletions and updates, against a freshly built index.
+
+Usage: python benchmarks/page_index_search.py [pages]
+Exit status: 1 if any result differs, otherwise 0.
+"""
+
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from py_fumen_py import Field, Flags, Mino, Page
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.page_index import occupancy_rows, PageIndex
+from Better_Than_Fumen.page_store import pack_field, PageRecord, PageStore
+
+def random_field(rng):
+    field = Field()
+    for y in range(rng.randrange(1, 8)):
+        hole = rng.randrange(Consts.WIDTH)
+        for x in range(Consts.WIDTH):
+            if x != hole and rng.random() < 0.9:
+                field.fill(x, y, Mino(rng.randrange(1, len(Mino))))
+    return field
+
+def scan(store, pattern):
+    """Return the page indices containing the pattern, by a linear scan."""
+    length = len(pattern)
+    return [i for i, record in enumerate(store.records())
+            if any(rows[j:j+length] == pattern
+                   for rows in [occupancy_rows(record.cells)]
+                   for j in range(len(rows) - length + 1))]
+
+def timed(function, repeat=100):
+    start = perf_counter()
+    for i in range(repeat):
+        result = function()
+    return result, (perf_counter() - start) / repeat
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    store = PageStore(Page(field=random_field(rng), flags=Flags())
+                      for i in range(count))
+    start = perf_counter()
+    index = store.index()
+    print(f'{count} pages indexed in {(perf_counter()-start)*1000:.0f} ms')
+
+    failed = False
+    records = store.records()
+    for i in range(5):
+        rows = occupancy_rows(rng.choice(records).cells)
+        top = rng.randrange(Consts.TOTAL_HEIGHT - 3)
+        pattern = rows[top:top+rng.randrange(1, 4)]
+        if not any(pattern):
+            continue
+        matches, seconds = timed(
+            lambda: store.positions(index.containing(pattern)))
+        expected = scan(store, pattern)
+        failed |= matches != expected
+        print(f'pattern of {len(pattern)} lines: {len(matches)} pages '
+              f'in {seconds*1000:.3f} ms'
+              + ('' if matches == expected else ' (MISMATCH)'))
+
+    cells = rng.choice(records).cells
+    matches, seconds = timed(
+        lambda: store.positions(index.same_field(cells)))
+    expected = [i for i, record in enumerate(store.records())
+                if record.cells == cells]
+    failed |= matches != expected
+    print(f'same field: {len(matches)} pages in {seconds*1000:.3f} ms'
+          + ('' if matches == expected else ' (MISMATCH)'))
+
+    for i in range(1000):
+        operation = rng.randrange(3)
+        page = rng.randrange(len(store))
+        if operation == 0:
+            store.insert_record(page, PageRecord(
+                pack_field(random_field(rng))))
+        elif operation == 1 and len(store) > 1:
+            del store[page]
+        else:
+            store.update(page, cells=pack_field(random_field(rng)))
+    fresh = PageIndex(store.records())
+    pattern = occupancy_rows(store.record(0).cells)[-3:]
+    consistent = (index.containing(pattern) == fresh.containing(pattern)
+                  and len(index) == len(fresh) == len(store))
+    failed |= not consistent
+    print('incremental index ' + ('matches' if consistent else 'DIFFERS')
+          + ' a fresh index after 1000 page operations')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Measure the memory per page of a long fumen, kept as a list of Page
+objects (as FumenCanvasFrame used to) and as a PageStore, with all fields
+distinct and with each field repeated on 4 pages (as pages without a
+placement, or copied pages, are), and report the distinct fields of the
+PageStore.
+
+Usage: python benchmarks/page_store_memory.py [pages]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from py_fumen_py import Field, Flags, Mino, Operation, Page, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.page_store import PageStore
+
+def random_pages(count, repeat=1, seed=0):
+    """Yield count pages, changing the field every repeat pages."""
+    rng = random.Random(seed)
+    field = Field()
+    for i in range(count):
+        if i % repeat == 0:
+            for j in range(4):
+                field.fill(rng.randrange(Consts.WIDTH), rng.randrange(8),
+                           Mino(rng.randrange(1, len(Mino))))
+        yield Page(field=field.copy(),
+                   operation=Operation(Mino.T, Rotation.SPAWN, 4, 20),
+                   flags=Flags(), comment=None)
+
+def measure(build, count, repeat):
+    tracemalloc.start()
+    pages = build(random_pages(count, repeat))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return pages, size / count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f'{count} pages')
+    for repeat in [1, 4]:
+        before = measure(list, count, repeat)[1]
+        store, after = measure(PageStore, count, repeat)
+        print(f'each field on {repeat} page(s):')
+        print(f'  list of Page: {before:8.0f} bytes per page')
+        print(f'  PageStore:    {after:8.0f} bytes per page')
+        print(f'  {store.memory_report()}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Check the placeability and drop of FieldBitboard against py_fumen_py's
+Field on a full sweep of the operations (every mino, rotation and position,
+including the positions outside the field) on random fields, then time
+both implementations.
+
+Usage: python benchmarks/placement_checks.py [fields]
+Exit status: 1 if any result differs, otherwise 0.
+"""
+
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from py_fumen_py import Field, Mino, Operation, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.bitboard import FieldBitboard, shape_cells
+
+def random_field(rng, density):
+    """Return a field filled with the density at the bottom, decreasing to
+    0 at the top.
+    """
+    field = Field()
+    for y in range(-Consts.GARBAGE_HEIGHT, Consts.HEIGHT):
+        for x in range(Consts.WIDTH):
+            if rng.random() < density * (1 - y/Consts.HEIGHT):
+                field.fill(x, y, Mino(rng.randrange(1, len(Mino))))
+    return field
+
+def sweep():
+    """Yield every operation, including those partly outside the field."""
+    for mino in Mino:
+        for rotation in Rotation:
+            for x in range(-3, Consts.WIDTH+3):
+                for y in range(-4, Consts.HEIGHT+4):
+                    yield Operation(mino, rotation, x, y)
+
+def dropped(drop, operation):
+    try:
+        return drop(operation)
+    except ValueError:
+        return None
+
+def check(field):
+    """Return the operations whose results differ on a field."""
+    bitboard = FieldBitboard(field)
+    errors = []
+    for operation in sweep():
+        if (shape_cells(operation) != [tuple(cell)
+                                       for cell in operation.shape()]
+                or bitboard.is_placeable(operation)
+                    != field.is_placeable(operation)
+                or dropped(bitboard.drop, operation)
+                    != dropped(lambda op: field.drop(op, False), operation)):
+            errors.append(operation)
+    return errors
+
+def timed(function, operations):
+    start = perf_counter()
+    for operation in operations:
+        function(operation)
+    return (perf_counter() - start) / len(operations)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    rng = random.Random(0)
+    fields = [random_field(rng, i/count) for i in range(count)]
+    checked = 0
+    errors = []
+    for field in fields:
+        errors += check(field)
+        checked += len(list(sweep()))
+    print(f'{checked} operations checked, {len(errors)} mismatches')
+    for operation in errors[:10]:
+        print(f'  {operation}')
+
+    field = fields[count//2]
+    bitboard = FieldBitboard(field)
+    operations = [operation for operation in sweep()
+                  if field.is_placeable(operation)]
+    for name, function in [
+            ('Field.is_placeable', field.is_placeable),
+            ('FieldBitboard.is_placeable', bitboard.is_placeable),
+            ('Field.drop', lambda op: field.drop(op, False)),
+            ('FieldBitboard.drop', bitboard.drop),
+            ('Operation.shape', Operation.shape),
+            ('shape_cells', shape_cells)]:
+        print(f'{name:<28}{timed(function, operations)*1e6:8.2f} us')
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
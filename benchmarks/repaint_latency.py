@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Measure the full-repaint latency of the field canvas for each render
+backend (CanvasConfig.RENDER_BACKEND). A display is required.
+
+Usage: python benchmarks/repaint_latency.py [repeat]
+"""
+
+import os
+import random
+import sys
+from time import perf_counter
+from tkinter import Tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from py_fumen_py import Field, Mino
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.config import _canvas_config
+from Better_Than_Fumen.fumen_canvas._field_canvas_frame import (
+    _FieldCanvasFrame
+)
+
+def random_field(seed):
+    rng = random.Random(seed)
+    field = Field()
+    for y in range(-Consts.GARBAGE_HEIGHT, Consts.HEIGHT // 2):
+        for x in range(Consts.WIDTH):
+            field.fill(x, y, Mino(rng.randrange(len(Mino))))
+    return field
+
+def measure(root, backend, repeat):
+    _canvas_config.RENDER_BACKEND = backend
+    frame = _FieldCanvasFrame(root, _canvas_config.MINO_SIZE)
+    frame.grid()
+    root.update()
+    fields = [random_field(seed) for seed in range(repeat)]
+
+    start = perf_counter()
+    for field in fields:
+        frame.replace_field(field)
+        frame.repaint(diff=False)
+        root.update_idletasks()
+    elapsed = perf_counter() - start
+
+    frame.destroy()
+    return elapsed / repeat
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    root = Tk()
+    for backend in ['item', 'image']:
+        latency = measure(root, backend, repeat)
+        print(f'{backend:>5}: {latency*1000:8.3f} ms per full repaint')
+    root.destroy()
+
+if __name__ == '__main__':
+    main()
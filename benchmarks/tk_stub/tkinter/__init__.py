@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""A recording stand-in for tkinter, so that the benchmarks run without a
+display. Put benchmarks/tk_stub first on sys.path to shadow tkinter.
+
+Widgets accept any option and geometry call. The Canvas and PhotoImage
+calls that reach Tcl in the real toolkit (itemconfigure, coords, create_*,
+put, ...) are counted and timed in RECORDER. after() and after_idle()
+callbacks are queued and run by update(), timers without their delay.
+"""
+
+from collections import Counter
+from functools import wraps
+from itertools import count
+from time import perf_counter, sleep
+
+N, S, E, W = 'n', 's', 'e', 'w'
+NW, NE, SW, SE, CENTER = 'nw', 'ne', 'sw', 'se', 'center'
+BOTH, X, Y = 'both', 'x', 'y'
+YES, NO = True, False
+LEFT, RIGHT, TOP, BOTTOM = 'left', 'right', 'top', 'bottom'
+HORIZONTAL, VERTICAL = 'horizontal', 'vertical'
+END = 'end'
+
+class TclError(Exception):
+    pass
+
+class Recorder:
+    """Count and time the recorded calls by name."""
+    def __init__(self):
+        self.calls = Counter()
+        self.seconds = Counter()
+
+    def reset(self):
+        self.calls.clear()
+        self.seconds.clear()
+
+    def snapshot(self):
+        """Return the call counts and the total time spent in the calls."""
+        return dict(self.calls), sum(self.seconds.values())
+
+RECORDER = Recorder()
+
+def _recorded(name=None):
+    # Decorate a stub method, so that its calls are counted and timed.
+    def decorator(method):
+        key = name or method.__name__
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                RECORDER.calls[key] += 1
+                RECORDER.seconds[key] += perf_counter() - start
+        return wrapper
+    return decorator
+
+_job_ids = count(1)
+_idle_jobs = {}
+_timer_jobs = {}
+_clipboard = []
+
+def update():
+    """Run the queued idle and timer callbacks, including those queued
+    while running, until none is left.
+    """
+    while _idle_jobs or _timer_jobs:
+        if not _idle_jobs:
+            # Let the worker threads polled by the timers run, as the delay
+            # of the timers would.
+            sleep(0)
+        jobs = _idle_jobs if _idle_jobs else _timer_jobs
+        job = next(iter(jobs))
+        func, args = jobs.pop(job)
+        func(*args)
+
+def reset():
+    """Drop the queued callbacks and the recorded calls."""
+    _idle_jobs.clear()
+    _timer_jobs.clear()
+    _clipboard.clear()
+    RECORDER.reset()
+
+class Misc:
+    def __init__(self, master=None, cnf=None, **kwargs):
+        self.master = master
+        self._options = dict(cnf or {}, **kwargs)
+        self._bindings = {}
+
+    def __getattr__(self, name):
+        # Geometry management, focus and the like are no-ops.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: None
+
+    def configure(self, cnf=None, **kwargs):
+        self._options.update(cnf or {}, **kwargs)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key)
+
+    __getitem__ = cget
+
+    def bind(self, sequence=None, func=None, add=None):
+        self._bindings[sequence] = func
+
+    bind_all = bind
+
+    def after(self, ms, func=None, *args):
+        if func is None:
+            return None
+        job = f'after#{next(_job_ids)}'
+        _timer_jobs[job] = (func, args)
+        return job
+
+    def after_idle(self, func, *args):
+        job = f'after#{next(_job_ids)}'
+        _idle_jobs[job] = (func, args)
+        return job
+
+    def after_cancel(self, job):
+        _idle_jobs.pop(job, None)
+        _timer_jobs.pop(job, None)
+
+    def update(self):
+        update()
+
+    update_idletasks = update
+
+    def winfo_width(self):
+        return self._options.get('width', 1)
+
+    def winfo_height(self):
+        return self._options.get('height', 1)
+
+    winfo_reqwidth = winfo_width
+    winfo_reqheight = winfo_height
+
+    def winfo_rgb(self, color):
+        return (0, 0, 0)
+
+    def clipboard_get(self):
+        if not _clipboard:
+            raise TclError('CLIPBOARD selection doesn\'t exist')
+        return ''.join(_clipboard)
+
+    def clipboard_clear(self):
+        _clipboard.clear()
+
+    def clipboard_append(self, string):
+        _clipboard.append(string)
+
+class Tk(Misc):
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+
+class Toplevel(Misc):
+    pass
+
+class Frame(Misc):
+    pass
+
+class Label(Misc):
+    pass
+
+class Button(Misc):
+    pass
+
+class Checkbutton(Misc):
+    pass
+
+class Entry(Misc):
+    def get(self):
+        return self._options.get('text', '')
+
+class Scrollbar(Misc):
+    pass
+
+class Variable:
+    def __init__(self, master=None, value=None, name=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+StringVar = IntVar = BooleanVar = DoubleVar = Variable
+
+class Canvas(Misc):
+    def __init__(self, master=None, cnf=None, **kwargs):
+        super().__init__(master, cnf, **kwargs)
+        self._items = {}
+        self._top = 0
+
+    def _create(self, type_, coords, options):
+        item = next(_job_ids)
+        self._items[item] = dict(options, type=type_, coords=coords)
+        return item
+
+    @_recorded()
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    @_recorded()
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, options)
+
+    @_recorded()
+    def create_polygon(self, *coords, **options):
+        return self._create('polygon', coords, options)
+
+    @_recorded()
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    @_recorded()
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+
+    @_recorded()
+    def itemconfigure(self, item, cnf=None, **options):
+        self._items[item].update(cnf or {}, **options)
+
+    itemconfig = itemconfigure
+
+    @_recorded()
+    def coords(self, item, *coords):
+        if coords:
+            self._items[item]['coords'] = coords
+        return self._items[item]['coords']
+
+    @_recorded()
+    def moveto(self, item, x='', y=''):
+        pass
+
+    @_recorded()
+    def scale(self, tag, x, y, xscale, yscale):
+        pass
+
+    @_recorded()
+    def delete(self, *items):
+        for item in items:
+            if isinstance(item, str):
+                for tagged in [key for key, options in self._items.items()
+                               if options.get('tags') == item]:
+                    del self._items[tagged]
+            self._items.pop(item, None)
+
+    def tag_lower(self, item, below=None):
+        pass
+
+    def canvasy(self, y, gridspacing=None):
+        return self._top + y
+
+    def canvasx(self, x, gridspacing=None):
+        return x
+
+    def _scrolled(self):
+        command = self._options.get('yscrollcommand')
+        if command is not None:
+            command('0', '1')
+
+    def yview_moveto(self, fraction):
+        region = self._options.get('scrollregion') or (0, 0, 0, 0)
+        self._top = fraction * region[3]
+        self._scrolled()
+
+    def yview_scroll(self, number, what):
+        self._top += number * (self._options.get('yscrollincrement') or 1)
+        self._scrolled()
+
+    def yview(self, *args):
+        pass
+
+class PhotoImage:
+    def __init__(self, name=None, cnf=None, master=None, **options):
+        self._options = dict(cnf or {}, **options)
+
+    @_recorded('put')
+    def put(self, data, to=None):
+        pass
+
+    def blank(self):
+        pass
+
+    def configure(self, **options):
+        self._options.update(options)
+
+    config = configure
+
+    def width(self):
+        return self._options.get('width', 0)
+
+    def height(self):
+        return self._options.get('height', 0)
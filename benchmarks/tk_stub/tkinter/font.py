@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+class Font:
+    def __init__(self, name=None, **options):
+        self._options = options
+
+    def configure(self, **options):
+        self._options.update(options)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key)
+
+def nametofont(name):
+    return Font(name)
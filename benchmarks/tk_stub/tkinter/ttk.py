@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from . import Misc
+
+class Frame(Misc):
+    pass
+
+class Label(Misc):
+    pass
+
+class Button(Misc):
+    pass
+
+class Entry(Misc):
+    pass
+
+class Scrollbar(Misc):
+    pass
+
+class Notebook(Misc):
+    pass
@@ -1,21 +1,126 @@
 # -*- coding: utf-8 -*-
 
-from enum import *
-from tkinter import ttk
-from tkinter import *
+import argparse
+import sys
+from time import perf_counter
 
-from .config import ConfigParser
-from .fumen_canvas.fumen_canvas_frame import FumenCanvasFrame
+_START = perf_counter()
 
-if __name__ == '__main__':
-    ConfigParser.parse_config()
+from .batch import add_batch_parser, run_batch
+from .config import CONFIG_PATH, ConfigParser, _global_config
+
+class _StartupTimer:
+    """Record the time of each startup phase since the process started."""
+    def __init__(self, start):
+        self._start = start
+        self._last = start
+        self._phases = []
+
+    def mark(self, phase):
+        now = perf_counter()
+        self._phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        lines = [f'{phase:<24}{seconds*1000:8.1f} ms'
+                 for phase, seconds in self._phases]
+        lines.append(f'{"total":<24}{(self._last-self._start)*1000:8.1f} ms')
+        return '\n'.join(lines)
+
+def run_gui(timer=None, tabs=False):
+    """Launch the Tk window. tkinter is only imported here, so that the
+    batch subcommand runs without Tk.
+    The window is shown first; the widgets not needed for the first frame
+    are created by a timer callback once the main loop runs.
+    Keyword arguments:
+    timer: the _StartupTimer to print the startup phases with (default: None)
+    tabs: if the window edits several fumens in tabs (default: False)
+    """
+    mark = timer.mark if timer is not None else lambda phase: None
+    from tkinter import Tk, BOTH, YES
+    mark('import tkinter')
+
+    from .fumen_canvas.fumen_canvas_frame import FumenCanvasFrame
+    mark('import canvas')
 
     root = Tk()
     root.title('Better Than Fumen v0.0.1')
+    mark('create root')
 
-    fumen_canvas = FumenCanvasFrame(root)
-    fumen_canvas.pack(fill=BOTH, expand=YES)
-    fumen_canvas.focus_set()
+    if tabs:
+        from .fumen_canvas.fumen_notebook import FumenNotebook
+        notebook = FumenNotebook(root, defer=True)
+        notebook.pack(fill=BOTH, expand=YES)
+    else:
+        fumen_canvas = FumenCanvasFrame(root, defer=True)
+        fumen_canvas.pack(fill=BOTH, expand=YES)
+        fumen_canvas.focus_set()
+    mark('build canvas')
+
+    root.update_idletasks()
+    mark('first frame')
+
+    if timer is not None:
+        def report():
+            mark('deferred widgets')
+            print(timer.report(), file=sys.stderr)
+        # Timers of the same delay run in order, so this runs right after
+        # the deferred widgets are created.
+        root.after(1, report)
 
     root.mainloop()
 
+    documents = notebook.frames() if tabs else [fumen_canvas]
+    for document in documents:
+        if document.profiler is not None:
+            document.profiler.stop()
+            print(document.profiler.report(), file=sys.stderr)
+            print(document.memory_report(), file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Better_Than_Fumen')
+    parser.add_argument(
+        '--config', metavar='PATH', default=None,
+        help=f'the config file (default: {CONFIG_PATH}, if it exists)',
+    )
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help='print the time of each startup phase, up to the first frame '
+        'and the deferred widgets',
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='time the event handlers, show the latency overlay, and log a '
+        'stack sample when a handler exceeds the budget',
+    )
+    parser.add_argument(
+        '--profile-budget', metavar='MS', type=int,
+        default=_global_config.PROFILE_BUDGET,
+        help='the latency budget of a handler '
+        f'(default: {_global_config.PROFILE_BUDGET} ms)',
+    )
+    parser.add_argument(
+        '--tabs', action='store_true',
+        help='edit several fumens in tabs, each with its own pages and mode',
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    add_batch_parser(subparsers)
+    args = parser.parse_args(argv)
+    if args.command == 'batch':
+        return run_batch(args)
+    try:
+        ConfigParser.parse_config(args.config)
+    except ValueError as e:
+        print(f'Invalid config: {e}', file=sys.stderr)
+        return 2
+    _global_config.PROFILE = args.profile
+    _global_config.PROFILE_BUDGET = args.profile_budget
+    timer = None
+    if args.profile_startup:
+        timer = _StartupTimer(_START)
+        timer.mark('imports and arguments')
+    run_gui(timer, args.tabs)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from dataclasses import fields
+from itertools import islice
+import os
+import sys
+import time
+
+from py_fumen_py import *
+
+_FLAG_NAMES = [field.name for field in fields(Flags)]
+_FLAG_VALUES = {
+    '1': True, 'true': True, 'on': True, 'yes': True,
+    '0': False, 'false': False, 'off': False, 'no': False,
+}
+
+def _flag(string):
+    """Parse a name=value flag argument into a ('flag', name, value) step."""
+    name, sep, value = string.partition('=')
+    if name not in _FLAG_NAMES or value.lower() not in _FLAG_VALUES:
+        raise ValueError(string)
+    return ('flag', name, _FLAG_VALUES[value.lower()])
+
+def add_batch_parser(subparsers):
+    """Add the batch subcommand to an argparse subparsers object."""
+    parser = subparsers.add_parser(
+        'batch', help='transform fumen codes without the GUI',
+        description='Read fumen codes (one per line) from a file or stdin, '
+        'apply the transforms in the given order to every page, and write '
+        'the resulting codes in input order. Invalid codes are reported on '
+        'stderr and written as empty lines.',
+    )
+    parser.add_argument('input', nargs='?', default='-',
+                        help='the input file (default: stdin)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='the output file (default: stdout)')
+    for direction in ['up', 'down', 'left', 'right']:
+        parser.add_argument(
+            f'--shift-{direction}', metavar='N', dest='steps',
+            action='append', type=lambda n, d=direction: (f'shift_{d}', int(n)),
+            help=f'shift the field {direction} by N minos',
+        )
+    parser.add_argument('--warp', action='store_true',
+                        help='warp the minos shifted left or right')
+    parser.add_argument('--mirror', dest='steps', action='append_const',
+                        const=('mirror',), help='mirror the field')
+    parser.add_argument('--clear', dest='steps', action='append_const',
+                        const=('clear',), help='clear the field')
+    parser.add_argument('--flag', metavar='NAME=VALUE', dest='steps',
+                        action='append', type=_flag,
+                        help=f'set a flag ({", ".join(_FLAG_NAMES)})')
+    parser.add_argument('--validate', action='store_true',
+                        help='report the pages with unplaceable operations')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='the number of worker processes '
+                        '(default: os.cpu_count(); 1 to run in-process)')
+    parser.add_argument('--chunk-size', type=int, default=256,
+                        help='the number of codes per job (default: 256)')
+    return parser
+
+def transform_page(page, steps, warp=False):
+    """Apply the steps to a Page in place, as the canvas does: the field is
+    shifted, mirrored or cleared along with the operation, and the
+    operation is dropped if it is no longer placeable.
+    """
+    field = page.field
+    operation = page.operation
+    for step in steps:
+        name = step[0]
+        if name == 'flag':
+            setattr(page.flags, step[1], step[2])
+            continue
+        if name == 'clear':
+            field = Field()
+            operation = None
+        elif name == 'mirror':
+            field.mirror(mirror_color=True)
+            if operation is not None:
+                operation.mirror()
+        else:
+            amount = step[1]
+            if name == 'shift_up':
+                field.shift_up(amount)
+                dx, dy = 0, amount
+            elif name == 'shift_down':
+                field.shift_down(amount)
+                dx, dy = 0, -amount
+            elif name == 'shift_left':
+                field.shift_left(amount, warp)
+                dx, dy = -amount, 0
+            else:
+                field.shift_right(amount, warp)
+                dx, dy = amount, 0
+            if operation is not None:
+                operation.shift(dx, dy)
+        if operation is not None and not field.is_placeable(operation):
+            operation = None
+    page.field = field
+    page.operation = operation
+
+def validate_pages(pages):
+    """Return the error messages of the pages whose operation is not
+    placeable in their field.
+    """
+    return [f'page {i+1}: {page.operation} is not placeable'
+            for i, page in enumerate(pages)
+            if page.operation is not None
+            and not page.field.is_placeable(page.operation)]
+
+def transform_code(code, steps, warp=False, validate=False):
+    """Transform a fumen code. Return (the new code, the error messages)."""
+    pages = decode(code)
+    errors = validate_pages(pages) if validate else []
+    if steps:
+        for page in pages:
+            transform_page(page, steps, warp)
+        code = encode(pages)
+    return code, errors
+
+def transform_chunk(codes, steps, warp=False, validate=False):
+    """Transform a list of fumen codes, catching the errors of each code.
+    Return a list of (the new code or None, the error messages).
+    """
+    results = []
+    for code in codes:
+        try:
+            results.append(transform_code(code, steps, warp, validate))
+        except Exception as e:
+            results.append((None, [f'{type(e).__name__}: {e}']))
+    return results
+
+def _chunks(lines, size):
+    """Group the stripped lines into lists of at most size codes."""
+    lines = (line.strip() for line in lines)
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _iter_results(chunks, steps, warp, validate, workers):
+    """Yield the results of the chunks in input order.
+    At most 2 chunks per worker are in flight, so that the input is
+    streamed instead of read as a whole.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield transform_chunk(chunk, steps, warp, validate)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        futures = deque()
+        for chunk in chunks:
+            futures.append(executor.submit(
+                transform_chunk, chunk, steps, warp, validate))
+            if len(futures) >= 2 * workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+def run_batch(args):
+    """Run the batch subcommand with the parsed arguments.
+    Return the exit status: 1 if any code is invalid, otherwise 0.
+    """
+    steps = args.steps or []
+    input_ = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    count = 0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        chunks = _chunks((line for line in input_ if line.strip()),
+                         args.chunk_size)
+        for results in _iter_results(chunks, steps, args.warp,
+                                     args.validate, args.workers):
+            for code, errors in results:
+                count += 1
+                for error in errors:
+                    print(f'code {count}: {error}', file=sys.stderr)
+                if code is None or errors:
+                    failed += 1
+                output.write(f'{code or ""}\n')
+    finally:
+        if input_ is not sys.stdin:
+            input_.close()
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f'{count} codes in {elapsed:.2f} s '
+          f'({count / elapsed if elapsed else 0:.0f} codes/s), '
+          f'{failed} failed', file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+from py_fumen_py import Mino, Operation, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+def _shape_tables():
+    """Build the shape tables of every (mino, rotation), as
+    Operation.shape_at() returns them.
+    """
+    offsets = {}
+    masks = {}
+    for mino in Mino:
+        for rotation in Rotation:
+            cells = tuple((dx, dy) for dx, dy
+                          in Operation.shape_at(mino, rotation))
+            left = min(dx for dx, dy in cells)
+            right = max(dx for dx, dy in cells)
+            bottom = min(dy for dx, dy in cells)
+            top = max(dy for dx, dy in cells)
+            rows = {}
+            for dx, dy in cells:
+                rows[dy] = rows.get(dy, 0) | 1 << (dx-left)
+            offsets[mino, rotation] = cells
+            masks[mino, rotation] = (left, right, bottom, top,
+                                     tuple(sorted(rows.items())))
+    return offsets, masks
+
+# (mino, rotation) -> the (dx, dy) offsets of the minos from the Operation
+# coords, and (left, right, bottom, top, ((dy, row mask), ...)): the extent
+# of the offsets, and the minos of each line as a row bitmask shifted so
+# that bit 0 is the left-most offset.
+SHAPE_OFFSETS, SHAPE_MASKS = _shape_tables()
+
+def shape_cells(operation):
+    """Return the mino grid coords of an operation as tuples, as
+    operation.shape() does, from the precomputed offsets.
+    """
+    x, y = operation.x, operation.y
+    return [(x+dx, y+dy) for dx, dy
+            in SHAPE_OFFSETS[operation.mino, operation.rotation]]
+
+class FieldBitboard:
+    """A row bitboard mirror of a py_fumen_py Field.
+    Each line is kept as an int, where bit x is set if the mino at (x, y) is
+    not empty. The methods follow the semantics of their Field counterparts,
+    so that a Field and its mirror stay in sync when both are modified.
+    """
+    FULL_ROW = (1 << Consts.WIDTH) - 1
+    _REVERSED = [
+        int(f'{row:0{Consts.WIDTH}b}'[::-1], 2)
+        for row in range(1 << Consts.WIDTH)
+    ]
+
+    def __init__(self, field=None):
+        """Create a FieldBitboard object, mirroring the field if given."""
+        self._rows = [0] * Consts.TOTAL_HEIGHT
+        if field is not None:
+            self.load(field)
+
+    @staticmethod
+    def row_of(line):
+        """Return the bitboard row of a Field line (a list of Mino)."""
+        row = 0
+        for x, mino in enumerate(line):
+            if mino is not Mino._:
+                row |= 1 << x
+        return row
+
+    def load(self, field):
+        """Mirror the whole field."""
+        self._rows = [self.row_of(field[y]) for y
+                      in range(-Consts.GARBAGE_HEIGHT, Consts.HEIGHT)]
+
+    def matches(self, field):
+        """Test if this bitboard is in sync with the field."""
+        return self._rows == FieldBitboard(field)._rows
+
+    def rows(self):
+        """Return the bitboard rows of the lines 0 to HEIGHT-1 as a tuple,
+        e.g. as a hashable key of the occupied minos.
+        """
+        return tuple(self._rows[Consts.GARBAGE_HEIGHT:])
+
+    def row(self, y):
+        """Return the bitboard row of line y."""
+        return self._rows[y+Consts.GARBAGE_HEIGHT]
+
+    def at(self, x, y):
+        """Test if the mino at (x, y) is not empty."""
+        return bool(self._rows[y+Consts.GARBAGE_HEIGHT] >> x & 1)
+
+    def fill(self, x, y, mino):
+        """Mirror Field.fill(x, y, mino)."""
+        if mino is Mino._:
+            self._rows[y+Consts.GARBAGE_HEIGHT] &= ~(1 << x)
+        else:
+            self._rows[y+Consts.GARBAGE_HEIGHT] |= 1 << x
+
+    def is_placeable(self, operation):
+        """Mirror Field.is_placeable(operation), with the precomputed row
+        masks of the operation.
+        """
+        if operation is None:
+            return True
+        return self._fits(SHAPE_MASKS[operation.mino, operation.rotation],
+                          operation.x, operation.y)
+
+    def _fits(self, masks, x, y):
+        # Test if the minos of SHAPE_MASKS entry masks at (x, y) are inside
+        # the field (the garbage line(s) excluded) and empty.
+        left, right, bottom, top, rows = masks
+        if (x+left < 0 or x+right >= Consts.WIDTH
+                or y+bottom < 0 or y+top >= Consts.HEIGHT):
+            return False
+        shift = x + left
+        base = y + Consts.GARBAGE_HEIGHT
+        for dy, mask in rows:
+            if self._rows[base+dy] & mask << shift:
+                return False
+        return True
+
+    def drop(self, operation):
+        """Mirror Field.drop(operation, place=False): return the operation
+        shifted down as far as it stays placeable.
+        """
+        if operation is None:
+            return None
+        masks = SHAPE_MASKS[operation.mino, operation.rotation]
+        x, y = operation.x, operation.y
+        for distance in range(1, Consts.HEIGHT+1):
+            if not self._fits(masks, x, y-distance):
+                return operation.shifted(0, 1-distance)
+        raise ValueError(f'operation cannot be dropped: {operation}')
+
+    def is_full(self, y, mask=0):
+        """Test if line y is filled, with the bits in mask deemed filled."""
+        return self._rows[y+Consts.GARBAGE_HEIGHT] | mask == self.FULL_ROW
+
+    def is_empty(self, y):
+        """Test if line y is empty."""
+        return self._rows[y+Consts.GARBAGE_HEIGHT] == 0
+
+    def shift_up(self, amount=1):
+        """Mirror Field.shift_up(). The garbage line(s) are not affected."""
+        garbage = self._rows[:Consts.GARBAGE_HEIGHT]
+        field = self._rows[Consts.GARBAGE_HEIGHT:]
+        self._rows = (garbage + [0] * amount
+                      + field[:Consts.HEIGHT-amount])
+
+    def shift_down(self, amount=1):
+        """Mirror Field.shift_down(). The garbage line(s) are not affected."""
+        garbage = self._rows[:Consts.GARBAGE_HEIGHT]
+        field = self._rows[Consts.GARBAGE_HEIGHT:]
+        self._rows = garbage + field[amount:] + [0] * amount
+
+    def shift_left(self, amount=1, warp=False):
+        """Mirror Field.shift_left()."""
+        self._rows = [
+            (row >> amount
+             | (row << (Consts.WIDTH-amount) if warp else 0)) & self.FULL_ROW
+            for row in self._rows
+        ]
+
+    def shift_right(self, amount=1, warp=False):
+        """Mirror Field.shift_right()."""
+        self._rows = [
+            (row << amount
+             | (row >> (Consts.WIDTH-amount) if warp else 0)) & self.FULL_ROW
+            for row in self._rows
+        ]
+
+    def mirror(self):
+        """Mirror Field.mirror(). The garbage line(s) are not affected."""
+        self._rows[Consts.GARBAGE_HEIGHT:] = [
+            self._REVERSED[row]
+            for row in self._rows[Consts.GARBAGE_HEIGHT:]
+        ]
+
+    def clear(self):
+        """Empty the whole bitboard, as a new Field() does."""
+        self._rows = [0] * Consts.TOTAL_HEIGHT
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+_BASE_COLORS = {
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'gray': (190, 190, 190),
+    'grey': (190, 190, 190),
+    'cyan': (0, 255, 255),
+    'orange': (255, 165, 0),
+    'yellow': (255, 255, 0),
+    'red': (255, 0, 0),
+    'magenta': (255, 0, 255),
+    'blue': (0, 0, 255),
+    'green': (0, 255, 0),
+    'purple': (160, 32, 240),
+}
+
+# The X11 shaded variants (e.g. 'cyan3') of the base colors having them.
+# They are listed, as some are not scaled versions of the base color, e.g.
+# purple1 is (155, 48, 255) while purple is (160, 32, 240).
+_SHADED_COLORS = {
+    'cyan': ((0, 255, 255), (0, 238, 238), (0, 205, 205), (0, 139, 139)),
+    'orange': ((255, 165, 0), (238, 154, 0), (205, 133, 0), (139, 90, 0)),
+    'yellow': ((255, 255, 0), (238, 238, 0), (205, 205, 0), (139, 139, 0)),
+    'red': ((255, 0, 0), (238, 0, 0), (205, 0, 0), (139, 0, 0)),
+    'magenta': ((255, 0, 255), (238, 0, 238), (205, 0, 205), (139, 0, 139)),
+    'blue': ((0, 0, 255), (0, 0, 238), (0, 0, 205), (0, 0, 139)),
+    'green': ((0, 255, 0), (0, 238, 0), (0, 205, 0), (0, 139, 0)),
+    'purple': ((155, 48, 255), (145, 44, 238), (125, 38, 205), (85, 26, 139)),
+}
+
+# The X11 gray/grey levels 0 to 100, which are not all level*255/100
+# rounded, e.g. gray50 is 127.
+_GRAY_LEVELS = (
+    0, 3, 5, 8, 10, 13, 15, 18, 20, 23, 26, 28, 31, 33, 36, 38, 41, 43, 46,
+    48, 51, 54, 56, 59, 61, 64, 66, 69, 71, 74, 77, 79, 82, 84, 87, 89, 92,
+    94, 97, 99, 102, 105, 107, 110, 112, 115, 117, 120, 122, 125, 127, 130,
+    133, 135, 138, 140, 143, 145, 148, 150, 153, 156, 158, 161, 163, 166, 168,
+    171, 173, 176, 179, 181, 184, 186, 189, 191, 194, 196, 199, 201, 204, 207,
+    209, 212, 214, 217, 219, 222, 224, 227, 229, 232, 235, 237, 240, 242, 245,
+    247, 250, 252, 255,
+)
+
+def to_rgb(color):
+    """Return the (r, g, b) tuple of a tkinter (X11) color, without Tk.
+    Supported colors are #rrggbb strings, the base X11 names above, the
+    shaded variants 1 to 4 of those in _SHADED_COLORS (e.g. 'cyan3') and
+    the gray/grey levels 0 to 100 (e.g. 'gray75'). Raise ValueError on
+    other colors.
+    """
+    name = color.lower()
+    if name.startswith('#') and len(name) == 7:
+        return tuple(int(name[i:i+2], 16) for i in range(1, 7, 2))
+    if name in _BASE_COLORS:
+        return _BASE_COLORS[name]
+    if name[:4] in ['gray', 'grey'] and name[4:].isdigit():
+        level = int(name[4:])
+        if 0 <= level <= 100:
+            return (_GRAY_LEVELS[level],) * 3
+    if name[:-1] in _SHADED_COLORS and name[-1] in '1234':
+        return _SHADED_COLORS[name[:-1]][int(name[-1]) - 1]
+    raise ValueError(f'Unsupported color: {color}')
+
+def to_hex(color):
+    """Return the #rrggbb string of a color."""
+    return '#{:02x}{:02x}{:02x}'.format(*to_rgb(color))
@@ -1,21 +1,38 @@
 # -*- coding: utf-8 -*-
 
+import configparser
 from dataclasses import dataclass
-from tkinter import font
+import os
 
 from py_fumen_py import Mino
 
+from .colors import to_hex
+
 @dataclass
 class GlobalConfig:
-    FONT: font = None
+    FONT: 'tkinter.font.Font' = None
     FONT_STYLE: str = 'Fixed'
     TEXT_COLOR = 'gray75'
+    POLL_INTERVAL: int = 50
+    HISTORY_BUDGET: int = 1 << 20
+    PROFILE: bool = False
+    PROFILE_BUDGET: int = 50
+    SOLVER_HEIGHT: int = 4
+    SOLVER_HOLD: bool = True
+    SOLVER_LIMIT: int = 4
+    SOLVER_WORKERS: int = 0
+    WORKER_THREADS: int = 3
 
 @dataclass
 class CanvasConfig:
     LINE_WIDTH: int = 2
     MINO_SIZE: int = 32
     PICKER_SIZE_MULT: float = 5/4
+    RESIZE_DELAY: int = 50
+    RENDER_BACKEND: str = 'item'
+    THUMBNAIL_MINO_SIZE: int = 4
+    THUMBNAIL_CACHE_SIZE: int = 256
+    REACHABLE_CACHE_SIZE: int = 64
     FILL: dict = None
     HIGHLIGHT: dict = None
     GRAY_HIGHLIGHT: dict = None
@@ -52,17 +69,39 @@ class CanvasConfig:
                 'normal': 'gray25',
                 'selected': 'white',
             }
+        self.compile()
 
     def mino_fill(self, mino, type_='normal'):
+        """Return the color name of a mino with a highlight type.
+        #rrggbb fills are used as-is for every highlight type.
+        """
         fill = self.FILL[mino]
-        if fill in ['gray' or 'grey']:
-            highlight = self.GRAY_HIGHLIGHT[type_]
-        elif fill == 'black':
+        if fill in ['gray', 'grey']:
+            highlight = self.GRAY_HIGHLIGHT.get(
+                type_, self.GRAY_HIGHLIGHT['normal'])
+        elif fill == 'black' or fill.startswith('#'):
             highlight = ''
         else:
             highlight = self.HIGHLIGHT[type_]
         return ''.join((fill, highlight))
 
+    def compile(self):
+        """Resolve the colors into the PALETTE table, which maps
+        (mino, highlight type, selected) to the (fill, outline) #rrggbb
+        strings passed to the canvas.
+        Raise ValueError if a color cannot be resolved.
+        """
+        outlines = {selected: to_hex(self.OUTLINE[
+                        'selected' if selected else 'normal'])
+                    for selected in [False, True]}
+        self.PALETTE = {
+            (mino, type_, selected): (to_hex(self.mino_fill(mino, type_)),
+                                      outlines[selected])
+            for mino in Mino
+            for type_ in self.HIGHLIGHT
+            for selected in [False, True]
+        }
+
 
 @dataclass
 class KeyConfig:
@@ -79,13 +118,127 @@ class KeyConfig:
     FUMEN_PAGEUP = 'Prior'
     FUMEN_FIRST = 'Home'
     FUMEN_LAST = 'End'
+    FUMEN_IMPORT = 'Control-v'
+    FUMEN_EXPORT = 'Control-e'
+    FUMEN_OPEN = 'Control-o'
+    FUMEN_SAVE = 'Control-s'
+    FUMEN_NEW_TAB = 'Control-n'
+    FUMEN_CLOSE_TAB = 'Control-w'
+    FUMEN_CANCEL = 'Escape'
+    FUMEN_UNDO = 'Control-z'
+    FUMEN_REDO = 'Control-y'
+    FUMEN_REACHABLE = 'Control-d'
 
 _keys = KeyConfig()
 _global_config = GlobalConfig()
 _canvas_config = CanvasConfig()
 
+CONFIG_PATH = os.path.join(os.path.expanduser('~'), '.better_than_fumen.ini')
+
 class ConfigParser:
+    """Loader of the user config file, an INI file with the sections:
+    [global], [canvas] and [keys]: the options of GlobalConfig, CanvasConfig
+        and KeyConfig, in lower case (e.g. mino_size = 24)
+    [fill]: the fill color of each mino by name (e.g. I = cyan)
+    [highlight], [gray_highlight]: the color suffix of each highlight type
+    [outline]: the normal and selected outline colors
+    """
+    _DICTS = {
+        'fill': 'FILL',
+        'highlight': 'HIGHLIGHT',
+        'gray_highlight': 'GRAY_HIGHLIGHT',
+        'outline': 'OUTLINE',
+    }
+
+    @staticmethod
+    def _convert(parser, section, option, default):
+        """Read an option with the type of its default value."""
+        if isinstance(default, bool):
+            return parser.getboolean(section, option)
+        elif isinstance(default, int):
+            return parser.getint(section, option)
+        elif isinstance(default, float):
+            return parser.getfloat(section, option)
+        return parser.get(section, option)
+
     @staticmethod
-    def parse_config():
-        global _keys
-        global _canvas_config
+    def parse_config(path=None):
+        """Read the config file (default: CONFIG_PATH, if it exists), and
+        apply it to the config objects in place. The file is fully validated
+        before anything is applied, and the palette is compiled once.
+        Raise ValueError if the file is invalid.
+        """
+        if path is None:
+            if not os.path.exists(CONFIG_PATH):
+                return
+            path = CONFIG_PATH
+        parser = configparser.ConfigParser(interpolation=None)
+        parser.optionxform = str
+        try:
+            with open(path) as file:
+                parser.read_file(file)
+        except (OSError, configparser.Error) as e:
+            raise ValueError(f'{path}: {e}') from e
+
+        targets = {
+            'global': _global_config,
+            'canvas': _canvas_config,
+            'keys': _keys,
+        }
+        changes = []
+        dicts = {}
+        for section in parser.sections():
+            if section in targets:
+                target = targets[section]
+                for option in parser.options(section):
+                    name = option.upper()
+                    default = getattr(target, name, None)
+                    if default is None or isinstance(default, dict):
+                        raise ValueError(
+                            f'{path}: unknown option {option} in [{section}]')
+                    try:
+                        value = ConfigParser._convert(
+                            parser, section, option, default)
+                    except ValueError as e:
+                        raise ValueError(
+                            f'{path}: [{section}] {option}: {e}') from e
+                    changes.append((target, name, value))
+            elif section in ConfigParser._DICTS:
+                name = ConfigParser._DICTS[section]
+                values = dict(getattr(_canvas_config, name))
+                for option in parser.options(section):
+                    key = option
+                    if section == 'fill':
+                        if option not in Mino.__members__:
+                            raise ValueError(
+                                f'{path}: unknown mino {option} in [fill]')
+                        key = Mino[option].value
+                    elif key not in values:
+                        raise ValueError(
+                            f'{path}: unknown option {option} '
+                            f'in [{section}]')
+                    values[key] = parser.get(section, option)
+                dicts[name] = values
+            else:
+                raise ValueError(f'{path}: unknown section [{section}]')
+
+        backend = dict((name, value) for target, name, value in changes
+                       if target is _canvas_config).get(
+                           'RENDER_BACKEND', _canvas_config.RENDER_BACKEND)
+        if backend not in ['item', 'image']:
+            raise ValueError(f'{path}: unknown render_backend {backend}')
+
+        try:
+            CanvasConfig(**{name: dicts.get(name, getattr(_canvas_config, name))
+                            for name in ConfigParser._DICTS.values()})
+            to_hex(dict((name, value) for target, name, value in changes
+                        if target is _global_config).get(
+                            'TEXT_COLOR', _global_config.TEXT_COLOR))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f'{path}: {e}') from e
+
+        for target, name, value in changes:
+            setattr(target, name, value)
+        for name, values in dicts.items():
+            setattr(_canvas_config, name, values)
+        _canvas_config.compile()
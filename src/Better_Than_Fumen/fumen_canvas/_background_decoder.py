@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from queue import Queue, Empty
+from threading import Event
+
+from ..page_store import iter_decode
+from ._worker_pool import _shared_pool
+
+class _BackgroundDecoder:
+    """Decode a fumen string, or read it from a file, on a thread of the
+    shared _WorkerPool.
+    Decoded PageRecords are handed over in batches through a queue, which
+    the Tk thread drains with poll(). No tkinter call is made by the worker.
+    """
+    def __init__(self, string=None, batch_size=64, path=None):
+        """Keyword arguments:
+        string: the fumen string to be decoded
+        batch_size: the maximum number of pages per batch (default: 64)
+        path: the file to read the fumen string from, instead of string
+            (default: None)
+        """
+        self._string = string
+        self._batch_size = batch_size
+        self._path = path
+        self._queue = Queue()
+        self._cancelled = Event()
+
+    def start(self):
+        _shared_pool().submit(self._run, long=True)
+
+    def cancel(self):
+        """Ask the worker to stop after the page being decoded."""
+        self._cancelled.set()
+
+    def _run(self):
+        # Decode on the worker thread. The queue ends with None or an error.
+        batch = []
+        try:
+            if self._path is not None:
+                with open(self._path, encoding='utf-8') as file:
+                    self._string = file.read().strip()
+            for record in iter_decode(self._string):
+                if self._cancelled.is_set():
+                    break
+                batch.append(record)
+                if len(batch) >= self._batch_size:
+                    self._queue.put(batch)
+                    batch = []
+            self._queue.put(batch)
+            self._queue.put(None)
+        except Exception as e:
+            self._queue.put(batch)
+            self._queue.put(e)
+
+    def poll(self):
+        """Return the records decoded so far without blocking, whether the
+        decoding has ended, and the error raised by the decoding, if any.
+        """
+        records = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                return records, False, None
+            if item is None:
+                return records, True, None
+            elif isinstance(item, Exception):
+                return records, True, item
+            records += item
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import os
+from queue import Queue, Empty
+import stat
+import tempfile
+from threading import Event
+
+from ..fumen_encoder import iter_encode_records
+from ._worker_pool import _shared_pool
+
+class _BackgroundEncoder:
+    """Encode PageRecords into a fumen string on a thread of the shared
+    _WorkerPool, and write it to a file in chunks as it is encoded, or hand
+    it over as a whole.
+    The records must not be modified while encoding (see
+    PageStore.snapshot()), but their segments are cached. The result is
+    handed over through a queue, which the Tk thread drains with poll().
+    No tkinter call is made by the worker.
+    """
+    def __init__(self, records, path=None, chunk_size=1 << 16):
+        """Keyword arguments:
+        records: the PageRecords to be encoded
+        path: the file to write the fumen string to (default: None, the
+            string is returned by poll())
+        chunk_size: the number of characters written at once
+            (default: 65536)
+        """
+        self._records = records
+        self._path = path
+        self._chunk_size = chunk_size
+        self._encoded = 0
+        self._queue = Queue()
+        self._cancelled = Event()
+        self._mode = None if path is None else self._file_mode(path)
+
+    @staticmethod
+    def _file_mode(path):
+        """Return the permissions of the file at path if it exists,
+        otherwise those open() would create it with under the umask.
+        """
+        try:
+            return stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            # The umask can only be read by setting it. This runs on the Tk
+            # thread, before the worker writes any file.
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    def start(self):
+        _shared_pool().submit(self._run, long=True)
+
+    def cancel(self):
+        """Ask the worker to stop after the page being encoded. The file is
+        left untouched.
+        """
+        self._cancelled.set()
+
+    def _counted(self):
+        # Yield the records, counting those encoded, until cancelled.
+        for i, record in enumerate(self._records):
+            if self._cancelled.is_set():
+                return
+            yield record
+            self._encoded = i + 1
+
+    def _run(self):
+        # Encode on the worker thread. The queue ends with the fumen string
+        # (None if written to the file or cancelled) or an error.
+        try:
+            chunks = iter_encode_records(self._counted(), self._chunk_size)
+            if self._path is None:
+                string = ''.join(chunks)
+                self._queue.put(
+                    None if self._cancelled.is_set() else string)
+            else:
+                self._write(chunks)
+                self._queue.put(None)
+        except Exception as e:
+            self._queue.put(e)
+
+    def _write(self, chunks):
+        # Write the chunks to a temporary file next to the file, which then
+        # replaces the file, so that a cancelled or failed export leaves the
+        # file untouched. The temporary file is only readable by the user
+        # until it gets the permissions of the file.
+        directory = os.path.dirname(os.path.abspath(self._path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                if not self._cancelled.is_set():
+                    file.write('\n')
+            if not self._cancelled.is_set():
+                os.chmod(temp_path, self._mode)
+                os.replace(temp_path, self._path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def poll(self):
+        """Return the progress as (pages encoded, pages) without blocking,
+        whether the encoding has ended, the fumen string if it is not
+        written to a file, and the error raised by the encoding, if any.
+        """
+        progress = (self._encoded, len(self._records))
+        try:
+            item = self._queue.get_nowait()
+        except Empty:
+            return progress, False, None, None
+        if isinstance(item, Exception):
+            return progress, True, None, item
+        return progress, True, item, None
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+from queue import Queue, Empty
+from threading import Thread
+
+from ..solver import solve
+
+class _BackgroundSolver:
+    """Run a perfect clear search on a worker thread, which drives the
+    process pool of solve().
+    The progress and the solutions are handed over through a queue, which
+    the Tk thread drains with poll(). No tkinter call is made by the worker.
+    """
+    def __init__(self, field, queue, height, use_hold, limit, workers=None):
+        """Keyword arguments: see solver.solve()."""
+        # The cancel event is shared with the worker processes of solve(),
+        # which stop the branches they are searching once it is set.
+        self._cancelled = multiprocessing.get_context('spawn').Event()
+        self._args = (field, queue, height, use_hold, limit, workers,
+                      self._cancelled)
+        self._queue = Queue()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        """Ask the worker to stop. The branches being searched stop soon
+        after, keeping the solutions found, and the branches not started
+        yet are cancelled.
+        """
+        self._cancelled.set()
+
+    def _run(self):
+        # Search on the worker thread. The queue ends with None or an error.
+        try:
+            search = solve(*self._args)
+            try:
+                for progress in search:
+                    self._queue.put(progress)
+                    if self._cancelled.is_set():
+                        break
+            finally:
+                search.close()
+            self._queue.put(None)
+        except Exception as e:
+            self._queue.put(e)
+
+    def poll(self):
+        """Return the solutions found so far without blocking, the progress
+        as (branches searched, branches), whether the search has ended, and
+        the error raised by the search, if any.
+        """
+        solutions = []
+        progress = None
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                return solutions, progress, False, None
+            if item is None:
+                return solutions, progress, True, None
+            elif isinstance(item, Exception):
+                return solutions, progress, True, item
+            done, total, found = item
+            progress = (done, total)
+            solutions += found
@@ -10,28 +10,40 @@ from py_fumen_py import *
 
 from ..config import _keys, _global_config
 from ..config import _canvas_config as _config
+from ._mino_image import _MinoImage
 
 class _CanvasMode:
-    """Static class for data interchange between classes within this module."""
-    mino = Mino._
-    rotation = Rotation.SPAWN
-    direct_place = False
-    placement = None
-    shiftwarp = False
+    """The editing state of a document, shared by its frames: the selected
+    mino and rotation, the placement of the viewed page and the toggles.
+    """
+    def __init__(self):
+        self.mino = Mino._
+        self.rotation = Rotation.SPAWN
+        self.direct_place = False
+        self.placement = None
+        self.shiftwarp = False
 
 class _BaseMinoFrame(ttk.Frame):
     """ The base class of MinoCanvas and MinoPicker.
     Provide the most basic functionalities for a mino canvas.
     Mino states should be handled by the derived classes, and thus not stored.
     """
-    def __init__(self, parent, mino_size, height, width, **kwargs):
+    def __init__(self, parent, mino_size, height, width, backend='item',
+            defer=False, mode=None, **kwargs):
         """Keyword arguments:
         parent: the parent of this canvas as a tkinter widget.
         mino_size: the mino size of this canvas
         height: the height of this canvas (in minos)
         width: the width of this canvas (in minos)
+        backend: 'item' to draw one rectangle item per mino, or 'image' to
+            draw all the minos into one PhotoImage. (default: 'item')
+        defer: if the mino items are only created by create_items(), so
+            that the window can show before. Paints before that are kept
+            and applied on creation. (default: False)
+        mode: the _CanvasMode of the document (default: a new one)
         """
         super().__init__(parent, **kwargs)
+        self._mode = _CanvasMode() if mode is None else mode
         self._canvas = Canvas(self, height=height*mino_size,
                               width=width*mino_size)
         self._canvas.grid()
@@ -39,16 +51,68 @@ class _BaseMinoFrame(ttk.Frame):
         self._width = width
         self._mino_size = mino_size
 
-        self._rects = [[
-                self._canvas.create_rectangle(
-                    x*self._mino_size+2, y*self._mino_size+2,
-                    (x+1)*self._mino_size, (y+1)*self._mino_size,
-                    fill='black', outline='gray25', width=_config.LINE_WIDTH,
-                ) for y in range(height)
-            ] for x in range(width)
-        ]
-
+        fill, outline = _config.PALETTE[Mino._, 'normal', False]
+        self._painted = [[(fill, outline) for y in range(height)]
+                         for x in range(width)]
         self._texts = [[None for y in range(height)] for x in range(width)]
+        self._items_created = False
+        if backend == 'item':
+            self._image = None
+            self._rects = [[None for y in range(height)] for x in range(width)]
+            if not defer:
+                self._create_rects()
+        elif backend == 'image':
+            self._image = _MinoImage(self, width, height, mino_size,
+                                     self._canvas.cget('background'))
+            self._canvas.create_image(0, 0, anchor='nw',
+                                      image=self._image.photo)
+            self._rects = [[None for y in range(height)] for x in range(width)]
+            self._items_created = True
+        else:
+            raise ValueError(f'Unknown render backend: {backend}')
+
+    def create_items(self):
+        """Create the mino items (if not created yet), with the colors
+        painted so far.
+        """
+        if not self._items_created:
+            self._create_rects()
+
+    def drop_items(self):
+        """Delete the mino items, e.g. while the document is not shown.
+        The painted colors are kept, and create_items() recreates the items
+        with them; paints in the meantime are only recorded. The image
+        backend keeps its single image item.
+        """
+        if self._image is None and self._items_created:
+            self._canvas.delete(*[rect for column in self._rects
+                                  for rect in column if rect is not None])
+            self._rects = [[None for y in range(self._height)]
+                           for x in range(self._width)]
+            self._items_created = False
+
+    def _create_rects(self):
+        # The minos showing a text (e.g. the rotation names of the picker)
+        # have no rectangle.
+        self._items_created = True
+        for x in range(self._width):
+            for y in range(self._height):
+                if self._texts[x][y] is not None:
+                    continue
+                fill, outline = self._painted[x][y]
+                self._rects[x][y] = self._canvas.create_rectangle(
+                    *self._rect_coords(x, y),
+                    fill=fill, outline=outline, width=_config.LINE_WIDTH,
+                )
+
+    def _rect_coords(self, x, y):
+        """Return the canvas coords of the mino at a mino grid coords."""
+        return (x*self._mino_size+2, y*self._mino_size+2,
+                (x+1)*self._mino_size, (y+1)*self._mino_size)
+
+    def _text_coords(self, x, y):
+        """Return the canvas coords of the text at a mino grid coords."""
+        return ((x+0.5)*self._mino_size, (y+0.5)*self._mino_size)
 
     def _event_coords(self, event):
         """Convert tkinter event coords to the mino grid coords."""
@@ -58,22 +122,41 @@ class _BaseMinoFrame(ttk.Frame):
         """Check if a mino grid coords is inside this canvas."""
         return 0 <= x < self._width and 0 <= y < self._height
 
-    def paint_mino_at(self, x, y, fill, outline):
-        """Paint mino at a given mino grid coords."""
+    def paint_mino_at(self, x, y, fill, outline, force=False):
+        """Paint mino at a given mino grid coords.
+        The mino is only repainted if its fill or outline changes, unless
+        force is set.
+        Return the number of minos touched (0 or 1).
+        """
         if self._is_inside(x, y):
-            if self._rects[x][y] is not None:
-                self._canvas.itemconfigure(
-                    self._rects[x][y],
-                    fill=fill,
-                    outline=outline,
-                )
+            if force or self._painted[x][y] != (fill, outline):
+                if self._image is not None:
+                    self._image.paint(x, y, fill, outline)
+                elif self._rects[x][y] is not None:
+                    self._canvas.itemconfigure(
+                        self._rects[x][y],
+                        fill=fill,
+                        outline=outline,
+                    )
+                elif self._items_created:
+                    return 0
+                self._painted[x][y] = (fill, outline)
+                return 1
+        return 0
+
+    def flush(self):
+        """Write the pending paints of the image backend immediately,
+        instead of waiting for Tk to become idle.
+        """
+        if self._image is not None:
+            self._image.flush()
 
     def set_text_at(self, x, y, text):
         """Alter text at a given mino grid coords."""
         if self._is_inside(x, y):
             if self._texts[x][y] is None:
                 self._texts[x][y] = self._canvas.create_text(
-                    (x+0.5)*self._mino_size, (y+0.5)*self._mino_size,
+                    *self._text_coords(x, y),
                     fill=_global_config.TEXT_COLOR,
                     font=_global_config.FONT,
                 )
@@ -82,33 +165,25 @@ class _BaseMinoFrame(ttk.Frame):
                 text=text,
             )
 
-    def _resize_at(self, x, y):
-        """Resize the mino and the text at a given mino grid coords."""
-        if self._is_inside(x, y):
-            if self._rects[x][y]:
-                self._canvas.coords(
-                    self._rects[x][y],
-                    x*self._mino_size+2, y*self._mino_size+2,
-                    (x+1)*self._mino_size, (y+1)*self._mino_size,
-                )
-            if self._texts[x][y]:
-                self._canvas.coords(
-                    self._texts[x][y],
-                    (x+0.5)*self._mino_size,
-                    (y+0.5)*self._mino_size,
-                )
-            if self._texts[x][y] and self._rects[x][y]:
-                self._canvas.tag_raise(self._texts[x][y], self._rects[x][y])
-
     def on_resize(self, mino_size):
-        """Resize the canvas objects if the whole canvas is resized."""
-        if self._mino_size != mino_size:
+        """Resize the canvas objects if the whole canvas is resized.
+        The items are laid out again from the new mino size, as when they are
+        created, so that the fixed gaps between the minos are kept and
+        repeated resizes do not accumulate rounding errors.
+        """
+        if self._mino_size != mino_size and mino_size > 0:
             self._mino_size = mino_size
             self._canvas.config(height=self._height*self._mino_size,
                                 width=self._width*self._mino_size)
             for x in range(self._width):
                 for y in range(self._height):
-                    self._resize_at(x, y)
+                    if self._rects[x][y] is not None:
+                        self._canvas.coords(self._rects[x][y],
+                                            *self._rect_coords(x, y))
+                    if self._texts[x][y] is not None:
+                        self._canvas.coords(self._texts[x][y],
+                                            *self._text_coords(x, y))
+            if self._image is not None:
+                self._image.on_resize(mino_size)
             return True
         return False
-
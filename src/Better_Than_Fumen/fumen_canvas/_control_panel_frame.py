@@ -122,12 +122,131 @@ class _ControlPanelFrame(ttk.Frame):
         self._clear_button.grid(column=2, row=8, columnspan=2,
                                  sticky=(N,S,E,W))
 
+        self._paddings.append(ttk.Label(self, relief='flat'))
+        self._paddings[-1].grid(column=0, row=9, columnspan=4,
+                                sticky=(N,S,E,W))
+
+        self._import_button = Button(
+            self, text='Import', font=_global_config.FONT,
+            padx=5, pady=2, borderwidth=_config.LINE_WIDTH,
+        )
+        self._import_button.grid(column=0, row=10, columnspan=2,
+                                 sticky=(N,S,E,W))
+
+        self._export_button = Button(
+            self, text='Export', font=_global_config.FONT,
+            padx=5, pady=2, borderwidth=_config.LINE_WIDTH,
+        )
+        self._export_button.grid(column=2, row=10, columnspan=2,
+                                 sticky=(N,S,E,W))
+
+        self._open_button = Button(
+            self, text='Open', font=_global_config.FONT,
+            padx=5, pady=2, borderwidth=_config.LINE_WIDTH,
+        )
+        self._open_button.grid(column=0, row=11, columnspan=2,
+                               sticky=(N,S,E,W))
+
+        self._save_button = Button(
+            self, text='Save', font=_global_config.FONT,
+            padx=5, pady=2, borderwidth=_config.LINE_WIDTH,
+        )
+        self._save_button.grid(column=2, row=11, columnspan=2,
+                               sticky=(N,S,E,W))
+
+        self._transfer_label = Label(
+            self, text='', font=_global_config.FONT,
+            relief='flat', borderwidth=_config.LINE_WIDTH,
+        )
+        self._transfer_label.grid(column=0, row=12, columnspan=4,
+                                  sticky=(N,S,E,W))
+
+        self._paddings.append(ttk.Label(self, relief='flat'))
+        self._paddings[-1].grid(column=0, row=13, columnspan=4,
+                                sticky=(N,S,E,W))
+
+        self._queue_entry = tk.Entry(
+            self, font=_global_config.FONT, width=8,
+            borderwidth=_config.LINE_WIDTH,
+        )
+        self._queue_entry.grid(column=0, row=14, columnspan=4,
+                               sticky=(N,S,E,W))
+
+        self._solve_button = Button(
+            self, text='Solve PC', font=_global_config.FONT,
+            padx=5, pady=2, borderwidth=_config.LINE_WIDTH,
+        )
+        self._solve_button.grid(column=0, row=15, columnspan=4,
+                                sticky=(N,S,E,W))
+
+        self._solver_label = Label(
+            self, text='', font=_global_config.FONT,
+            relief='flat', borderwidth=_config.LINE_WIDTH,
+        )
+        self._solver_label.grid(column=0, row=16, columnspan=4,
+                                sticky=(N,S,E,W))
+
+        self._paddings.append(ttk.Label(self, relief='flat'))
+        self._paddings[-1].grid(column=0, row=17, columnspan=4,
+                                sticky=(N,S,E,W))
+
+        self._search_entry = tk.Entry(
+            self, font=_global_config.FONT, width=8,
+            borderwidth=_config.LINE_WIDTH,
+        )
+        self._search_entry.grid(column=0, row=18, columnspan=4,
+                                sticky=(N,S,E,W))
+
+        self._find_button = Button(
+            self, text='Find', font=_global_config.FONT,
+            padx=5, pady=2, borderwidth=_config.LINE_WIDTH,
+        )
+        self._find_button.grid(column=0, row=19, columnspan=4,
+                               sticky=(N,S,E,W))
+
+        self._find_label = Label(
+            self, text='', font=_global_config.FONT,
+            relief='flat', borderwidth=_config.LINE_WIDTH,
+        )
+        self._find_label.grid(column=0, row=20, columnspan=4,
+                              sticky=(N,S,E,W))
+
     def update_page_label(self, current, total):
         self._page_label.config(text=f'{current+1}/{total}')
 
+    def set_importing(self, importing):
+        """Turn the import button into a cancel button while importing."""
+        self._import_button.config(text='Cancel' if importing else 'Import')
+
+    def set_exporting(self, exporting):
+        """Turn the export button into a cancel button while exporting."""
+        self._export_button.config(text='Cancel' if exporting else 'Export')
+
+    def update_transfer_label(self, text):
+        self._transfer_label.config(text=text)
+
+    def solver_queue(self):
+        """Return the mino queue typed in the queue entry."""
+        return self._queue_entry.get()
+
+    def set_solving(self, solving):
+        """Turn the solve button into a cancel button while solving."""
+        self._solve_button.config(text='Cancel' if solving else 'Solve PC')
+
+    def update_solver_label(self, text):
+        self._solver_label.config(text=text)
+
+    def search_text(self):
+        """Return the row pattern typed in the search entry."""
+        return self._search_entry.get()
+
+    def update_find_label(self, text):
+        self._find_label.config(text=text)
+
     def bind_commands(self, prev, next_, first, last, delete, copy, insert,
             shift_left, shift_down, shift_up, shift_right, shiftwarp_toggle,
-            mirror=None, clear=None):
+            mirror=None, clear=None, import_=None, solve=None, find=None,
+            export=None, open_=None, save=None):
         self._prev_button.config(command=prev)
         self._next_button.config(command=next_)
         self._first_button.config(command=first)
@@ -142,6 +261,14 @@ class _ControlPanelFrame(ttk.Frame):
         self._shiftwarp_check.config(command=shiftwarp_toggle)
         self._mirror_button.config(command=mirror)
         self._clear_button.config(command=clear)
+        self._import_button.config(command=import_)
+        self._export_button.config(command=export)
+        self._open_button.config(command=open_)
+        self._save_button.config(command=save)
+        self._solve_button.config(command=solve)
+        self._find_button.config(command=find)
+        if find is not None:
+            self._search_entry.bind('<Return>', find)
 
     def on_resize(self, unit_size):
         self._unit_size = unit_size
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict
 from copy import copy
 from math import floor
 from tkinter import ttk, font, Button, Canvas, Frame, Label
@@ -9,31 +10,63 @@ import tkinter as tk
 from py_fumen_py import *
 from py_fumen_py.constant import FieldConstants as Consts
 
+from ..bitboard import FieldBitboard, shape_cells
 from ..config import _keys, _global_config
 from ..config import _canvas_config as _config
-from ._base_mino_frame import _CanvasMode, _BaseMinoFrame
+from ..page_store import pack_field, unpack_field
+from ..reachability import reachable_operations
+from ._base_mino_frame import _BaseMinoFrame
+from ._ghost_cache import _GhostCache
 
 class _FieldCanvasFrame(_BaseMinoFrame):
     """The frame where the actual minos are drawn."""
-
-    def __init__(self, parent, mino_size, **kwargs):
+    HANDLERS = [
+        '_on_draw', '_on_inverted_draw', '_on_erase',
+        '_on_draw_motion', '_on_inverted_draw_motion', '_on_erase_motion',
+        '_on_draw_reset', '_on_erase_reset', '_flush_motion',
+    ]
+
+    def __init__(self, parent, mino_size, profiler=None, defer=False,
+            **kwargs):
         """Keyword arguments:
         parent: the parent of this canvas as a tkinter widget.
         mino_size: the mino size of this canvas
+        profiler: the _Profiler instrumenting the handlers (default: None)
+        defer: if the mino items are only created by create_items()
+            (default: False)
+        mode: the _CanvasMode of the document (default: a new one)
         """
         super().__init__(parent, mino_size,
-            Consts.TOTAL_HEIGHT, Consts.WIDTH, **kwargs)
+            Consts.TOTAL_HEIGHT, Consts.WIDTH, _config.RENDER_BACKEND, defer,
+            **kwargs)
         self._garbage_separator = self._canvas.create_line(
-            0, Consts.HEIGHT*mino_size+1,
-            Consts.WIDTH*mino_size, Consts.HEIGHT*mino_size+1,
+            *self._separator_coords(),
             fill='gray75', width=_config.LINE_WIDTH,
         )
 
         self._field = Field()
+        # The shared cells the field was loaded from, until it is edited.
+        self._shared_cells = None
+        self._bitboard = FieldBitboard()
+        self._ghost_cache = _GhostCache(self._bitboard)
         self._drawing_mino = None
-        self._ghosts = []
-        self._placements = []
+        self._ghosts = set()
+        self._placements = set()
+        self._placement_rows = {}
         self._lineclear = [False for y in range(Consts.HEIGHT)]
+        self._last_cell = None
+        self._pending_action = None
+        self._pending_cells = []
+        self._flush_job = None
+        self._edit_callback = None
+        self._edit_before = None
+        self._reachable_shown = False
+        self._reachable_key = None
+        self._reachable_cache = OrderedDict()
+
+        if profiler is not None:
+            profiler.instrument(self, self.HANDLERS)
+            profiler.count_touched(self)
 
         self._canvas.bind(
             f'<{_keys.CANVAS_INVERT_MOD}-ButtonPress-{_keys.CANVAS_DRAW_BTN}>',
@@ -41,18 +74,52 @@ class _FieldCanvasFrame(_BaseMinoFrame):
         )
         self._canvas.bind(
             f'<{_keys.CANVAS_INVERT_MOD}-B{_keys.CANVAS_DRAW_BTN}-Motion>',
-            self._on_inverted_draw
+            self._on_inverted_draw_motion
         )
         self._canvas.bind(f'<ButtonPress-{_keys.CANVAS_DRAW_BTN}>',
                           self._on_draw)
         self._canvas.bind(f'<B{_keys.CANVAS_DRAW_BTN}-Motion>',
-                          self._on_draw)
+                          self._on_draw_motion)
         self._canvas.bind(f'<ButtonPress-{_keys.CANVAS_ERASE_BTN}>',
                           self._on_erase)
         self._canvas.bind(f'<B{_keys.CANVAS_ERASE_BTN}-Motion>',
-                          self._on_erase)
+                          self._on_erase_motion)
         self._canvas.bind(f'<ButtonRelease-{_keys.CANVAS_DRAW_BTN}>',
                           self._on_draw_reset)
+        self._canvas.bind(f'<ButtonRelease-{_keys.CANVAS_ERASE_BTN}>',
+                          self._on_erase_reset)
+
+    def create_items(self):
+        """Create the mino items, keeping the garbage separator on top, and
+        the reachable placements if shown.
+        """
+        super().create_items()
+        self._canvas.tag_raise(self._garbage_separator)
+        self.refresh_reachable()
+
+    def drop_items(self):
+        """Delete the mino items and the reachable placements."""
+        super().drop_items()
+        self._canvas.delete('reachable')
+        self._reachable_key = None
+
+    def _separator_coords(self):
+        """Return the canvas coords of the garbage separator."""
+        return (0, Consts.HEIGHT*self._mino_size+1,
+                Consts.WIDTH*self._mino_size, Consts.HEIGHT*self._mino_size+1)
+
+    def on_resize(self, mino_size):
+        """Call super().on_resize() to check if resizing happens, and lay
+        out the garbage separator and the reachable placements accordingly.
+        """
+        if super().on_resize(mino_size):
+            self._canvas.coords(self._garbage_separator,
+                                *self._separator_coords())
+            # Redraw the reachable placements at the new size.
+            self._reachable_key = None
+            self.refresh_reachable()
+            return True
+        return False
 
     def _event_coords(self, event):
         """Convert tkinter event coords to the mino grid coords,
@@ -66,89 +133,238 @@ class _FieldCanvasFrame(_BaseMinoFrame):
         return (0 <= x < self._width and
                 -Consts.GARBAGE_HEIGHT <= y < Consts.HEIGHT)
 
-    def _on_draw(self, event):
-        """Draw event handler.
-        The default behavior of most Fumen editors.
-        Draw placement if the right-most column of the picker is not selected;
-        otherwise, draw mino.
+    def _draw_action(self, inverted=False):
+        """Return the drawing method for a (possibly inverted) draw event.
+        The default behavior of most Fumen editors is to draw placement if
+        the right-most column of the picker is not selected; otherwise, to
+        draw mino. The inverted behavior swaps the two.
         """
-        x, y = self._event_coords(event)
-        if _CanvasMode.direct_place and _CanvasMode.mino.is_colored():
-            self._draw_placement(x, y)
+        if (self._mode.direct_place != inverted
+                and self._mode.mino.is_colored()):
+            return self._draw_placement
         else:
-            self._draw_mino(x, y)
+            return self._draw_mino
+
+    def _on_draw(self, event):
+        """Draw event handler."""
+        self._on_press(event, self._draw_action())
 
     def _on_inverted_draw(self, event):
-        """Draw event handler (inverted).
-        Draw mino if the right-most column of the picker is selected;
-        otherwise, draw drawplacement.
-        """
-        x, y = self._event_coords(event)
-        if _CanvasMode.direct_place or not _CanvasMode.mino.is_colored():
-            self._draw_mino(x, y)
-        else:
-            self._draw_placement(x, y)
+        """Draw event handler (inverted)."""
+        self._on_press(event, self._draw_action(inverted=True))
+
+    def _on_erase(self, event):
+        """Erase event handler. Erase mino (draw Mino._)."""
+        self._on_press(event, self._erase_mino)
+
+    def _on_draw_motion(self, event):
+        """Draw motion event handler."""
+        self._queue_motion(event, self._draw_action())
+
+    def _on_inverted_draw_motion(self, event):
+        """Draw motion event handler (inverted)."""
+        self._queue_motion(event, self._draw_action(inverted=True))
+
+    def _on_erase_motion(self, event):
+        """Erase motion event handler."""
+        self._queue_motion(event, self._erase_mino)
 
     def _on_draw_reset(self, event):
-        """Reset the drawing mino when a drawing event ends."""
+        """Flush the pending motion and reset the drawing mino when a drawing
+        event ends.
+        """
+        self._flush_motion()
         self._drawing_mino = None
+        self._last_cell = None
+        self._end_edit()
+
+    def _on_erase_reset(self, event):
+        """Flush the pending motion when an erasing event ends."""
+        self._flush_motion()
+        self._last_cell = None
+        self._end_edit()
+
+    def bind_edit(self, callback):
+        """Call callback(cells, operation) with the packed minos and the
+        placement before each completed edit: a whole drawing or erasing
+        stroke, a shift, a mirror or a clear.
+        """
+        self._edit_callback = callback
 
-    def _on_erase(self, event):
-        """Erase event handler. Erase mino (draw Mino._)."""
-        x, y = self._event_coords(event)
-        if self._is_inside_field(x, y):
-            if [x, y] in self._placements:
-                self._clear_placements()
-                _CanvasMode.placement = None
-            self._clear_ghosts()
-            self._field.fill(x, y, Mino._)
+    def _begin_edit(self):
+        """Remember the minos and the placement before an edit, unless an
+        edit is already in progress, and stop sharing the loaded cells.
+        """
+        if self._edit_before is None:
+            self._edit_before = (self.cells(), copy(self._mode.placement))
+        self._shared_cells = None
+
+    def _end_edit(self):
+        """Report the edit in progress, if any, to the edit callback, and
+        refresh the reachable placements.
+        """
+        if self._edit_before is not None:
+            before, self._edit_before = self._edit_before, None
+            if self._edit_callback is not None:
+                self._edit_callback(*before)
+        self.refresh_reachable()
+
+    def commit_edit(self):
+        """End the edit in progress, e.g. before undoing, even if a stroke is
+        not finished; the rest of the stroke becomes a new edit.
+        """
+        self._flush_motion()
+        self._end_edit()
+
+    def apply_changes(self, changes, operation, undo):
+        """Apply changes made by diff_cells() (the old minos if undo is set,
+        otherwise the new ones), and set the placement to operation.
+        Only the changed minos, their lines (on lineclear changes), the
+        placements and the ghosts are repainted.
+        """
+        self._clear_ghosts()
+        self._clear_placements()
+        for i in range(0, len(changes), 3):
+            index, old, new = changes[i:i+3]
+            x, line = index % Consts.WIDTH, index // Consts.WIDTH
+            y = Consts.HEIGHT - 1 - line
+            self._fill(x, y, Mino(old if undo else new))
             self._check_lineclear_repaint(x, y)
+        self._mode.placement = copy(operation)
+        self._repaint_placements()
+        self.flush()
+        self.refresh_reachable()
+
+    def _on_press(self, event, action):
+        """Apply the action at the pressed cell immediately."""
+        self._flush_motion()
+        self._begin_edit()
+        self._last_cell = self._event_coords(event)
+        action(*self._last_cell)
+
+    def _queue_motion(self, event, action):
+        """Queue the cells passed by the pointer since the last motion event,
+        and schedule a single flush when Tk becomes idle.
+        Motion events within the same cell are dropped.
+        """
+        cell = self._event_coords(event)
+        if cell == self._last_cell:
+            return
+        self._begin_edit()
+        if action != self._pending_action:
+            self._flush_motion()
+            self._pending_action = action
+        if self._last_cell is None:
+            self._pending_cells.append(cell)
+        else:
+            self._pending_cells += self._line_cells(self._last_cell, cell)[1:]
+        self._last_cell = cell
+        if self._flush_job is None:
+            self._flush_job = self.after_idle(self._flush_motion)
+
+    def _flush_motion(self):
+        """Apply the pending action to the queued cells.
+        Only the last cell matters for placements; for minos, the ghosts are
+        cleared and recomputed once for the whole batch.
+        """
+        if self._flush_job is not None:
+            self.after_cancel(self._flush_job)
+            self._flush_job = None
+        cells, self._pending_cells = self._pending_cells, []
+        if not cells:
+            return
+        if self._pending_action == self._draw_placement:
+            self._draw_placement(*cells[-1])
+        else:
+            self._clear_ghosts()
+            for x, y in cells:
+                self._pending_action(x, y, repaint_ghosts=False)
             self._repaint_ghosts()
 
-    def _paint_mino(self, x, y, mino, type_='normal'):
-        """Retrieve the desired mino fill and outline for paint_mino_at()."""
-        self.paint_mino_at(
-            x, Consts.TOTAL_HEIGHT-2-y,
-            _config.mino_fill(mino, type_), _config.OUTLINE['normal']
-        )
+    @staticmethod
+    def _line_cells(start, end):
+        """Return the mino grid coords on the line from start to end
+        (inclusive), stepping one cell at a time (Bresenham's algorithm).
+        """
+        x, y = start
+        x1, y1 = end
+        dx, dy = abs(x1-x), -abs(y1-y)
+        sx, sy = (1 if x < x1 else -1), (1 if y < y1 else -1)
+        error = dx + dy
+        cells = [(x, y)]
+        while (x, y) != (x1, y1):
+            double_error = 2 * error
+            if double_error >= dy:
+                error += dy
+                x += sx
+            if double_error <= dx:
+                error += dx
+                y += sy
+            cells.append((x, y))
+        return cells
+
+    def _erase_mino(self, x, y, repaint_ghosts=True):
+        """Erase mino at the given mino grid coords.
+        Remove placements if the coords are overlapping with the placement.
+        Clear and repaint ghosts if repaint_ghosts is set.
+        """
+        if self._is_inside_field(x, y):
+            if (x, y) in self._placements:
+                self._clear_placements()
+                self._mode.placement = None
+            if repaint_ghosts:
+                self._clear_ghosts()
+            self._fill(x, y, Mino._)
+            self._check_lineclear_repaint(x, y)
+            if repaint_ghosts:
+                self._repaint_ghosts()
 
-    def on_resize(self, mino_size):
-        """Call super().on_resize() to check if resizing happens,
-        and resize the garbage separator accordingly.
+    def _fill(self, x, y, mino):
+        """Fill the mino at the given mino grid coords, and keep the bitboard
+        and the ghost cache in sync.
         """
-        if super().on_resize(mino_size):
-            self._canvas.coords(
-                self._garbage_separator,
-                0, Consts.HEIGHT*mino_size+1,
-                Consts.WIDTH*mino_size, Consts.HEIGHT*mino_size+1,
-            )
+        self._shared_cells = None
+        self._field.fill(x, y, mino)
+        self._bitboard.fill(x, y, mino)
+        self._ghost_cache.on_fill(x, y)
+
+    def _paint_mino(self, x, y, mino, type_='normal', force=False):
+        """Retrieve the desired mino fill and outline for paint_mino_at().
+        Return the number of canvas items touched.
+        """
+        fill, outline = _config.PALETTE[mino, type_, False]
+        return self.paint_mino_at(
+            x, Consts.TOTAL_HEIGHT-2-y, fill, outline, force,
+        )
 
-    def _draw_mino(self, x, y):
+    def _draw_mino(self, x, y, repaint_ghosts=True):
         """Draw mino at the given mino grid coords.
         Remove placements if the coords are overlapping with the placement.
-        Clear and repaint ghosts.
+        Clear and repaint ghosts if repaint_ghosts is set.
         """
         if self._is_inside_field(x, y):
-            if [x, y] in self._placements:
+            if (x, y) in self._placements:
                 self._clear_placements()
-                _CanvasMode.placement = None
-            self._clear_ghosts()
+                self._mode.placement = None
+            if repaint_ghosts:
+                self._clear_ghosts()
             if self._drawing_mino is None:
                 self._drawing_mino = (
-                    Mino._ if self._field.at(x, y) is _CanvasMode.mino
-                    else _CanvasMode.mino
+                    Mino._ if self._field.at(x, y) is self._mode.mino
+                    else self._mode.mino
                 )
 
             if self._field.at(x, y) is not self._drawing_mino:
-                self._field.fill(x, y, self._drawing_mino)
+                self._fill(x, y, self._drawing_mino)
                 self._check_lineclear_repaint(x, y)
-            self._repaint_ghosts()
+            if repaint_ghosts:
+                self._repaint_ghosts()
 
     def _draw_placement(self, x, y):
         """Convert the event to an Operation and repaint placement."""
-        if _CanvasMode.mino.is_colored():
-            _CanvasMode.placement = Operation(
-                _CanvasMode.mino, _CanvasMode.rotation, x, y,
+        if self._mode.mino.is_colored():
+            self._mode.placement = Operation(
+                self._mode.mino, self._mode.rotation, x, y,
             )
         self._repaint_placements()
 
@@ -158,18 +374,17 @@ class _FieldCanvasFrame(_BaseMinoFrame):
         The garbage line(s) are not affected by lineclears.
         """
         if y >= 0:
-            lineclear = all([px, y] in self._placements
-                            or self._field.at(px, y) is not Mino._
-                            for px in range(self._width))
+            lineclear = self._bitboard.is_full(
+                y, self._placement_rows.get(y, 0))
             if force_repaint or lineclear != self._lineclear[y]:
                 self._lineclear[y] = lineclear
                 repaint_list = [[x, y] for x in range(self._width)]
             else:
                 repaint_list = [[x, y]]
             for x, y in repaint_list:
-                if [x, y] in self._placements:
+                if (x, y) in self._placements:
                     self._paint_mino(
-                        x, y, _CanvasMode.placement.mino, 'placement',
+                        x, y, self._mode.placement.mino, 'placement',
                     )
                 else:
                     self._paint_mino(
@@ -179,43 +394,159 @@ class _FieldCanvasFrame(_BaseMinoFrame):
         else:
             self._paint_mino(x, y, self._field.at(x, y))
 
-    def repaint(self):
-        """Repaint the whole canvas, including placements and ghosts."""
-        self._clear_placements()
-        self._clear_ghosts()
+    def _mino_state(self, x, y):
+        """Return the mino and the highlight type to be painted at the given
+        mino grid coords, according to the field, lineclears, placements and
+        ghosts.
+        """
+        if (x, y) in self._placements:
+            return self._mode.placement.mino, 'placement'
+        mino = self._field.at(x, y)
+        if y >= 0 and self._lineclear[y]:
+            return mino, 'lineclear'
+        if (x, y) in self._ghosts and mino is Mino._:
+            return self._mode.placement.mino, 'ghost'
+        return mino, 'normal'
+
+    def repaint(self, diff=True):
+        """Repaint the whole canvas, including placements and ghosts.
+        The placements, ghosts and lineclears are recomputed first, so that
+        every mino is painted at most once.
+        Keyword arguments:
+        diff: if only the minos whose fill or outline changes should be
+            reconfigured. (default: True)
+        Return the number of canvas items touched.
+        """
+        self._set_placements(None)
+        self._ghosts = set()
+        if self._mode.placement:
+            if self._bitboard.is_placeable(self._mode.placement):
+                self._set_placements(self._mode.placement)
+                self._ghosts = self._coords_set(self._ghost_cache.drop(
+                    self._mode.placement))
+            else:
+                self._mode.placement = None
+
+        touched = 0
         for y in range(-Consts.GARBAGE_HEIGHT, Consts.HEIGHT):
+            if y >= 0:
+                self._lineclear[y] = self._bitboard.is_full(
+                    y, self._placement_rows.get(y, 0))
             for x in range(self._width):
-                self._paint_mino(x, y, self._field.at(x, y), 'normal')
-            self._check_lineclear_repaint(0, y, True)
-        self._repaint_placements()
+                touched += self._paint_mino(
+                    x, y, *self._mino_state(x, y), force=not diff
+                )
+        self.flush()
+        self.refresh_reachable()
+        return touched
+
+    def toggle_reachable(self):
+        """Show or hide the outlines of the placements of the selected mino
+        reachable from spawn.
+        """
+        self._reachable_shown = not self._reachable_shown
+        self.refresh_reachable()
+
+    def refresh_reachable(self):
+        """Redraw the reachable placements if shown (and the mino items
+        exist), and if the occupied minos or the selected mino changed since
+        the last drawing.
+        The placements are cached by (occupied minos, mino).
+        """
+        key = None
+        if (self._reachable_shown and self._items_created
+                and self._mode.mino.is_colored()):
+            key = (self._bitboard.rows(), self._mode.mino)
+        if key == self._reachable_key:
+            return
+        self._reachable_key = key
+        self._canvas.delete('reachable')
+        if key is None:
+            return
+        operations = self._reachable_cache.get(key)
+        if operations is None:
+            operations = reachable_operations(*key)
+            self._reachable_cache[key] = operations
+            while len(self._reachable_cache) > _config.REACHABLE_CACHE_SIZE:
+                self._reachable_cache.popitem(last=False)
+        else:
+            self._reachable_cache.move_to_end(key)
+        outline = _config.PALETTE[self._mode.mino, 'placement', False][0]
+        for operation in operations:
+            self._canvas.create_polygon(
+                *self._outline_coords(operation), fill='', outline=outline,
+                width=1, tags='reachable',
+            )
+
+    def _outline_coords(self, operation):
+        """Return the canvas coords of the outline of an operation, as a
+        flat list of the polygon vertices.
+        """
+        # Directed unit edges, counterclockwise around each mino. The
+        # edges shared by two minos cancel out, leaving the outline.
+        edges = set()
+        for x, y in shape_cells(operation):
+            corners = [(x, y), (x+1, y), (x+1, y+1), (x, y+1)]
+            for edge in zip(corners, corners[1:] + corners[:1]):
+                if edge[::-1] in edges:
+                    edges.remove(edge[::-1])
+                else:
+                    edges.add(edge)
+        edges = dict(edges)
+        start = min(edges)
+        vertex = start
+        coords = []
+        while True:
+            coords += [vertex[0]*self._mino_size + 1,
+                       (Consts.TOTAL_HEIGHT-1-vertex[1])*self._mino_size + 1]
+            vertex = edges[vertex]
+            if vertex == start:
+                return coords
+
+    @staticmethod
+    def _coords_set(operation):
+        """Return the mino grid coords of an operation as a set of tuples,
+        for constant-time membership tests of placements and ghosts.
+        """
+        return set(shape_cells(operation))
+
+    def _set_placements(self, operation):
+        """Replace the set of placement coords with those of the operation,
+        and index them by row as bitmasks for lineclear checks.
+        """
+        self._placements = (set() if operation is None
+                            else self._coords_set(operation))
+        self._placement_rows = {}
+        for x, y in self._placements:
+            self._placement_rows[y] = self._placement_rows.get(y, 0) | 1 << x
 
     def _clear_ghosts(self):
-        """Remove painted ghosts and clear the list of ghost coords."""
+        """Remove painted ghosts and clear the set of ghost coords."""
         for x, y in self._ghosts:
-            if ([x, y] not in self._placements
+            if ((x, y) not in self._placements
                     and self._field.at(x, y) is Mino._):
                 self._paint_mino(x, y, Mino._)
         self._ghosts.clear()
 
     def _repaint_ghosts(self):
-        """Clear ghosts, call Field.drop() to determine the ghost coords of
-        the current placement, and paint ghosts accordingly.
+        """Clear ghosts, look up the ghost cache to determine the ghost coords
+        of the current placement, and paint ghosts accordingly.
         """
         self._clear_ghosts()
-        if _CanvasMode.placement:
-            self._ghosts = self._field.drop(
-                _CanvasMode.placement, False).shape()
+        if self._mode.placement:
+            self._ghosts = self._coords_set(self._ghost_cache.drop(
+                self._mode.placement))
         for x, y in self._ghosts:
-            if ([x, y] not in self._placements
+            if ((x, y) not in self._placements
                     and self._field.at(x, y) is Mino._):
-                self._paint_mino(x, y, _CanvasMode.placement.mino, 'ghost')
+                self._paint_mino(x, y, self._mode.placement.mino, 'ghost')
 
     def _clear_placements(self):
-        """Clear the painted placements and the list of placement coords.
-        Also clear the ghosts and the list of ghost coords.
+        """Clear the painted placements and the set of placement coords.
+        Also clear the ghosts and the set of ghost coords.
         """
-        placements = self._placements[:]
-        self._placements.clear()
+        placements = self._placements
+        self._set_placements(None)
         for x, y in placements:
             self._check_lineclear_repaint(x, y)
         self._clear_ghosts()
@@ -226,50 +557,91 @@ class _FieldCanvasFrame(_BaseMinoFrame):
         """
         self._clear_ghosts()
         self._clear_placements()
-        if _CanvasMode.placement:
-            if self._field.is_placeable(_CanvasMode.placement):
-                self._placements = _CanvasMode.placement.shape()
+        if self._mode.placement:
+            if self._bitboard.is_placeable(self._mode.placement):
+                self._set_placements(self._mode.placement)
                 for x, y in self._placements:
                     self._check_lineclear_repaint(x, y)
                 self._repaint_ghosts()
             else:
-                _CanvasMode.placement = None
+                self._mode.placement = None
 
     def _shift_placement_repaint(self, dx, dy):
-        if _CanvasMode.placement:
-            _CanvasMode.placement.shift(dx, dy)
+        self._ghost_cache.reload()
+        if self._mode.placement:
+            self._mode.placement.shift(dx, dy)
         self.repaint()
+        self._end_edit()
 
     def shift_up(self, amount=1):
+        self._begin_edit()
         self._field.shift_up(amount)
+        self._bitboard.shift_up(amount)
         self._shift_placement_repaint(0, amount)
 
     def shift_down(self, amount=1):
+        self._begin_edit()
         self._field.shift_down(amount)
+        self._bitboard.shift_down(amount)
         self._shift_placement_repaint(0, -amount)
 
     def shift_left(self, amount=1, warp=False):
+        self._begin_edit()
         self._field.shift_left(amount, warp)
+        self._bitboard.shift_left(amount, warp)
         self._shift_placement_repaint(-amount, 0)
 
     def shift_right(self, amount=1, warp=False):
+        self._begin_edit()
         self._field.shift_right(amount, warp)
+        self._bitboard.shift_right(amount, warp)
         self._shift_placement_repaint(amount, 0)
 
     def mirror(self):
-        if _CanvasMode.placement:
-            _CanvasMode.placement.mirror()
+        self._begin_edit()
+        if self._mode.placement:
+            self._mode.placement.mirror()
         self._field.mirror(mirror_color=True)
+        self._bitboard.mirror()
+        self._ghost_cache.reload()
         self.repaint()
+        self._end_edit()
 
     def clear(self):
+        self._begin_edit()
         self._field = Field()
-        _CanvasMode.placement = None
+        self._bitboard.clear()
+        self._ghost_cache.reload()
+        self._mode.placement = None
         self.repaint()
+        self._end_edit()
 
     def field(self):
         return self._field.copy()
 
+    def cells(self):
+        """Return the field packed by pack_field(): the loaded cells if the
+        field was not edited since load_cells().
+        """
+        if self._shared_cells is not None:
+            return self._shared_cells
+        return pack_field(self._field)
+
+    def load_cells(self, cells):
+        """Load the minos packed by pack_field(), e.g. the interned cells
+        of a PageRecord. The cells are shared until the first edit
+        (copy-on-write), so that saving an unedited field neither packs it
+        nor makes a new copy of the minos.
+        """
+        self._load(unpack_field(cells))
+        self._shared_cells = cells
+
     def replace_field(self, field):
-        self._field = field.copy()
+        self._load(field.copy())
+
+    def _load(self, field):
+        self._field = field
+        self._shared_cells = None
+        self._bitboard.load(self._field)
+        self._ghost_cache.reload()
 
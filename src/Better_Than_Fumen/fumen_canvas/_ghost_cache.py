@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from py_fumen_py.constant import FieldConstants as Consts
+
+from ..bitboard import shape_cells
+
+class _GhostCache:
+    """Cache the ghost (the dropped placement) of the field canvas.
+    A per-column height index is kept in sync with the field bitboard, so
+    that most drops are resolved without stepping the operation down.
+    The cached ghost is only invalidated by a changed mino in one of its
+    columns, at or above the row right under the ghost.
+    """
+    def __init__(self, bitboard):
+        """Keyword arguments:
+        bitboard: the FieldBitboard mirroring the field of the canvas.
+        """
+        self._bitboard = bitboard
+        self._heights = [0] * Consts.WIDTH
+        self._key = None
+        self._ghost = None
+        self._landing = {}
+        self.hits = 0
+        self.misses = 0
+        self.reload()
+
+    def reload(self):
+        """Rebuild the height index from the bitboard and invalidate the
+        cached ghost. Called when the whole field changes.
+        """
+        self._heights = [self._column_height(x) for x in range(Consts.WIDTH)]
+        self._key = None
+
+    def _column_height(self, x, top=Consts.HEIGHT):
+        """Return the y coord above the highest mino of column x below top."""
+        for y in range(top-1, -1, -1):
+            if self._bitboard.at(x, y):
+                return y + 1
+        return 0
+
+    def on_fill(self, x, y):
+        """Update the height index after the mino at (x, y) is changed, and
+        invalidate the cached ghost if the change could affect the drop.
+        """
+        if y >= 0:
+            if self._bitboard.at(x, y):
+                self._heights[x] = max(self._heights[x], y+1)
+            elif self._heights[x] == y + 1:
+                self._heights[x] = self._column_height(x, y)
+        if x in self._landing and y >= self._landing[x] - 1:
+            self._key = None
+
+    def drop(self, operation):
+        """Return the dropped operation, as Field.drop(operation, False).
+        The operation is assumed to be placeable on the field. Drops not
+        resolved by the height index are made on the bitboard.
+        """
+        key = (operation.mino, operation.rotation, operation.x, operation.y)
+        if key == self._key:
+            self.hits += 1
+            return self._ghost
+        self.misses += 1
+
+        bottoms = {}
+        for x, y in shape_cells(operation):
+            bottoms[x] = min(y, bottoms.get(x, y))
+        if all(bottom >= self._heights[x] for x, bottom in bottoms.items()):
+            distance = min(bottom - self._heights[x]
+                           for x, bottom in bottoms.items())
+            ghost = operation.shifted(0, -distance)
+        else:
+            ghost = self._bitboard.drop(operation)
+
+        self._key = key
+        self._ghost = ghost
+        self._landing = {x: bottom - operation.y + ghost.y
+                         for x, bottom in bottoms.items()}
+        return ghost
+
+    def stats(self):
+        """Return the cache hit and miss counters for tuning."""
+        return {'hits': self.hits, 'misses': self.misses}
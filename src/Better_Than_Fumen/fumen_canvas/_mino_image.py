@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+from tkinter import PhotoImage
+
+from py_fumen_py import Mino
+
+from ..config import _canvas_config as _config
+
+class _MinoImage:
+    """Render a grid of minos into a single PhotoImage.
+    Each (fill, outline) pair is rendered once into a tile of pixel rows.
+    Painted minos only mark their row dirty; the dirty rows are then written
+    with one PhotoImage.put() per run of consecutive rows.
+    """
+    def __init__(self, widget, width, height, mino_size, background):
+        """Keyword arguments:
+        widget: the tkinter widget owning the image.
+        width: the width of the grid (in minos)
+        height: the height of the grid (in minos)
+        mino_size: the mino size of the grid
+        background: the color shown between the minos
+        """
+        self._widget = widget
+        self._width = width
+        self._height = height
+        self._mino_size = mino_size
+        self._background = self._hex(background)
+        self._cells = [[_config.PALETTE[Mino._, 'normal', False]
+                        for x in range(width)]
+                       for y in range(height)]
+        self._tiles = {}
+        self._dirty_rows = set(range(height))
+        self.photo = PhotoImage(master=widget, width=width*mino_size,
+                                height=height*mino_size)
+        self._flush_job = widget.after_idle(self.flush)
+
+    def _hex(self, color):
+        """Resolve a tkinter color into a #rrggbb string."""
+        return '#{:02x}{:02x}{:02x}'.format(
+            *(value >> 8 for value in self._widget.winfo_rgb(color))
+        )
+
+    def _tile(self, fill, outline):
+        """Return the pixel rows of a mino, rendering it if not cached."""
+        key = (fill, outline)
+        if key not in self._tiles:
+            fill, outline = self._hex(fill), self._hex(outline)
+            size = self._mino_size
+            border = _config.LINE_WIDTH
+            def color(px, py):
+                if px < 1 or py < 1:
+                    return self._background
+                elif (px <= border or py <= border
+                      or px >= size-border or py >= size-border):
+                    return outline
+                else:
+                    return fill
+            self._tiles[key] = [
+                ' '.join(color(px, py) for px in range(size))
+                for py in range(size)
+            ]
+        return self._tiles[key]
+
+    def paint(self, x, y, fill, outline):
+        """Paint mino at the given grid coords, and schedule a flush."""
+        self._cells[y][x] = (fill, outline)
+        self._dirty_rows.add(y)
+        if self._flush_job is None:
+            self._flush_job = self._widget.after_idle(self.flush)
+
+    def _row_data(self, y):
+        """Return the PhotoImage data of the pixel rows of grid row y."""
+        tiles = [self._tile(*cell) for cell in self._cells[y]]
+        return ' '.join(
+            '{' + ' '.join(tile[py] for tile in tiles) + '}'
+            for py in range(self._mino_size)
+        )
+
+    def flush(self):
+        """Write the dirty rows into the image."""
+        if self._flush_job is not None:
+            self._widget.after_cancel(self._flush_job)
+            self._flush_job = None
+        rows = sorted(self._dirty_rows)
+        self._dirty_rows.clear()
+        while rows:
+            start = stop = rows.pop(0)
+            while rows and rows[0] == stop + 1:
+                stop = rows.pop(0)
+            self.photo.put(
+                ' '.join(self._row_data(y) for y in range(start, stop+1)),
+                to=(0, start*self._mino_size),
+            )
+
+    def on_resize(self, mino_size):
+        """Re-render the whole image with the new mino size."""
+        self._mino_size = mino_size
+        self._tiles.clear()
+        self.photo.config(width=self._width*mino_size,
+                          height=self._height*mino_size)
+        self._dirty_rows = set(range(self._height))
+        self.flush()
@@ -12,18 +12,23 @@ from py_fumen_py.constant import FieldConstants as Consts
 
 from ..config import _keys
 from ..config import _canvas_config as _config
-from ._base_mino_frame import _CanvasMode, _BaseMinoFrame
+from ._base_mino_frame import _BaseMinoFrame
 
 class _MinoPickerFrame(_BaseMinoFrame):
     """The frame for mino and rotation selection."""
-    def __init__(self, parent, mino_size, **kwargs):
+    HANDLERS = ['_on_select_mino']
+
+    def __init__(self, parent, mino_size, profiler=None, **kwargs):
         """Keyword arguments:
         parent: the parent of this canvas as a tkinter widget.
         mino_size: the mino size of this canvas
+        profiler: the _Profiler instrumenting the handlers (default: None)
+        mode: the _CanvasMode of the document (default: a new one)
         """
         super().__init__(parent, mino_size,
             len(Mino), len(Rotation)+1, **kwargs)
         self._prev_selection = [4, 0]
+        self._select_callback = None
 
         for y in Mino:
             for x in Rotation:
@@ -35,12 +40,16 @@ class _MinoPickerFrame(_BaseMinoFrame):
                     self._rects[x][y] = None
             self._paint_mino(len(Rotation), y)
 
+        if profiler is not None:
+            profiler.instrument(self, self.HANDLERS)
+            profiler.count_touched(self)
+
         self._canvas.bind(f'<ButtonPress-{_keys.PICKER_SELECT_BTN}>',
                           self._on_select_mino)
 
     def _on_select_mino(self, event):
         """Event handler for mino selection.
-        Update mino, rotation and direct_place in _CanvasMode.
+        Update mino, rotation and direct_place in the _CanvasMode.
         direct_place is reset if the right-most column is selected,
         and is set otherwise.
         direct_place determines whether placement or mino should be drawn
@@ -48,22 +57,26 @@ class _MinoPickerFrame(_BaseMinoFrame):
         """
         x, y = self._event_coords(event)
         if self._is_inside(x, y):
-            _CanvasMode.mino = Mino(y)
-            if x < len(Rotation) and _CanvasMode.mino.is_colored():
-                _CanvasMode.direct_place = True
-                _CanvasMode.rotation = Rotation(x)
+            self._mode.mino = Mino(y)
+            if x < len(Rotation) and self._mode.mino.is_colored():
+                self._mode.direct_place = True
+                self._mode.rotation = Rotation(x)
             else:
-                _CanvasMode.direct_place = False
-                _CanvasMode.rotation = Rotation.SPAWN
+                self._mode.direct_place = False
+                self._mode.rotation = Rotation.SPAWN
             self.repaint()
+            if self._select_callback is not None:
+                self._select_callback()
+
+    def bind_select(self, callback):
+        """Call callback() after a mino is selected."""
+        self._select_callback = callback
 
     def _paint_mino(self, x, y, selected=False):
         """Retreieve the desired mino fill and outline for paint_mino_at()"""
-        self.paint_mino_at(
-            x, y, _config.mino_fill(
-                y, type_='normal' if x == len(Rotation) else 'placement'
-            ),
-            _config.OUTLINE['selected' if selected else 'normal'])
+        self.paint_mino_at(x, y, *_config.PALETTE[
+            y, 'normal' if x == len(Rotation) else 'placement', selected
+        ])
 
     def repaint(self):
         """Repaint according to the new selection.
@@ -73,12 +86,12 @@ class _MinoPickerFrame(_BaseMinoFrame):
         self._paint_mino(x, y)
         self._paint_mino(len(Rotation), y)
         self._prev_selection = [
-            _CanvasMode.rotation.value if _CanvasMode.mino.is_colored()
+            self._mode.rotation.value if self._mode.mino.is_colored()
             else len(Rotation),
-            _CanvasMode.mino.value,
+            self._mode.mino.value,
         ]
         x, y = self._prev_selection
         self._paint_mino(x, y, True)
-        if not _CanvasMode.direct_place:
+        if not self._mode.direct_place:
             self._paint_mino(len(Rotation), y, True)
 
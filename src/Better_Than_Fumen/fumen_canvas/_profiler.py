@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from functools import wraps
+import sys
+from threading import Event, Thread, get_ident
+from time import perf_counter
+import traceback
+
+class _Histogram:
+    """A latency histogram with power-of-two microsecond buckets, plus the
+    most recent samples for exact recent percentiles.
+    """
+    BUCKETS = 32
+
+    def __init__(self, recent=1024):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+        self.recent = deque(maxlen=recent)
+
+    def add(self, seconds):
+        microseconds = int(seconds * 1e6)
+        self.counts[min(microseconds.bit_length(), self.BUCKETS-1)] += 1
+        self.total += 1
+        self.recent.append(seconds)
+
+    def percentile(self, percent):
+        """Return the percentile of the recent samples (in seconds)."""
+        samples = sorted(self.recent)
+        if not samples:
+            return 0
+        return samples[min(len(samples)-1, len(samples) * percent // 100)]
+
+    def buckets(self):
+        """Yield (upper bound in microseconds, count) of the non-empty
+        buckets.
+        """
+        for i, count in enumerate(self.counts):
+            if count:
+                yield 1 << i, count
+
+class _Profiler:
+    """Opt-in latency instrumentation of the event handlers.
+    Each wrapped handler records its latency in a histogram, and the number
+    of minos painted (canvas items touched) during the outermost handler.
+    A watchdog thread logs a stack sample of the Tk thread to stderr when a
+    handler runs longer than the budget.
+    """
+    def __init__(self, budget):
+        """Keyword arguments:
+        budget: the latency budget of a handler (in milliseconds)
+        """
+        self._budget = budget / 1000
+        self.histograms = {}
+        self.last = None
+        self._depth = 0
+        self._touched = 0
+        self._active = None
+        self._tk_thread = get_ident()
+        self._listeners = []
+        self._stopped = Event()
+        self._watchdog = Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
+
+    def instrument(self, widget, names):
+        """Replace the named handler methods of a widget by timed wrappers.
+        This has to be done before the handlers are bound or bound commands.
+        """
+        for name in names:
+            setattr(widget, name, self._wrap(name, getattr(widget, name)))
+
+    def count_touched(self, frame):
+        """Count the canvas items touched by paint_mino_at() of a frame."""
+        paint_mino_at = frame.paint_mino_at
+        @wraps(paint_mino_at)
+        def wrapper(*args, **kwargs):
+            touched = paint_mino_at(*args, **kwargs)
+            self._touched += touched
+            return touched
+        frame.paint_mino_at = wrapper
+
+    def add_listener(self, listener):
+        """Call listener() after each outermost handler."""
+        self._listeners.append(listener)
+
+    def _wrap(self, name, handler):
+        histogram = self.histograms.setdefault(name, _Histogram())
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            outermost = self._depth == 0
+            if outermost:
+                self._touched = 0
+                self._active = [name, perf_counter(), False]
+            self._depth += 1
+            start = perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self._depth -= 1
+                histogram.add(elapsed)
+                if outermost:
+                    sampled = self._active[2]
+                    self._active = None
+                    self.last = (name, elapsed, self._touched)
+                    if elapsed > self._budget and not sampled:
+                        print(f'{name} took {elapsed*1000:.1f} ms',
+                              file=sys.stderr)
+                    for listener in self._listeners:
+                        listener()
+        return wrapper
+
+    def _watch(self):
+        # Sample the stack of the Tk thread once per handler over budget.
+        while not self._stopped.wait(self._budget / 2):
+            active = self._active
+            if active is None or active[2]:
+                continue
+            name, start, sampled = active
+            elapsed = perf_counter() - start
+            if elapsed > self._budget:
+                active[2] = True
+                frame = sys._current_frames().get(self._tk_thread)
+                stack = ''.join(traceback.format_stack(frame)) if frame else ''
+                print(f'{name} over budget ({elapsed*1000:.1f} ms so far), '
+                      f'stack sample:\n{stack}', file=sys.stderr)
+
+    def stop(self):
+        self._stopped.set()
+
+    def summary(self):
+        """Return the last event and the p50/p99 of its handler as text."""
+        if self.last is None:
+            return ''
+        name, elapsed, touched = self.last
+        histogram = self.histograms[name]
+        return (f'{name}: {elapsed*1000:.1f} ms, {touched} items\n'
+                f'p50 {histogram.percentile(50)*1000:.1f} ms, '
+                f'p99 {histogram.percentile(99)*1000:.1f} ms')
+
+    def report(self):
+        """Return the histograms of all the called handlers as text."""
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            if not histogram.total:
+                continue
+            lines.append(
+                f'{name}: {histogram.total} calls, '
+                f'p50 {histogram.percentile(50)*1000:.2f} ms, '
+                f'p99 {histogram.percentile(99)*1000:.2f} ms'
+            )
+            lines += [f'    <{bound:>8} us: {count}'
+                      for bound, count in histogram.buckets()]
+        return '\n'.join(lines)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from queue import Queue, Empty
+from tkinter import ttk, Canvas, PhotoImage
+from tkinter import N, S, E, W
+
+from py_fumen_py.constant import FieldConstants as Consts
+
+from ..bitboard import shape_cells
+from ..config import _keys, _global_config
+from ..config import _canvas_config as _config
+from ._worker_pool import _shared_pool
+
+class _ThumbnailStripFrame(ttk.Frame):
+    """A vertically scrollable strip of page thumbnails.
+    Only the thumbnails in view get a canvas item; the items are recycled
+    while scrolling. The pixels of the thumbnails are rendered by the shared
+    _WorkerPool, and put into images by polling on the Tk thread. The images
+    are kept in an LRU cache keyed by the page content, so that identical
+    pages share one image and scrolling back does not render again.
+    """
+    MARGIN = 3
+
+    def __init__(self, parent, mino_size, **kwargs):
+        """Keyword arguments:
+        parent: the parent of this strip as a tkinter widget.
+        mino_size: the mino size of the thumbnails (in pixels)
+        """
+        super().__init__(parent, **kwargs)
+        self._mino_size = mino_size
+        self._width = Consts.WIDTH * mino_size
+        self._height = Consts.TOTAL_HEIGHT * mino_size
+        self._slot_height = self._height + 2*self.MARGIN
+        self._pages = None
+        self._count = 0
+        self._current = 0
+        self._command = None
+
+        self._slots = {}
+        self._free_items = []
+        self._cache = OrderedDict()
+        self._pending = []
+        self._render_job = None
+        self._rendering = set()
+        self._rendered = Queue()
+        self._collect_job = None
+
+        self._canvas = Canvas(
+            self, width=self._width+2*self.MARGIN, height=self._slot_height,
+            highlightthickness=0, yscrollincrement=self._slot_height,
+            yscrollcommand=self._on_scroll,
+        )
+        self._canvas.grid(column=0, row=0, sticky=(N,S,E,W))
+        self._scrollbar = ttk.Scrollbar(
+            self, orient='vertical', command=self._canvas.yview
+        )
+        self._scrollbar.grid(column=1, row=0, sticky=(N,S))
+        self.rowconfigure(0, weight=1)
+
+        self._selection = self._canvas.create_rectangle(
+            0, 0, self._width+2*self.MARGIN-1, self._slot_height-1,
+            outline=_config.OUTLINE['selected'], width=_config.LINE_WIDTH,
+        )
+
+        self._canvas.bind(f'<ButtonPress-{_keys.CANVAS_DRAW_BTN}>',
+                          self._on_click)
+        self._canvas.bind('<Button-4>', self._on_wheel)
+        self._canvas.bind('<Button-5>', self._on_wheel)
+        self._canvas.bind('<MouseWheel>', self._on_wheel)
+        self._canvas.bind('<Configure>', self._on_configure)
+
+    def bind_command(self, command):
+        """Call command with the page index when a thumbnail is clicked."""
+        self._command = command
+
+    def show(self, pages, current):
+        """Show the thumbnails of a PageStore, with the current page
+        selected and scrolled into view.
+        """
+        self._pages = pages
+        if len(pages) != self._count:
+            self._count = len(pages)
+            self._canvas.configure(scrollregion=(
+                0, 0, self._width+2*self.MARGIN,
+                self._count*self._slot_height,
+            ))
+        self._current = current
+        self._canvas.moveto(self._selection, 0, current*self._slot_height)
+        first, last = self._visible_range()
+        if not first <= current < last:
+            self._canvas.yview_moveto(current / self._count)
+        self._update_view()
+
+    def _visible_range(self):
+        """Return the range of the page indices in view."""
+        top = self._canvas.canvasy(0)
+        bottom = top + self._canvas.winfo_height()
+        return (max(0, int(top // self._slot_height)),
+                min(self._count, int(bottom // self._slot_height) + 1))
+
+    @staticmethod
+    def _key(record):
+        """Return the cache key of a PageRecord, made of its content."""
+        operation = record.operation
+        if operation is None:
+            return (record.cells, None)
+        return (record.cells, (operation.mino, operation.rotation,
+                               operation.x, operation.y))
+
+    def _update_view(self):
+        """Assign canvas items to the thumbnails in view, and queue the
+        thumbnails not cached yet for rendering.
+        """
+        if self._pages is None:
+            return
+        first, last = self._visible_range()
+        for index in list(self._slots):
+            if not first <= index < last:
+                item, key, photo = self._slots.pop(index)
+                self._canvas.itemconfigure(item, image='', state='hidden')
+                self._free_items.append(item)
+
+        for index in range(first, last):
+            key = self._key(self._pages.record(index))
+            slot = self._slots.get(index)
+            if slot is not None and slot[1] == key:
+                continue
+            if slot is None:
+                if self._free_items:
+                    item = self._free_items.pop()
+                else:
+                    item = self._canvas.create_image(0, 0, anchor='nw')
+                    self._canvas.tag_lower(item, self._selection)
+                self._canvas.coords(item, self.MARGIN,
+                                    index*self._slot_height+self.MARGIN)
+            else:
+                item = slot[0]
+            photo = self._cache.get(key)
+            if photo is not None:
+                self._cache.move_to_end(key)
+            else:
+                self._pending.append(index)
+            self._slots[index] = (item, key, photo)
+            self._canvas.itemconfigure(
+                item, image='' if photo is None else photo, state='normal'
+            )
+
+        if self._pending and self._render_job is None:
+            self._render_job = self.after_idle(self._render_next)
+
+    def _render_next(self):
+        """Submit the pending thumbnails still in view for rendering, and
+        poll for the rendered ones.
+        """
+        self._render_job = None
+        for index in self._pending:
+            slot = self._slots.get(index)
+            if slot is None or slot[2] is not None:
+                continue
+            key = slot[1]
+            if key not in self._rendering:
+                self._rendering.add(key)
+                record = self._pages.record(index)
+                _shared_pool().submit(
+                    self._render, self._rendered, key, record.cells,
+                    record.operation, self._mino_size,
+                )
+        self._pending = []
+        if self._rendering and self._collect_job is None:
+            self._collect_job = self.after(_global_config.POLL_INTERVAL,
+                                           self._collect)
+
+    def _collect(self):
+        """Put the rendered thumbnails into images, show them in the slots
+        of their content, and poll again later until none is rendering.
+        """
+        self._collect_job = None
+        while True:
+            try:
+                key, data = self._rendered.get_nowait()
+            except Empty:
+                break
+            self._rendering.discard(key)
+            photo = PhotoImage(master=self, width=self._width,
+                               height=self._height)
+            photo.put(data, to=(0, 0))
+            self._cache[key] = photo
+            while len(self._cache) > _config.THUMBNAIL_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            for index, (item, slot_key, slot_photo) in self._slots.items():
+                if slot_key == key and slot_photo is None:
+                    self._slots[index] = (item, key, photo)
+                    self._canvas.itemconfigure(item, image=photo)
+        if self._rendering:
+            self._collect_job = self.after(_global_config.POLL_INTERVAL,
+                                           self._collect)
+
+    @staticmethod
+    def _color(mino, type_):
+        """Return the #rrggbb color of a mino."""
+        return _config.PALETTE[mino, type_, False][0]
+
+    @staticmethod
+    def _render(rendered, key, cells, operation, size):
+        """Render packed minos and an operation into PhotoImage data, and
+        put it with its cache key into the rendered queue. Run by the worker
+        pool.
+        """
+        lines = [list(cells[i:i+Consts.WIDTH])
+                 for i in range(0, Consts.TOTAL_BLOCK_COUNT, Consts.WIDTH)]
+        colors = [[_ThumbnailStripFrame._color(mino, 'normal')
+                   for mino in line]
+                  for line in lines]
+        if operation is not None:
+            for x, y in shape_cells(operation):
+                if (0 <= x < Consts.WIDTH
+                        and -Consts.GARBAGE_HEIGHT <= y < Consts.HEIGHT):
+                    colors[Consts.HEIGHT-1-y][x] = _ThumbnailStripFrame._color(
+                        operation.mino.value, 'placement')
+        rows = []
+        for line in colors:
+            row = '{' + ' '.join(color for color in line
+                                 for i in range(size)) + '}'
+            rows += [row] * size
+        rendered.put((key, ' '.join(rows)))
+
+    def drop_items(self):
+        """Delete the thumbnail items and images, e.g. while the document is
+        not shown. show() recreates them.
+        """
+        for item, key, photo in self._slots.values():
+            self._canvas.delete(item)
+        self._canvas.delete(*self._free_items)
+        self._slots.clear()
+        self._free_items = []
+        self._cache.clear()
+        self._pending = []
+        self._rendering = set()
+        # Renders still running are put into the previous queue.
+        self._rendered = Queue()
+        for job in [self._render_job, self._collect_job]:
+            if job is not None:
+                self.after_cancel(job)
+        self._render_job = None
+        self._collect_job = None
+
+    def _on_scroll(self, first, last):
+        self._scrollbar.set(first, last)
+        self._update_view()
+
+    def _on_configure(self, event):
+        self._update_view()
+
+    def _on_wheel(self, event):
+        """Scroll the strip by one thumbnail, instead of switching minos."""
+        if event.num == 5 or event.delta < 0:
+            self._canvas.yview_scroll(1, 'units')
+        else:
+            self._canvas.yview_scroll(-1, 'units')
+        return 'break'
+
+    def _on_click(self, event):
+        index = int(self._canvas.canvasy(event.y) // self._slot_height)
+        if 0 <= index < self._count and self._command is not None:
+            self._command(index)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from threading import Condition, Thread
+import traceback
+
+from ..config import _global_config
+
+class _WorkerPool:
+    """A fixed number of daemon threads running the background jobs of all
+    the documents: decoding, encoding and thumbnail rendering.
+    Jobs run in submission order. Long jobs (imports and exports) are
+    never run by the first thread, so that short jobs (renders) are not
+    held up by them, unless the pool has a single thread.
+    Jobs hand over their results themselves, e.g. through a queue drained
+    by the Tk thread; no tkinter call is made by the workers.
+    """
+    def __init__(self, workers):
+        """Keyword arguments:
+        workers: the number of threads, started on the first job
+        """
+        self._workers = max(1, workers)
+        self._threads = []
+        self._short_jobs = deque()
+        self._long_jobs = deque()
+        self._condition = Condition()
+
+    def submit(self, job, *args, long=False):
+        """Run job(*args) on a worker thread once one is free.
+        long: if the job may run for long, e.g. decoding a whole fumen
+            (default: False)
+        """
+        with self._condition:
+            if not self._threads:
+                for i in range(self._workers):
+                    thread = Thread(target=self._work,
+                                    args=(i > 0 or self._workers == 1,),
+                                    daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            (self._long_jobs if long else self._short_jobs).append(
+                (job, args))
+            self._condition.notify_all()
+
+    def _work(self, long):
+        # Run the jobs on a worker thread, the short ones first.
+        while True:
+            with self._condition:
+                while not (self._short_jobs or long and self._long_jobs):
+                    self._condition.wait()
+                jobs = self._short_jobs or self._long_jobs
+                job, args = jobs.popleft()
+            try:
+                job(*args)
+            except Exception:
+                # Jobs report their own errors; this is a bug.
+                traceback.print_exc()
+
+_pool = None
+
+def _shared_pool():
+    """Return the _WorkerPool of the process, with
+    GlobalConfig.WORKER_THREADS threads.
+    """
+    global _pool
+    if _pool is None:
+        _pool = _WorkerPool(_global_config.WORKER_THREADS)
+    return _pool
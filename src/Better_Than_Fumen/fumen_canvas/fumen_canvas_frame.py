@@ -2,6 +2,8 @@
 
 from copy import copy
 from math import floor
+import os
+import sys
 from tkinter import ttk, font, Button, Canvas, Frame, Label
 from tkinter import N, S, E, W
 import tkinter as tk
@@ -12,6 +14,9 @@ from py_fumen_py.constant import FieldConstants as Consts
 
 from ..config import _keys, _global_config
 from ..config import _canvas_config as _config
+from ..history import diff_cells, CellsEdit, History, PageEdit, PagesEdit
+from ..page_store import pack_field, pack_flags, unpack_flags
+from ..page_store import PageRecord, PageStore
 from ._base_mino_frame import _CanvasMode
 from ._field_canvas_frame import _FieldCanvasFrame
 from ._mino_picker_frame import _MinoPickerFrame
@@ -19,22 +24,59 @@ from ._control_panel_frame import _ControlPanelFrame
 
 class FumenCanvasFrame(ttk.Frame):
     """The tkinter frame extension for the Fumen drawing canvas."""
-    def __init__(self, parent):
+    HANDLERS = [
+        '_next_page', '_prev_page', '_first_page', '_last_page',
+        '_select_page', '_delete_page', '_copy_page', '_insert_page',
+        '_on_shift_up', '_on_shift_down', '_on_shift_left', '_on_shift_right',
+        '_on_shiftwarp_toggle', '_on_mirror', '_on_clear',
+        '_on_mino_scroll', '_on_rotation_scroll', '_undo', '_redo',
+        '_import', '_cancel_import', '_poll_import', '_open',
+        '_export', '_cancel_export', '_poll_export', '_save',
+        '_solve', '_cancel_solve', '_poll_solve', '_toggle_reachable',
+        '_find',
+        '_on_resize', '_resize',
+    ]
+
+    def __init__(self, parent, defer=False, bind_all=True):
+        """Keyword arguments:
+        parent: the parent of this frame as a tkinter widget.
+        defer: if the widgets not needed for the first frame (the field
+            items and the thumbnail strip) are created by a timer callback
+            once the window shows, instead of up front. (default: False)
+        bind_all: if the application-wide bindings (see global_bindings())
+            are bound to this frame; otherwise, e.g. in a FumenNotebook,
+            the owner routes them. (default: True)
+        """
         super().__init__(parent)
+        self._mode = _CanvasMode()
+        self._title_callback = None
+        self._suspended = False
 
         _global_config.FONT = font.nametofont(f'Tk{_global_config.FONT_STYLE}Font')
         _global_config.FONT.config(size=_config.MINO_SIZE//2)
+        self._mino_size = _config.MINO_SIZE
+        self._resize_event_size = None
+        self._resize_job = None
+
+        self.profiler = None
+        if _global_config.PROFILE:
+            from ._profiler import _Profiler
+            self.profiler = _Profiler(_global_config.PROFILE_BUDGET)
+            self.profiler.instrument(self, self.HANDLERS)
 
         self._field_frame = _FieldCanvasFrame(
-            self, _config.MINO_SIZE, padding=2
+            self, _config.MINO_SIZE, self.profiler, defer, mode=self._mode,
+            padding=2
         )
         self._field_frame.grid(column=1, row=0, rowspan=2, sticky=(E,W))
 
         self._picker_frame = _MinoPickerFrame(
-            self, floor(_config.MINO_SIZE*_config.PICKER_SIZE_MULT), padding=2
+            self, floor(_config.MINO_SIZE*_config.PICKER_SIZE_MULT),
+            self.profiler, mode=self._mode, padding=2
         )
         self._picker_frame.grid(column=0, row=1, sticky=(S,E))
         self._picker_frame.repaint()
+        self._picker_frame.bind_select(self._field_frame.refresh_reachable)
 
         self._control_frame = _ControlPanelFrame(
             self, _config.MINO_SIZE, padding=2
@@ -47,37 +89,154 @@ class FumenCanvasFrame(ttk.Frame):
             self._on_shift_left, self._on_shift_down,
             self._on_shift_up, self._on_shift_right,
             self._on_shiftwarp_toggle,
-            self._on_mirror, self._on_clear,
+            self._on_mirror, self._on_clear, self._import, self._solve,
+            self._find, self._export, self._open, self._save,
         )
 
-        self._pages = [Page(field=Field(), flags=Flags())]
+        self._thumbnail_frame = None
+
+        if self.profiler is not None:
+            self._overlay = Label(
+                self, font=_global_config.FONT, justify='left',
+                foreground=_global_config.TEXT_COLOR, background='black',
+            )
+            self._overlay.place(in_=self._field_frame, relx=1, x=-4, y=4,
+                                anchor='ne')
+            self._overlay_job = None
+            self.profiler.add_listener(self._schedule_overlay)
+
+        self._pages = PageStore([Page(field=Field(), flags=Flags())])
         self._current_page = 0
+        self._decoder = None
+        self._import_job = None
+        self._import_started = False
+        self._encoder = None
+        self._export_job = None
+        self._export_records = None
+        self._export_version = None
+        self._solver = None
+        self._solver_job = None
+        self._solver_record = None
+        self._solver_field = None
+        self._solutions = []
+        self._history = History(_global_config.HISTORY_BUDGET)
+        self._field_frame.bind_edit(self._on_field_edit)
         self._to_page(0)
 
-        self.bind_all(f'<{_keys.PICKER_WHEEL_MOD}-Button-4>',
-                      self._on_rotation_scroll)
-        self.bind_all(f'<{_keys.PICKER_WHEEL_MOD}-Button-5>',
-                      self._on_rotation_scroll)
-        self.bind_all(f'<{_keys.PICKER_WHEEL_MOD}-MouseWheel>',
-                      self._on_rotation_scroll)
-        self.bind_all('<Button-4>', self._on_mino_scroll)
-        self.bind_all('<Button-5>', self._on_mino_scroll)
-        self.bind_all('<MouseWheel>', self._on_mino_scroll)
-
-        self.bind_all(f'<{_keys.FUMEN_PAGEDOWN}>', self._next_page)
-        self.bind_all(f'<{_keys.FUMEN_PAGEUP}>', self._prev_page)
-        self.bind_all(f'<{_keys.FUMEN_FIRST}>', self._first_page)
-        self.bind_all(f'<{_keys.FUMEN_LAST}>', self._last_page)
+        if defer:
+            self.after(1, self._finish_startup)
+        else:
+            self._finish_startup()
+
+        if bind_all:
+            bound = set()
+            for sequence, handler in self.global_bindings():
+                self.bind_all(sequence, handler,
+                              add='+' if sequence in bound else None)
+                bound.add(sequence)
 
         self.bind(f'<{_keys.CANVAS_SHIFT_MOD}-Up>', self._on_shift_up)
         self.bind(f'<{_keys.CANVAS_SHIFT_MOD}-Down>', self._on_shift_down)
         self.bind(f'<{_keys.CANVAS_SHIFT_MOD}-Left>', self._on_shift_left)
         self.bind(f'<{_keys.CANVAS_SHIFT_MOD}-Right>', self._on_shift_right)
 
-        self.bind_all(f'<ButtonPress-{_keys.CANVAS_EXPORT_BTN}>', self._export)
-
         self.bind('<Configure>', self._on_resize)
 
+    def global_bindings(self):
+        """Return the application-wide bindings of this frame as a list of
+        (sequence, handler) pairs, in binding order.
+        """
+        return [
+            (f'<{_keys.PICKER_WHEEL_MOD}-Button-4>', self._on_rotation_scroll),
+            (f'<{_keys.PICKER_WHEEL_MOD}-Button-5>', self._on_rotation_scroll),
+            (f'<{_keys.PICKER_WHEEL_MOD}-MouseWheel>',
+             self._on_rotation_scroll),
+            ('<Button-4>', self._on_mino_scroll),
+            ('<Button-5>', self._on_mino_scroll),
+            ('<MouseWheel>', self._on_mino_scroll),
+            (f'<{_keys.FUMEN_PAGEDOWN}>', self._next_page),
+            (f'<{_keys.FUMEN_PAGEUP}>', self._prev_page),
+            (f'<{_keys.FUMEN_FIRST}>', self._first_page),
+            (f'<{_keys.FUMEN_LAST}>', self._last_page),
+            (f'<{_keys.FUMEN_IMPORT}>', self._import),
+            (f'<{_keys.FUMEN_EXPORT}>', self._export),
+            (f'<{_keys.FUMEN_OPEN}>', self._open),
+            (f'<{_keys.FUMEN_SAVE}>', self._save),
+            (f'<{_keys.FUMEN_CANCEL}>', self._cancel_import),
+            (f'<{_keys.FUMEN_CANCEL}>', self._cancel_export),
+            (f'<{_keys.FUMEN_CANCEL}>', self._cancel_solve),
+            (f'<{_keys.FUMEN_UNDO}>', self._undo),
+            (f'<{_keys.FUMEN_REDO}>', self._redo),
+            (f'<{_keys.FUMEN_REACHABLE}>', self._toggle_reachable),
+            (f'<ButtonPress-{_keys.CANVAS_EXPORT_BTN}>', self._export),
+        ]
+
+    def bind_title(self, callback):
+        """Call callback with the file name of the document whenever a file
+        is opened or saved.
+        """
+        self._title_callback = callback
+
+    def suspend(self):
+        """Drop the canvas items and the thumbnail images while the document
+        is not shown, keeping only its pages (and the jobs in progress).
+        """
+        self._save_current_page()
+        self._suspended = True
+        self._field_frame.drop_items()
+        self._picker_frame.drop_items()
+        if self._thumbnail_frame is not None:
+            self._thumbnail_frame.drop_items()
+
+    def resume(self):
+        """Recreate what suspend() dropped, if suspended."""
+        if not self._suspended:
+            return
+        self._suspended = False
+        self._field_frame.create_items()
+        self._picker_frame.create_items()
+        self._show_thumbnails()
+
+    def close(self):
+        """Cancel the jobs in progress and the pending callbacks, before
+        this frame is destroyed.
+        """
+        self._cancel_import()
+        self._cancel_export()
+        self._cancel_solve()
+        if self._thumbnail_frame is not None:
+            self._thumbnail_frame.drop_items()
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+            self._resize_job = None
+
+    def _show_thumbnails(self):
+        """Show the pages in the thumbnail strip, unless suspended."""
+        if self._thumbnail_frame is not None and not self._suspended:
+            self._thumbnail_frame.show(self._pages, self._current_page)
+
+    def _finish_startup(self):
+        """Create the widgets deferred until the window shows."""
+        from ._thumbnail_strip_frame import _ThumbnailStripFrame
+
+        if not self._suspended:
+            self._field_frame.create_items()
+        self._thumbnail_frame = _ThumbnailStripFrame(
+            self, _config.THUMBNAIL_MINO_SIZE, padding=2
+        )
+        self._thumbnail_frame.grid(column=2, row=0, rowspan=2, sticky=(N,S))
+        self._thumbnail_frame.bind_command(self._select_page)
+        self._show_thumbnails()
+
+    def _schedule_overlay(self):
+        if self._overlay_job is None:
+            self._overlay_job = self.after_idle(self._update_overlay)
+
+    def _update_overlay(self):
+        """Show the latency of the last event in the profiling overlay."""
+        self._overlay_job = None
+        self._overlay.config(text=self.profiler.summary())
+
     def _on_mino_scroll(self, event):
         """Event handler for scrolling wihtout a modifier key.
         Switch to the next or the previous mino if scrolling is enabled.
@@ -89,8 +248,9 @@ class FumenCanvasFrame(ttk.Frame):
                 delta = -1
             if _keys.PICKER_WHEEL_REVERSED:
                 delta *= -1
-            _CanvasMode.mino = _CanvasMode.mino.shifted(delta)
+            self._mode.mino = self._mode.mino.shifted(delta)
             self._picker_frame.repaint()
+            self._field_frame.refresh_reachable()
 
     def _on_rotation_scroll(self, event):
         """Event handler for scrolling with the desired modifier key.
@@ -103,22 +263,38 @@ class FumenCanvasFrame(ttk.Frame):
                 delta = -1
             if _keys.PICKER_WHEEL_REVERSED:
                 delta *= -1
-            _CanvasMode.rotation = _CanvasMode.rotation.shifted(delta)
+            self._mode.rotation = self._mode.rotation.shifted(delta)
             self._picker_frame.repaint()
 
+    def _toggle_reachable(self, event=None):
+        self._field_frame.toggle_reachable()
+
     def _save_current_page(self):
-        """Save the _FieldCanvas to the viewed page."""
-        page = self._pages[self._current_page]
-        page.field = self._field_frame.field()
-        page.operation = copy(_CanvasMode.placement)
+        """Save the _FieldCanvas to the viewed page, ending the edit in
+        progress first, so that a stroke is recorded on the page it was
+        drawn on even if the page is switched before the stroke ends.
+        The page is only updated if it was modified, so that its encoded
+        segment stays cached.
+        """
+        self._field_frame.commit_edit()
+        record = self._pages.record(self._current_page)
+        cells = self._field_frame.cells()
+        if (cells != record.cells
+                or self._mode.placement != record.operation):
+            self._pages.update(
+                self._current_page,
+                cells=cells,
+                operation=copy(self._mode.placement),
+            )
 
     def _to_page(self, page):
         """Load page to _FieldCanvas."""
         self._current_page = page
-        self._field_frame.replace_field(self._pages[page].field)
-        _CanvasMode.placement = self._pages[page].operation
+        self._field_frame.load_cells(self._pages.record(page).cells)
+        self._mode.placement = copy(self._pages.record(page).operation)
         self._field_frame.repaint()
         self._control_frame.update_page_label(page, len(self._pages))
+        self._show_thumbnails()
 
     def _next_page(self, event=None):
         """Switch to the next page.
@@ -126,20 +302,23 @@ class FumenCanvasFrame(ttk.Frame):
         self._save_current_page()
         page = self._current_page + 1
         if page >= len(self._pages):
-            last_page = self._pages[-1]
-            field = last_page.field.copy()
+            if self._decoder is not None:
+                return
+            last_page = self._pages.record(-1)
+            flags = unpack_flags(last_page.flags)
+            field = last_page.field()
             field.apply_action(Action(
                 last_page.operation if last_page.operation
                 else Operation(Mino._, Rotation.REVERSE, 0, Consts.HEIGHT-1),
-                last_page.flags.rise,
-                last_page.flags.mirror,
+                flags.rise,
+                flags.mirror,
                 None,
                 None,
-                last_page.flags.lock,
+                flags.lock,
             ))
-            self._pages.append(Page(
-                field=field,
-                flags=copy(last_page.flags),
+            self._pages.insert_record(len(self._pages), PageRecord(
+                cells=pack_field(field),
+                flags=last_page.flags,
                 comment=last_page.comment,
             ))
         self._to_page(page)
@@ -152,6 +331,10 @@ class FumenCanvasFrame(ttk.Frame):
         if page >= 0:
             self._to_page(page)
 
+    def _select_page(self, page):
+        self._save_current_page()
+        self._to_page(page)
+
     def _first_page(self, event=None):
         self._save_current_page()
         self._to_page(0)
@@ -162,35 +345,92 @@ class FumenCanvasFrame(ttk.Frame):
 
     def _delete_page(self, event=None):
         if len(self._pages) > 1:
+            self._save_current_page()
+            self._history.push(PageEdit(
+                self._current_page, self._pages.record(self._current_page),
+                inserted=False,
+            ))
             del self._pages[self._current_page]
             self._to_page(max(0, self._current_page-1))
 
     def _copy_page(self, event=None):
         self._save_current_page()
-        copied_page = self._pages[self._current_page]
-        self._pages.insert(self._current_page, Page(
-            field=copied_page.field.copy(),
-            operation=copied_page.operation.shifted(0, 0)
-                      if copied_page.operation else None,
-            flags=Flags(
+        copied_page = self._pages.record(self._current_page)
+        flags = unpack_flags(copied_page.flags)
+        self._pages.insert_record(self._current_page, PageRecord(
+            cells=copied_page.cells,
+            operation=copy(copied_page.operation),
+            flags=pack_flags(Flags(
                 lock=False,
                 mirror=False,
-                colorize=copied_page.flags.colorize,
+                colorize=flags.colorize,
                 rise=False,
-                quiz=copied_page.flags.quiz,
-            ),
+                quiz=flags.quiz,
+            )),
             comment=copied_page.comment
         ))
+        self._history.push(PageEdit(
+            self._current_page, self._pages.record(self._current_page),
+            inserted=True,
+        ))
         self._to_page(self._current_page)
 
     def _insert_page(self, event=None):
         self._save_current_page()
-        self._pages.insert(self._current_page, Page(
-            field=Field(),
-            flags=Flags(),
+        self._pages.insert_record(self._current_page, PageRecord())
+        self._history.push(PageEdit(
+            self._current_page, self._pages.record(self._current_page),
+            inserted=True,
         ))
         self._to_page(self._current_page)
 
+    def _on_field_edit(self, cells, operation):
+        """Record an edit of the _FieldCanvas, given the minos and the
+        placement before the edit, as the changed minos only.
+        """
+        changes = diff_cells(cells, self._field_frame.cells())
+        if changes or operation != self._mode.placement:
+            self._history.push(CellsEdit(
+                self._current_page, changes,
+                operation, copy(self._mode.placement),
+            ))
+
+    def _undo(self, event=None):
+        self._step_history(undo=True)
+
+    def _redo(self, event=None):
+        self._step_history(undo=False)
+
+    def _step_history(self, undo):
+        """Undo or redo the last edit, switching to the edited page."""
+        if self._decoder is not None:
+            return
+        self._field_frame.commit_edit()
+        entry = self._history.undo() if undo else self._history.redo()
+        if entry is None:
+            return
+        self._save_current_page()
+        if isinstance(entry, CellsEdit):
+            if entry.page != self._current_page:
+                self._to_page(entry.page)
+            self._field_frame.apply_changes(
+                entry.changes, entry.before if undo else entry.after, undo)
+        elif isinstance(entry, PagesEdit):
+            if undo:
+                for record in entry.records:
+                    del self._pages[entry.page]
+                self._to_page(min(entry.page-1, len(self._pages)-1))
+            else:
+                for i, record in enumerate(entry.records):
+                    self._pages.insert_record(entry.page+i, record)
+                self._to_page(entry.page)
+        elif entry.inserted != undo:
+            self._pages.insert_record(entry.page, entry.record)
+            self._to_page(entry.page)
+        else:
+            del self._pages[entry.page]
+            self._to_page(min(entry.page, len(self._pages)-1))
+
     def _on_shift_up(self, event=None):
         self._field_frame.shift_up()
 
@@ -198,13 +438,13 @@ class FumenCanvasFrame(ttk.Frame):
         self._field_frame.shift_down()
 
     def _on_shift_left(self, event=None):
-        self._field_frame.shift_left(warp=_CanvasMode.shiftwarp)
+        self._field_frame.shift_left(warp=self._mode.shiftwarp)
 
     def _on_shift_right(self, event=None):
-        self._field_frame.shift_right(warp=_CanvasMode.shiftwarp)
+        self._field_frame.shift_right(warp=self._mode.shiftwarp)
 
     def _on_shiftwarp_toggle(self, event=None):
-        _CanvasMode.shiftwarp = not _CanvasMode.shiftwarp
+        self._mode.shiftwarp = not self._mode.shiftwarp
 
     def _on_mirror(self, event=None):
         self._field_frame.mirror()
@@ -212,18 +452,336 @@ class FumenCanvasFrame(ttk.Frame):
     def _on_clear(self, event=None):
         self._field_frame.clear()
 
-    def _export(self, event):
+    def _import(self, event=None, path=None):
+        """Import the fumen string in the clipboard, or in the file at path,
+        on a worker thread.
+        The current document is replaced once the first page is decoded.
+        Cancel the import instead if an import is in progress.
+        """
+        if self._decoder is not None:
+            self._cancel_import()
+            return
+        string = None
+        if path is None:
+            try:
+                string = self.clipboard_get()
+            except tk.TclError:
+                return
         self._save_current_page()
-        print(encode(self._pages))
+        from ._background_decoder import _BackgroundDecoder
+
+        self._decoder = _BackgroundDecoder(string, path=path)
+        self._decoder.start()
+        if path is not None and self._title_callback is not None:
+            self._title_callback(os.path.basename(path))
+        self._import_started = False
+        self._control_frame.set_importing(True)
+        self._control_frame.update_transfer_label('Importing')
+        self._poll_import()
+
+    def _open(self, event=None):
+        """Ask for a file, and import the fumen string in it.
+        Cancel the import instead if an import is in progress.
+        """
+        if self._decoder is not None:
+            self._cancel_import()
+            return
+        from tkinter import filedialog
+
+        path = filedialog.askopenfilename(
+            parent=self, title='Open fumen',
+            filetypes=[('Text files', '*.txt'), ('All files', '*')],
+        )
+        if path:
+            self._import(path=path)
+
+    def _cancel_import(self, event=None):
+        """Stop the import in progress, keeping the pages decoded so far."""
+        if self._decoder is not None:
+            self._decoder.cancel()
+            records, done, error = self._decoder.poll()
+            self._insert_decoded(records)
+            self._finish_import()
+            self._control_frame.update_transfer_label('Import cancelled')
+
+    def _poll_import(self):
+        """Move the decoded pages into the document, and poll again later
+        until the decoding ends.
+        """
+        records, done, error = self._decoder.poll()
+        if records:
+            self._insert_decoded(records)
+            self._control_frame.update_transfer_label(
+                f'Importing: {len(self._pages)} pages')
+        if error is not None:
+            print(f'Import failed: {error}', file=sys.stderr)
+            self._control_frame.update_transfer_label('Import failed')
+        elif done:
+            self._control_frame.update_transfer_label(
+                f'Imported {len(self._pages)} pages')
+        if done:
+            self._finish_import()
+        else:
+            self._import_job = self.after(_global_config.POLL_INTERVAL,
+                                          self._poll_import)
+
+    def _insert_decoded(self, records):
+        """Append decoded records to the document, replacing it with them
+        if they are the first ones.
+        """
+        if not records:
+            return
+        if not self._import_started:
+            self._field_frame.commit_edit()
+            self._pages = PageStore()
+            self._history.clear()
+        for record in records:
+            self._pages.insert_record(len(self._pages), record)
+        if not self._import_started:
+            self._import_started = True
+            self._to_page(0)
+        else:
+            self._control_frame.update_page_label(
+                self._current_page, len(self._pages))
+            self._show_thumbnails()
+
+    def _finish_import(self):
+        if self._decoder is not None:
+            if self._import_job is not None:
+                self.after_cancel(self._import_job)
+            self._decoder = None
+            self._import_job = None
+            self._control_frame.set_importing(False)
+
+    def _solve(self, event=None):
+        """Search the perfect clears of the viewed field with the minos
+        typed in the queue entry, in worker processes.
+        The solutions are inserted as new pages after the solved page once
+        the search ends. Cancel the search instead if one is in progress.
+        """
+        if self._solver is not None:
+            self._cancel_solve()
+            return
+        from ..solver import parse_queue
+        from ._background_solver import _BackgroundSolver
+
+        try:
+            queue = parse_queue(self._control_frame.solver_queue())
+        except ValueError as e:
+            self._control_frame.update_solver_label(str(e))
+            return
+        self._save_current_page()
+        self._solver_record = self._pages.record(self._current_page)
+        self._solver_field = self._solver_record.field()
+        self._solutions = []
+        self._solver = _BackgroundSolver(
+            self._solver_field, queue, _global_config.SOLVER_HEIGHT,
+            _global_config.SOLVER_HOLD, _global_config.SOLVER_LIMIT,
+            _global_config.SOLVER_WORKERS or None,
+        )
+        self._solver.start()
+        self._control_frame.set_solving(True)
+        self._control_frame.update_solver_label('Solving')
+        self._solver_job = self.after(_global_config.POLL_INTERVAL,
+                                      self._poll_solve)
+
+    def _cancel_solve(self, event=None):
+        """Stop the search in progress, keeping the solutions found."""
+        if self._solver is not None:
+            self._solver.cancel()
+            solutions, progress, done, error = self._solver.poll()
+            self._solutions += solutions
+            self._finish_solve()
+
+    def _poll_solve(self):
+        """Show the progress of the search, and poll again later until
+        the search ends.
+        """
+        solutions, progress, done, error = self._solver.poll()
+        self._solutions += solutions
+        if progress is not None:
+            self._control_frame.update_solver_label(
+                f'{progress[0]}/{progress[1]}: {len(self._solutions)} found')
+        if error is not None:
+            self._control_frame.update_solver_label(str(error))
+        if done:
+            self._finish_solve()
+        else:
+            self._solver_job = self.after(_global_config.POLL_INTERVAL,
+                                          self._poll_solve)
+
+    def _finish_solve(self):
+        """Insert the pages of the solutions found after the solved page,
+        as one undoable edit.
+        """
+        from ..solver import solution_pages
+
+        if self._solver_job is not None:
+            self.after_cancel(self._solver_job)
+        self._solver = None
+        self._solver_job = None
+        self._control_frame.set_solving(False)
+        record = self._solver_record
+        self._solver_record = None
+        if not self._solutions:
+            return
+        self._save_current_page()
+        try:
+            first = self._pages.positions([record])[0] + 1
+        except KeyError:
+            # The solved page was deleted (or replaced by an import) during
+            # the search.
+            first = self._current_page + 1
+        records = []
+        for i, solution in enumerate(self._solutions):
+            for page in solution_pages(
+                    self._solver_field, solution,
+                    f'PC {i+1}/{len(self._solutions)}'):
+                self._pages.insert(first+len(records), page)
+                records.append(self._pages.record(first+len(records)))
+        self._history.push(PagesEdit(first, records))
+        self._solutions = []
+        self._to_page(first)
+
+    def _find(self, event=None):
+        """Jump to the next page (wrapping around) matching the row pattern
+        typed in the search entry, or, if the entry is empty, to the next
+        page whose field equals the viewed one.
+        """
+        from ..page_index import parse_pattern
+
+        self._save_current_page()
+        text = self._control_frame.search_text()
+        index = self._pages.index()
+        if text.strip():
+            try:
+                matches = index.containing(parse_pattern(text))
+            except ValueError as e:
+                self._control_frame.update_find_label(str(e))
+                return
+        else:
+            matches = index.same_field(
+                self._pages.record(self._current_page).cells)
+        positions = self._pages.positions(matches)
+        if not positions:
+            self._control_frame.update_find_label('No match')
+            return
+        following = [page for page in positions if page > self._current_page]
+        page = following[0] if following else positions[0]
+        self._control_frame.update_find_label(
+            f'{positions.index(page)+1}/{len(positions)}')
+        self._to_page(page)
+
+    def _export(self, event=None, path=None):
+        """Encode the pages on a worker thread, then copy the fumen string
+        to the clipboard, or write it to the file at path as it is encoded.
+        The pages are copied first, so that they can be edited meanwhile.
+        Cancel the export instead if an export is in progress.
+        """
+        if self._encoder is not None:
+            self._cancel_export()
+            return
+        if self._decoder is not None:
+            return
+        from ._background_encoder import _BackgroundEncoder
+
+        self._save_current_page()
+        self._export_records = self._pages.snapshot()
+        self._export_version = self._pages.version()
+        self._encoder = _BackgroundEncoder(self._export_records, path)
+        self._encoder.start()
+        if path is not None and self._title_callback is not None:
+            self._title_callback(os.path.basename(path))
+        self._control_frame.set_exporting(True)
+        self._poll_export()
+
+    def _save(self, event=None):
+        """Ask for a file, and export the pages to it.
+        Cancel the export instead if an export is in progress.
+        """
+        if self._encoder is not None:
+            self._cancel_export()
+            return
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(
+            parent=self, title='Save fumen', defaultextension='.txt',
+            filetypes=[('Text files', '*.txt'), ('All files', '*')],
+        )
+        if path:
+            self._export(path=path)
+
+    def _cancel_export(self, event=None):
+        """Stop the export in progress, leaving the clipboard and the file
+        untouched.
+        """
+        if self._encoder is not None:
+            self._encoder.cancel()
+            self._finish_export()
+            self._control_frame.update_transfer_label('Export cancelled')
+
+    def _poll_export(self):
+        """Show the progress of the export, and poll again later until the
+        encoding ends; then cache the encoded segments, and copy the fumen
+        string to the clipboard unless it was written to a file.
+        """
+        (encoded, total), done, string, error = self._encoder.poll()
+        if error is not None:
+            print(f'Export failed: {error}', file=sys.stderr)
+            self._control_frame.update_transfer_label('Export failed')
+        elif done:
+            self._pages.restore_segments(self._export_records,
+                                         self._export_version)
+            if string is not None:
+                self.clipboard_clear()
+                self.clipboard_append(string)
+            self._control_frame.update_transfer_label(
+                f'{"Saved" if string is None else "Copied"} {total} pages')
+        else:
+            self._control_frame.update_transfer_label(
+                f'Exporting: {encoded*100//total}%')
+        if done:
+            self._finish_export()
+        else:
+            self._export_job = self.after(_global_config.POLL_INTERVAL,
+                                          self._poll_export)
+
+    def _finish_export(self):
+        if self._export_job is not None:
+            self.after_cancel(self._export_job)
+        self._encoder = None
+        self._export_job = None
+        self._export_records = None
+        self._control_frame.set_exporting(False)
+
+    def memory_report(self):
+        """Return the memory report of the pages as text."""
+        return self._pages.memory_report()
 
     def _on_resize(self, event):
+        """Debounce the Configure events, so that only the final size of a
+        burst is applied to the underlying canvases.
+        """
+        self._resize_event_size = (event.width, event.height)
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(_config.RESIZE_DELAY, self._resize)
+
+    def _resize(self):
         """Calculate the maximum suitable mino size
-        and resize the underlying canvases.
+        and resize the underlying canvases if the mino size changes.
         """
-        max_width = floor((event.width - 4)
+        self._resize_job = None
+        width, height = self._resize_event_size
+        strip_width = (0 if self._thumbnail_frame is None
+                       else self._thumbnail_frame.winfo_width())
+        max_width = floor((width - 4 - strip_width)
             / (Consts.WIDTH + (len(Rotation)+1) * _config.PICKER_SIZE_MULT))
-        max_height = (event.height - 4) // (Consts.TOTAL_HEIGHT)
+        max_height = (height - 4) // (Consts.TOTAL_HEIGHT)
         mino_size = min(max_width, max_height)
+        if mino_size == self._mino_size or mino_size <= 0:
+            return
+        self._mino_size = mino_size
         _global_config.FONT.config(size=mino_size//2)
         self._field_frame.on_resize(mino_size)
         self._picker_frame.on_resize(
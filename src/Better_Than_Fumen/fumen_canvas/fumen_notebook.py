@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from tkinter import ttk
+
+from ..config import _keys
+from .fumen_canvas_frame import FumenCanvasFrame
+
+class FumenNotebook(ttk.Notebook):
+    """The tkinter notebook extension for editing several fumens, one
+    FumenCanvasFrame per tab, each with its own pages and _CanvasMode.
+    The application-wide bindings are bound once, and routed to the shown
+    tab. The other tabs are suspended: they keep their pages and their jobs
+    in progress, but not their canvas items. The background jobs of all
+    the tabs share one _WorkerPool.
+    """
+    def __init__(self, parent, defer=False, **kwargs):
+        """Keyword arguments:
+        parent: the parent of this notebook as a tkinter widget.
+        defer: if the widgets of the first tab not needed for the first
+            frame are created once the window shows (default: False)
+        """
+        super().__init__(parent, **kwargs)
+        self._frames = []
+        self._handlers = {}
+        self._routed = set()
+        self._current = None
+        self._untitled = 0
+
+        self.new_tab(defer=defer)
+        self.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        self.bind_all(f'<{_keys.FUMEN_NEW_TAB}>', self.new_tab)
+        self.bind_all(f'<{_keys.FUMEN_CLOSE_TAB}>', self.close_tab)
+
+    def frames(self):
+        """Return the FumenCanvasFrames of the tabs, in tab order."""
+        return self._frames[:]
+
+    def current(self):
+        """Return the FumenCanvasFrame of the shown tab."""
+        return self._current
+
+    def new_tab(self, event=None, defer=False):
+        """Add a tab with an empty fumen, and show it."""
+        frame = FumenCanvasFrame(self, defer=defer, bind_all=False)
+        handlers = {}
+        for sequence, handler in frame.global_bindings():
+            handlers.setdefault(sequence, []).append(handler)
+            if sequence not in self._routed:
+                self._routed.add(sequence)
+                self.bind_all(sequence, lambda event, sequence=sequence:
+                              self._route(sequence, event))
+        self._handlers[frame] = handlers
+        self._frames.append(frame)
+
+        self._untitled += 1
+        self.add(frame, text=f'Untitled {self._untitled}')
+        frame.bind_title(lambda title: self.tab(frame, text=title))
+        self.select(frame)
+        self._show(frame)
+        return frame
+
+    def close_tab(self, event=None):
+        """Close the shown tab, cancelling its jobs in progress, unless it
+        is the only one.
+        """
+        if len(self._frames) <= 1:
+            return
+        frame = self._current
+        index = self._frames.index(frame)
+        self._current = None
+        self._frames.remove(frame)
+        del self._handlers[frame]
+        frame.close()
+        self.forget(frame)
+        frame.destroy()
+        shown = self._frames[min(index, len(self._frames)-1)]
+        self.select(shown)
+        self._show(shown)
+
+    def _on_tab_changed(self, event):
+        self._show(self.nametowidget(self.select()))
+
+    def _show(self, frame):
+        """Suspend the previously shown tab, and resume frame."""
+        if frame is self._current:
+            return
+        if self._current is not None:
+            self._current.suspend()
+        self._current = frame
+        frame.resume()
+        frame.focus_set()
+
+    def _route(self, sequence, event):
+        """Call the handlers of the shown tab bound to sequence."""
+        if self._current is None:
+            return None
+        result = None
+        for handler in self._handlers[self._current].get(sequence, ()):
+            if handler(event) == 'break':
+                result = 'break'
+        return result
+
+    def memory_report(self):
+        """Return the memory reports of the tabs as text."""
+        return '\n'.join(
+            f'{self.tab(frame, "text")}: {frame.memory_report()}'
+            for frame in self._frames
+        )
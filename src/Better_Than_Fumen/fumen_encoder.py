@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+from py_fumen_py import Field, Mino, Operation, Rotation
+from py_fumen_py.action import Action, ActionCodec
+from py_fumen_py.comment import CommentCodec
+from py_fumen_py.constant import FieldConstants as Consts
+from py_fumen_py.constant import FumenStringConstants
+from py_fumen_py.fumen_buffer import FumenBuffer
+from py_fumen_py.js_escape import escape, escaped_compare
+from py_fumen_py.quiz import Quiz
+
+from .page_store import pack_field, unpack_flags
+
+_MAX_REPEAT_COUNT = FumenBuffer.TABLE_LENGTH - 1
+
+class Segment:
+    """The encoded contribution of one page to a fumen string.
+    field is None if the field of the page repeats the previous one; the
+    repeating count is then written when the segments are joined.
+    """
+    __slots__ = ('field', 'tail')
+
+    def __init__(self, field, tail):
+        self.field = field
+        self.tail = tail
+
+def _symbols(values):
+    # Convert (value, length) pairs into fumen string symbols.
+    symbols = []
+    for value, length in values:
+        for i in range(length):
+            value, remainder = divmod(value, FumenBuffer.TABLE_LENGTH)
+            symbols.append(FumenBuffer.ENCODING_TABLE[remainder])
+    return ''.join(symbols)
+
+_EMPTY_FIELD_SYMBOLS = _symbols(
+    [(8*Consts.TOTAL_BLOCK_COUNT+Consts.TOTAL_BLOCK_COUNT-1, 2)])
+
+def _action(record, comment=False):
+    # Return the Action written for a PageRecord.
+    flags = unpack_flags(record.flags)
+    operation = (
+        Operation(Mino._, Rotation.REVERSE, 0, Consts.HEIGHT-1)
+        if record.operation is None else record.operation
+    )
+    return Action(operation, flags.rise, flags.mirror, flags.colorize,
+                  comment, flags.lock)
+
+def encode_segment(previous, record):
+    """Encode a PageRecord following the previous PageRecord (None for the
+    first page) exactly as py_fumen_py.encode() does, and return a Segment.
+    """
+    if previous is None:
+        base = Field()
+        prev_comment = ''
+        prev_lock = False
+        prev_mino = Mino._
+    else:
+        previous_action = _action(previous)
+        base = previous.field()
+        base.apply_action(previous_action)
+        prev_comment = previous.comment if previous.comment else ''
+        prev_lock = previous_action.lock
+        prev_mino = previous_action.operation.mino
+    quiz = Quiz(prev_comment)
+    if prev_lock:
+        quiz.step(prev_mino)
+    prev_comment = str(quiz)
+
+    diffs = [mino - base_mino
+             for mino, base_mino in zip(record.cells, pack_field(base))]
+    if any(diffs):
+        values = []
+        prev_diff = diffs[0]
+        length = -1
+        for diff in diffs:
+            if diff != prev_diff:
+                values.append(
+                    ((prev_diff+8)*Consts.TOTAL_BLOCK_COUNT+length, 2))
+                length = 0
+                prev_diff = diff
+            else:
+                length += 1
+        values.append(((prev_diff+8)*Consts.TOTAL_BLOCK_COUNT+length, 2))
+        field = _symbols(values)
+    else:
+        field = None
+
+    action = _action(
+        record, not escaped_compare(record.comment, prev_comment, 4095))
+    values = [(ActionCodec.encode(Consts, action), 3)]
+    comment = escape(record.comment)[:4095]
+    if comment != escape(prev_comment)[:4095]:
+        length, encoded_comments = CommentCodec.encode(comment)
+        values.append((length, 2))
+        values += [(value, 5) for value in encoded_comments]
+    return Segment(field, _symbols(values))
+
+def iter_join_segments(segments, chunk_size=1 << 16):
+    """Join the Segments of all the pages into a fumen string as
+    join_segments() does, and yield it in chunks of about chunk_size
+    characters (more if a field repeats over many pages), so that a long
+    fumen can be written out as it is encoded.
+    """
+    data = [FumenStringConstants.VERSION_INFO]
+    size = 0
+    written = 0
+    repeat_count = -1
+    repeat_index = None
+    for segment in segments:
+        if segment.field is not None:
+            data.append(segment.field)
+            size += len(segment.field)
+            repeat_count = -1
+        else:
+            if 0 <= repeat_count < _MAX_REPEAT_COUNT:
+                repeat_count += 1
+            else:
+                repeat_count = 0
+                data.append(_EMPTY_FIELD_SYMBOLS)
+                repeat_index = len(data)
+                data.append(None)
+            data[repeat_index] = _symbols([(repeat_count, 1)])
+        data.append(segment.tail)
+        size += len(segment.tail)
+        # The repeating count of a field is only final at the end of its
+        # repetition.
+        if size >= chunk_size and repeat_count in (-1, _MAX_REPEAT_COUNT):
+            chunk = ''.join(data)
+            yield _split_blocks(chunk, written)
+            written += len(chunk)
+            data = []
+            size = 0
+    yield _split_blocks(''.join(data), written)
+
+def _split_blocks(chunk, written):
+    # Insert the block separators into a chunk of a fumen string, after the
+    # first written characters.
+    block_size = FumenStringConstants.BLOCK_SIZE
+    first = -written % block_size
+    blocks = [chunk[:first]]
+    for i in range(first, len(chunk), block_size):
+        if written + i:
+            blocks.append('?')
+        blocks.append(chunk[i:i+block_size])
+    return ''.join(blocks)
+
+def join_segments(segments):
+    """Join the Segments of all the pages into a fumen string, writing the
+    field repeating counts as FumenBufferWriter does.
+    """
+    return ''.join(iter_join_segments(segments))
+
+def _segments(records):
+    # Yield the Segments of PageRecords, encoding those marked dirty.
+    previous = None
+    for record in records:
+        if record.segment is None:
+            record.segment = encode_segment(previous, record)
+        previous = record
+        yield record.segment
+
+def iter_encode_records(records, chunk_size=1 << 16):
+    """Encode PageRecords into a fumen string as encode_records() does, and
+    yield it in chunks (see iter_join_segments()) as the records are
+    encoded.
+    """
+    return iter_join_segments(_segments(records), chunk_size)
+
+def encode_records(records):
+    """Encode PageRecords into a fumen string.
+    Only the records whose segment is None (i.e. marked dirty) are encoded;
+    the segments of the others are reused.
+    """
+    return ''.join(iter_encode_records(records))
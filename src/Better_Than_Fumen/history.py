@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+
+# A rough per-entry overhead (the object, its slots and the Operations),
+# added to the size of the diff when accounting for the byte budget.
+_ENTRY_OVERHEAD = 200
+
+def diff_cells(old, new):
+    """Return the changes from old to new (cells packed by pack_field()) as
+    bytes of (index, old mino, new mino) triples.
+    """
+    return bytes(value
+                 for i, (a, b) in enumerate(zip(old, new)) if a != b
+                 for value in (i, a, b))
+
+class CellsEdit:
+    """An undoable change of the minos and/or the operation of a page.
+    Only the changed minos are kept, as made by diff_cells().
+    """
+    __slots__ = ('page', 'changes', 'before', 'after')
+
+    def __init__(self, page, changes, before, after):
+        """Keyword arguments:
+        page: the index of the edited page
+        changes: the changed minos, as made by diff_cells()
+        before: the Operation of the page before the edit
+        after: the Operation of the page after the edit
+        """
+        self.page = page
+        self.changes = changes
+        self.before = before
+        self.after = after
+
+    def size(self):
+        return _ENTRY_OVERHEAD + len(self.changes)
+
+class PageEdit:
+    """An undoable insertion or deletion of a page."""
+    __slots__ = ('page', 'record', 'inserted')
+
+    def __init__(self, page, record, inserted):
+        """Keyword arguments:
+        page: the index of the inserted or deleted page
+        record: the PageRecord of the page
+        inserted: if the page was inserted (otherwise deleted)
+        """
+        self.page = page
+        self.record = record
+        self.inserted = inserted
+
+    def size(self):
+        return (_ENTRY_OVERHEAD + len(self.record.cells)
+                + len(self.record.comment or ''))
+
+class PagesEdit:
+    """An undoable insertion of consecutive pages, e.g. the pages of the
+    solutions of a search, undone at once.
+    """
+    __slots__ = ('page', 'records')
+
+    def __init__(self, page, records):
+        """Keyword arguments:
+        page: the index of the first inserted page
+        records: the PageRecords of the inserted pages, in page order
+        """
+        self.page = page
+        self.records = records
+
+    def size(self):
+        return sum(_ENTRY_OVERHEAD + len(record.cells)
+                   + len(record.comment or '') for record in self.records)
+
+class History:
+    """Undo and redo stacks of edits, bounded by a byte budget.
+    The oldest undo entries are dropped once the entries of both stacks
+    take more than the budget.
+    """
+    def __init__(self, budget):
+        """Keyword arguments:
+        budget: the maximum total size of the entries (in bytes)
+        """
+        self._budget = budget
+        self._undo = deque()
+        self._redo = deque()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._undo)
+
+    def size(self):
+        """Return the total size of the entries (in bytes)."""
+        return self._size
+
+    def push(self, entry):
+        """Add a new edit, and drop the redo stack."""
+        self._size -= sum(redo.size() for redo in self._redo)
+        self._redo.clear()
+        self._undo.append(entry)
+        self._size += entry.size()
+        while self._size > self._budget and len(self._undo) > 1:
+            self._size -= self._undo.popleft().size()
+
+    def undo(self):
+        """Move the last edit to the redo stack and return it.
+        Return None if there is nothing to undo.
+        """
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return entry
+
+    def redo(self):
+        """Move the last undone edit back to the undo stack and return it.
+        Return None if there is nothing to redo.
+        """
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return entry
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+from py_fumen_py.constant import FieldConstants as Consts
+
+# Map each packed mino to b'0' if empty, otherwise to b'1', so that a packed
+# line translates to the binary digits of its occupancy.
+_OCCUPANCY = bytes([ord('0')] + [ord('1')] * 255)
+_EMPTY_ROW = 0
+_BASE = 1 << 11
+_MODULUS = (1 << 61) - 1
+_POWERS = [pow(_BASE, k, _MODULUS) for k in range(Consts.TOTAL_HEIGHT+1)]
+
+def occupancy_rows(cells):
+    """Return the occupancy of the lines of cells packed by pack_field()
+    (from the top line down to the garbage line(s)) as a tuple of row
+    bitmasks, where the left-most mino is the highest bit.
+    """
+    digits = cells.translate(_OCCUPANCY)
+    return tuple(int(digits[i:i+Consts.WIDTH], 2)
+                 for i in range(0, len(digits), Consts.WIDTH))
+
+def _prefix_hashes(rows):
+    """Return the polynomial prefix hashes of rows, so that the hash of
+    rows[i:i+k] is (prefix[i+k] - prefix[i]*_POWERS[k]) % _MODULUS.
+    """
+    prefix = [0]
+    for row in rows:
+        prefix.append((prefix[-1]*_BASE + row + 1) % _MODULUS)
+    return prefix
+
+def parse_pattern(string):
+    """Parse a row pattern, e.g. 'XX____XXXX/XXX___XXXX', into a tuple of
+    row bitmasks as made by occupancy_rows().
+    The lines are given from top to bottom, separated by '/' or newlines,
+    with WIDTH characters each: '_', '.' or ' ' for an empty mino, any
+    other character for a filled one.
+    Raise ValueError if the pattern is malformed or only has empty lines.
+    """
+    lines = [line for line in string.replace('\n', '/').split('/')
+             if line.strip()]
+    rows = []
+    for line in lines:
+        if len(line) != Consts.WIDTH:
+            raise ValueError(f'Pattern lines must be {Consts.WIDTH} minos '
+                             f'wide: {line!r}')
+        rows.append(int(''.join('0' if char in '_. ' else '1'
+                                for char in line), 2))
+    if not any(rows):
+        raise ValueError('Pattern has no filled mino')
+    return tuple(rows)
+
+class _Entry:
+    """The indexed content of a PageRecord."""
+    __slots__ = ('cells', 'rows', 'prefix')
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.rows = occupancy_rows(cells)
+        self.prefix = _prefix_hashes(self.rows)
+
+class PageIndex:
+    """A content index of PageRecords, for searching pages by field.
+    Each record is indexed by its packed minos (for identical fields), and
+    by the occupancy of its lines: an inverted index maps each non-empty
+    row pattern to the records having it, and the rolling hashes of the
+    rows find a block of consecutive rows at any height in constant time,
+    confirmed by comparing the rows.
+    The index holds the records themselves, so it does not depend on their
+    order; PageStore keeps it up to date as pages are inserted, deleted or
+    updated.
+    """
+    def __init__(self, records=()):
+        self._entries = {}
+        self._by_cells = {}
+        self._by_row = {}
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, record):
+        """Index a record (again, if its cells changed)."""
+        entry = self._entries.get(record)
+        if entry is not None:
+            if entry.cells is record.cells:
+                return
+            self.remove(record)
+        entry = _Entry(record.cells)
+        self._entries[record] = entry
+        self._by_cells.setdefault(entry.cells, set()).add(record)
+        for row in set(entry.rows):
+            if row != _EMPTY_ROW:
+                self._by_row.setdefault(row, set()).add(record)
+
+    def remove(self, record):
+        """Remove a record from the index, if indexed."""
+        entry = self._entries.pop(record, None)
+        if entry is None:
+            return
+        self._discard(self._by_cells, entry.cells, record)
+        for row in set(entry.rows):
+            if row != _EMPTY_ROW:
+                self._discard(self._by_row, row, record)
+
+    @staticmethod
+    def _discard(index, key, record):
+        records = index[key]
+        records.discard(record)
+        if not records:
+            del index[key]
+
+    def same_field(self, cells):
+        """Return the set of the records whose minos equal cells."""
+        return set(self._by_cells.get(cells, ()))
+
+    def containing(self, pattern):
+        """Return the set of the records containing the rows of a pattern
+        (as made by parse_pattern()) as consecutive lines, at any height.
+        """
+        rows = sorted({row for row in pattern if row != _EMPTY_ROW},
+                      key=lambda row: len(self._by_row.get(row, ())))
+        if not rows or rows[0] not in self._by_row:
+            return set()
+        candidates = self._by_row[rows[0]].intersection(
+            *(self._by_row.get(row, ()) for row in rows[1:]))
+        if len(pattern) == 1:
+            return candidates
+        # Only check the windows where the rarest row is at its offset in
+        # the pattern.
+        anchor = rows[0]
+        offset = pattern.index(anchor)
+        length = len(pattern)
+        target = _prefix_hashes(pattern)[-1]
+        power = _POWERS[length]
+        matches = set()
+        for record in candidates:
+            entry = self._entries[record]
+            prefix = entry.prefix
+            end = len(entry.rows) - length + offset + 1
+            i = offset - 1
+            while True:
+                try:
+                    i = entry.rows.index(anchor, i+1, end)
+                except ValueError:
+                    break
+                start = i - offset
+                # Equal hashes may come from different rows.
+                if ((prefix[start+length] - prefix[start]*power) % _MODULUS
+                        == target
+                        and entry.rows[start:start+length] == pattern):
+                    matches.add(record)
+                    break
+        return matches
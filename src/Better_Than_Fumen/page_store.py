@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+from copy import copy
+from itertools import chain
+from threading import Lock
+from weakref import WeakValueDictionary
+
+from py_fumen_py import Field, Flags, Mino, Page
+from py_fumen_py.constant import FieldConstants as Consts
+from py_fumen_py.fumen_codec import _get_reader
+from py_fumen_py.quiz import Quiz
+
+from .page_index import PageIndex
+
+_MINOS = list(Mino)
+_FLAG_NAMES = ['lock', 'mirror', 'colorize', 'rise', 'quiz']
+_DEFAULT_FLAGS = 0b00101
+EMPTY_CELLS = bytes(Consts.TOTAL_BLOCK_COUNT)
+
+class _SharedCells:
+    """The packed minos of the PageRecords of identical fields."""
+    __slots__ = ('cells', '__weakref__')
+
+    def __init__(self, cells):
+        self.cells = cells
+
+# The interned minos, keyed by the packed minos themselves. An entry is
+# dropped once no record uses it anymore. Records are also made by the
+# background decoder, hence the lock.
+_POOL = WeakValueDictionary()
+_POOL_LOCK = Lock()
+
+def _intern(cells):
+    """Return the _SharedCells of the packed minos equal to cells."""
+    with _POOL_LOCK:
+        shared = _POOL.get(cells)
+        if shared is None:
+            shared = _SharedCells(bytes(cells))
+            _POOL[shared.cells] = shared
+    return shared
+
+def pack_field(field):
+    """Pack a Field into bytes, one byte per mino.
+    The minos are ordered as in a fumen string: from the top line down to
+    the garbage line(s), and from left to right within a line.
+    """
+    return bytes(chain.from_iterable(
+        field[y] for y in range(Consts.HEIGHT-1, -Consts.GARBAGE_HEIGHT-1, -1)
+    ))
+
+def unpack_field(cells):
+    """Unpack bytes made by pack_field() into a new Field."""
+    lines = [[_MINOS[mino] for mino in cells[i:i+Consts.WIDTH]]
+             for i in range(0, Consts.TOTAL_BLOCK_COUNT, Consts.WIDTH)]
+    return Field(field=lines[Consts.HEIGHT-1::-1],
+                 garbage=lines[Consts.HEIGHT:])
+
+def pack_flags(flags):
+    """Pack a Flags object into an int, one bit per flag."""
+    if flags is None:
+        return _DEFAULT_FLAGS
+    return sum(bool(getattr(flags, name)) << i
+               for i, name in enumerate(_FLAG_NAMES))
+
+def unpack_flags(bits):
+    """Unpack an int made by pack_flags() into a new Flags object."""
+    return Flags(**{name: bool(bits >> i & 1)
+                    for i, name in enumerate(_FLAG_NAMES)})
+
+class PageRecord:
+    """A compact page: packed minos, operation, packed flags and comment.
+    The packed minos are interned: the records of identical fields share
+    one immutable bytes object, held until no record uses it anymore.
+    segment caches the encoded page (see fumen_encoder), and is reset to None
+    by PageStore whenever the page or the page before it changes.
+    """
+    __slots__ = ('_shared', 'operation', 'flags', 'comment', 'segment')
+
+    def __init__(self, cells=EMPTY_CELLS, operation=None,
+            flags=_DEFAULT_FLAGS, comment=None):
+        """Keyword arguments:
+        cells: the minos packed by pack_field() (default: an empty field)
+        operation: the Operation of the page (default: None)
+        flags: the flags packed by pack_flags() (default: Flags())
+        comment: the comment of the page (default: None)
+        """
+        self.cells = cells
+        self.operation = operation
+        self.flags = flags
+        self.comment = comment
+        self.segment = None
+
+    @property
+    def cells(self):
+        return self._shared.cells
+
+    @cells.setter
+    def cells(self, cells):
+        self._shared = _intern(cells)
+
+    @classmethod
+    def from_page(cls, page):
+        """Pack a Page into a new PageRecord."""
+        return cls(
+            pack_field(Field() if page.field is None else page.field),
+            copy(page.operation), pack_flags(page.flags), page.comment,
+        )
+
+    def copy(self):
+        """Return a copy of this record sharing its minos, operation and
+        segment, e.g. to encode it on a worker thread while this record may
+        be modified.
+        """
+        record = PageRecord.__new__(PageRecord)
+        record._shared = self._shared
+        record.operation = self.operation
+        record.flags = self.flags
+        record.comment = self.comment
+        record.segment = self.segment
+        return record
+
+    def field(self):
+        """Return the minos of this record as a new Field."""
+        return unpack_field(self.cells)
+
+    def page(self):
+        """Return this record as a new Page."""
+        return Page(field=self.field(), operation=copy(self.operation),
+                    comment=self.comment, flags=unpack_flags(self.flags))
+
+class PageStore:
+    """A list-like store of fumen pages kept as PageRecords.
+    Pages are only turned into Page and Field objects when they are read,
+    e.g. when viewed or encoded.
+    Identical fields share one instance of packed minos (see PageRecord).
+    A PageIndex of the records is built on the first call to index(), and
+    then kept up to date by every modification.
+    """
+    def __init__(self, pages=()):
+        """Create a PageStore holding the given Pages."""
+        self._records = [PageRecord.from_page(page) for page in pages]
+        self._index = None
+        self._positions = None
+        self._version = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        """Return the page at index as a new Page."""
+        return self._records[index].page()
+
+    def __setitem__(self, index, page):
+        record = PageRecord.from_page(page)
+        if self._index is not None:
+            self._index.remove(self._records[index])
+            self._index.add(record)
+        self._records[index] = record
+        self._positions = None
+        self._version += 1
+        self._invalidate(index+1 if index >= 0 else index+len(self)+1)
+
+    def __delitem__(self, index):
+        if self._index is not None:
+            self._index.remove(self._records[index])
+        del self._records[index]
+        self._positions = None
+        self._version += 1
+        self._invalidate(index if index >= 0 else index+len(self)+1)
+
+    def __iter__(self):
+        """Iterate over the pages as new Page objects, one at a time."""
+        return (record.page() for record in self._records)
+
+    def insert(self, index, page):
+        self.insert_record(index, PageRecord.from_page(page))
+
+    def append(self, page):
+        self.insert(len(self._records), page)
+
+    def record(self, index):
+        """Return the PageRecord at index."""
+        return self._records[index]
+
+    def records(self):
+        """Return a list of the PageRecords."""
+        return self._records[:]
+
+    def insert_record(self, index, record):
+        record.segment = None
+        self._records.insert(index, record)
+        if self._index is not None:
+            self._index.add(record)
+        self._positions = None
+        self._version += 1
+        self._invalidate(index+1 if index >= 0 else index+len(self))
+
+    def index(self):
+        """Return the PageIndex of the records."""
+        if self._index is None:
+            self._index = PageIndex(self._records)
+        return self._index
+
+    def positions(self, records):
+        """Return the sorted page indices of some of the records."""
+        if self._positions is None:
+            self._positions = {record: i
+                               for i, record in enumerate(self._records)}
+        return sorted(self._positions[record] for record in records)
+
+    def version(self):
+        """Return a number that changes whenever a page is modified,
+        inserted or deleted.
+        """
+        return self._version
+
+    def snapshot(self):
+        """Return copies of the PageRecords (see PageRecord.copy())."""
+        return [record.copy() for record in self._records]
+
+    def restore_segments(self, records, version):
+        """Cache the segments encoded on records made by snapshot(), if
+        the pages are unchanged since (i.e. version() still returns
+        version).
+        """
+        if version == self._version:
+            for record, copied in zip(self._records, records):
+                record.segment = copied.segment
+
+    def distinct_fields(self):
+        """Return the number of distinct fields backing the pages."""
+        return len({id(record.cells) for record in self._records})
+
+    def memory_report(self):
+        """Return the number of pages and of distinct fields, and the size
+        of their packed minos, as text.
+        """
+        distinct = self.distinct_fields()
+        return (f'{len(self)} pages backed by {distinct} distinct fields '
+                f'({distinct*Consts.TOTAL_BLOCK_COUNT} bytes of minos, '
+                f'{len(self)*Consts.TOTAL_BLOCK_COUNT} bytes unshared)')
+
+    def _invalidate(self, index):
+        """Mark the encoded segment of the record at index dirty, as it
+        depends on the record before it.
+        """
+        if 0 <= index < len(self._records):
+            self._records[index].segment = None
+
+    def field(self, index):
+        """Return the field of the page at index as a new Field."""
+        return self._records[index].field()
+
+    def update(self, index, **fields):
+        """Modify the fields (cells, operation, flags or comment) of the
+        PageRecord at index.
+        """
+        record = self._records[index]
+        for name, value in fields.items():
+            setattr(record, name, value)
+        if self._index is not None and 'cells' in fields:
+            self._index.add(record)
+        record.segment = None
+        self._version += 1
+        self._invalidate(index+1 if index >= 0 else index+len(self)+1)
+
+def iter_decode(string):
+    """Decode a fumen string one page at a time, as decode() does, and
+    yield each page as a PageRecord without building Page or Field objects.
+    """
+    fumen_reader = _get_reader(string)
+    first_page = True
+    prev_comment = ''
+    prev_lock = False
+    prev_mino = Mino._
+
+    while fumen_reader:
+        field, field_modified = fumen_reader.read_field()
+        action = fumen_reader.read_action()
+
+        quiz = Quiz(prev_comment)
+        if prev_lock:
+            quiz.step(prev_mino)
+
+        if action.comment:
+            comment = fumen_reader.read_comment()
+        else:
+            comment = '' if first_page else (
+                None if quiz is None else str(quiz))
+
+        yield PageRecord(
+            pack_field(field),
+            None if action.operation.mino is Mino._ else action.operation,
+            pack_flags(Flags(action.lock, action.mirror, action.colorize,
+                             action.rise, (quiz is not None))),
+            comment,
+        )
+
+        field.apply_action(action)
+        first_page = False
+        prev_comment = comment
+        prev_lock = action.lock
+        prev_mino = action.operation.mino
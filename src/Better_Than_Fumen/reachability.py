@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+
+from py_fumen_py import Mino, Operation, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+# The SRS rotation states, clockwise from spawn, as py_fumen_py rotations.
+_STATES = [Rotation.SPAWN, Rotation.RIGHT, Rotation.REVERSE, Rotation.LEFT]
+# The spawn state minos in the SRS bounding box, with y pointing up, and the
+# size of the box.
+_SPAWN_SHAPES = {
+    Mino.I: ([(0, 2), (1, 2), (2, 2), (3, 2)], 4),
+    Mino.J: ([(0, 2), (0, 1), (1, 1), (2, 1)], 3),
+    Mino.L: ([(2, 2), (0, 1), (1, 1), (2, 1)], 3),
+    Mino.O: ([(1, 1), (2, 1), (1, 2), (2, 2)], 3),
+    Mino.S: ([(1, 2), (2, 2), (0, 1), (1, 1)], 3),
+    Mino.T: ([(1, 2), (0, 1), (1, 1), (2, 1)], 3),
+    Mino.Z: ([(0, 2), (1, 2), (1, 1), (2, 1)], 3),
+}
+# The SRS wall kick offsets (y pointing up) by (state, clockwise).
+_KICKS = {
+    (0, True): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (1, False): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (1, True): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (2, False): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (2, True): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+    (3, False): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (3, True): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (0, False): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+}
+_I_KICKS = {
+    (0, True): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (1, False): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (1, True): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+    (2, False): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (2, True): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (3, False): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (3, True): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (0, False): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+}
+# The lowest line of the spawn state minos, and the left column of the box.
+_SPAWN_LINE = Consts.HEIGHT - 3
+_SPAWN_COLUMN = 3
+
+class _Piece:
+    """The SRS states of a mino: for each state, its minos packed into a
+    row bitboard aligned to their lowest line and left column, the offset
+    of that corner in the box, the size of the minos, and the offset of
+    the py_fumen_py Operation coords in the box.
+    """
+    def __init__(self, mino):
+        shape, size = _SPAWN_SHAPES[mino]
+        self.kicks = _I_KICKS if mino is Mino.I else _KICKS
+        if mino is Mino.O:
+            self.kicks = {key: [(0, 0)] for key in _KICKS}
+        self.states = []
+        for state, rotation in enumerate(_STATES):
+            left = min(x for x, y in shape)
+            bottom = min(y for x, y in shape)
+            width = max(x for x, y in shape) - left + 1
+            height = max(y for x, y in shape) - bottom + 1
+            mask = sum(1 << ((y-bottom)*Consts.WIDTH + x-left)
+                       for x, y in shape)
+            # Find the Operation coords whose shape matches the minos.
+            cells = sorted(shape)
+            dx, dy = [a - b for a, b in zip(cells[0], sorted(
+                Operation.shape_at(mino, rotation))[0])]
+            assert (sorted(tuple(cell) for cell in Operation.shape_at(
+                        mino, rotation, dx, dy)) == cells)
+            self.states.append((mask, left, bottom, width, height, dx, dy))
+            if mino is not Mino.O:
+                shape = [(y, size-1-x) for x, y in shape]
+
+_PIECES = {mino: _Piece(mino) for mino in _SPAWN_SHAPES}
+
+def board_of(rows):
+    """Pack the bitboard rows of the lines 0 to HEIGHT-1 (e.g. from
+    FieldBitboard.rows()) into one int, where line y is at bit y*WIDTH.
+    """
+    board = 0
+    for y, row in enumerate(rows):
+        board |= row << (y*Consts.WIDTH)
+    return board
+
+def reachable_operations(rows, mino):
+    """Return the distinct placements of a mino reachable from its spawn
+    position with SRS moves (left, right, soft drop and rotations with wall
+    kicks), as a list of Operations. Placements of the same minos (e.g. of
+    the symmetric rotations of the I, O, S and Z minos) are merged, keeping
+    the first rotation in spawn, right, reverse, left order.
+    Keyword arguments:
+    rows: the bitboard rows of the lines 0 to HEIGHT-1
+    mino: the colored Mino to place
+    """
+    piece = _PIECES[Mino(mino)]
+    board = board_of(rows)
+
+    def mask_at(state, x, y):
+        # Return the minos of a state at box position (x, y), or None if
+        # they are outside the field or overlap.
+        mask, left, bottom, width, height, dx, dy = piece.states[state]
+        x += left
+        y += bottom
+        if (x < 0 or y < 0
+                or x+width > Consts.WIDTH or y+height > Consts.HEIGHT):
+            return None
+        mask <<= y*Consts.WIDTH + x
+        return None if board & mask else mask
+
+    start = (0, _SPAWN_COLUMN, _SPAWN_LINE - piece.states[0][2])
+    if mask_at(*start) is None:
+        return []
+    visited = {start}
+    pending = deque([start])
+    placements = {}
+    while pending:
+        state, x, y = pending.popleft()
+        moves = [(state, x-1, y), (state, x+1, y)]
+        if mask_at(state, x, y-1) is None:
+            mask = mask_at(state, x, y)
+            dx, dy = piece.states[state][5:]
+            placement = placements.get(mask)
+            if placement is None or state < placement[0]:
+                placements[mask] = (state, x+dx, y+dy)
+        else:
+            moves.append((state, x, y-1))
+        for clockwise in [True, False]:
+            rotated = (state + (1 if clockwise else -1)) % len(_STATES)
+            for kick_x, kick_y in piece.kicks[state, clockwise]:
+                if mask_at(rotated, x+kick_x, y+kick_y) is not None:
+                    moves.append((rotated, x+kick_x, y+kick_y))
+                    break
+        for move in moves:
+            if move not in visited and mask_at(*move) is not None:
+                visited.add(move)
+                pending.append(move)
+    return [Operation(Mino(mino), _STATES[state], x, y)
+            for state, x, y in sorted(placements.values())]
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import zlib
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from py_fumen_py import decode, Mino
+from py_fumen_py.constant import FieldConstants as Consts
+
+from .bitboard import FieldBitboard
+from .colors import to_rgb
+from .config import _canvas_config as _config
+
+class PageRenderer:
+    """Headless renderer of fumen pages, without Tk.
+    Pages are composed as NumPy arrays of palette indices, using the colors
+    and the highlights (lineclear, placement and ghost) of the canvas.
+    The palette is built from CanvasConfig.PALETTE, and shared by all
+    pages rendered by the same renderer.
+    """
+    BACKGROUND = '#d9d9d9'
+    SEPARATOR = 'gray75'
+
+    def __init__(self, mino_size=16):
+        """Keyword arguments:
+        mino_size: the mino size of the rendered pages (default: 16)
+        """
+        if np is None:
+            raise ImportError('PageRenderer requires numpy')
+        self._mino_size = mino_size
+        self._palette = [to_rgb(self.BACKGROUND),
+                         to_rgb(_config.OUTLINE['normal']),
+                         to_rgb(self.SEPARATOR)]
+        self._fills = {}
+        self._tiles = np.zeros((0, mino_size, mino_size), np.uint8)
+
+    def palette(self):
+        """Return the palette as a list of (r, g, b) tuples."""
+        return self._palette[:]
+
+    def _fill_index(self, mino, type_):
+        """Return the tile index of a mino, adding it to the palette."""
+        fill = _config.PALETTE[mino, type_, False][0]
+        if fill not in self._fills:
+            if len(self._palette) >= 256:
+                raise ValueError('Too many colors in the palette')
+            self._palette.append(to_rgb(fill))
+            tile = np.full((self._mino_size, self._mino_size),
+                           len(self._palette)-1, np.uint8)
+            border = _config.LINE_WIDTH
+            tile[:border+1, :] = tile[:, :border+1] = 1
+            tile[-border:, :] = tile[:, -border:] = 1
+            tile[0, :] = tile[:, 0] = 0
+            self._fills[fill] = len(self._tiles)
+            self._tiles = np.concatenate((self._tiles, tile[np.newaxis]))
+        return self._fills[fill]
+
+    @staticmethod
+    def page_state(page):
+        """Return the (mino, highlight type) of every mino of a page, as
+        rows from the top line down to the garbage line(s).
+        The highlights follow those of the field canvas.
+        """
+        field = page.field
+        bitboard = FieldBitboard(field)
+        placements = set()
+        ghosts = set()
+        operation = page.operation
+        if operation is not None and field.is_placeable(operation):
+            placements = {(x, y) for x, y in operation.shape()}
+            ghosts = {(x, y) for x, y
+                      in field.drop(operation, False).shape()}
+        placement_rows = {}
+        for x, y in placements:
+            placement_rows[y] = placement_rows.get(y, 0) | 1 << x
+
+        rows = []
+        for y in range(Consts.HEIGHT-1, -Consts.GARBAGE_HEIGHT-1, -1):
+            lineclear = y >= 0 and bitboard.is_full(
+                y, placement_rows.get(y, 0))
+            row = []
+            for x in range(Consts.WIDTH):
+                mino = field.at(x, y)
+                if (x, y) in placements:
+                    row.append((operation.mino, 'placement'))
+                elif lineclear:
+                    row.append((mino, 'lineclear'))
+                elif (x, y) in ghosts and mino is Mino._:
+                    row.append((operation.mino, 'ghost'))
+                else:
+                    row.append((mino, 'normal'))
+            rows.append(row)
+        return rows
+
+    def render(self, page):
+        """Return a page as a 2D uint8 array of palette indices."""
+        size = self._mino_size
+        grid = np.array([[self._fill_index(mino, type_) for mino, type_ in row]
+                         for row in self.page_state(page)], np.intp)
+        image = (self._tiles[grid].transpose(0, 2, 1, 3)
+                 .reshape(Consts.TOTAL_HEIGHT*size, Consts.WIDTH*size))
+        separator = Consts.HEIGHT * size
+        image[separator:separator+_config.LINE_WIDTH, :] = 2
+        return image
+
+    def render_sheet(self, pages, columns=10, margin=4):
+        """Return the pages laid out on a sheet, in rows of columns pages."""
+        images = [self.render(page) for page in pages]
+        height, width = images[0].shape
+        rows = -(-len(images) // columns)
+        columns = min(columns, len(images))
+        sheet = np.zeros((rows*(height+margin)+margin,
+                          columns*(width+margin)+margin), np.uint8)
+        for i, image in enumerate(images):
+            top = (i // columns) * (height+margin) + margin
+            left = (i % columns) * (width+margin) + margin
+            sheet[top:top+height, left:left+width] = image
+        return sheet
+
+    def rgb(self, image):
+        """Convert an array of palette indices into an RGB array."""
+        return np.array(self._palette, np.uint8)[image]
+
+def _png_chunk(type_, data):
+    return (struct.pack('>I', len(data)) + type_ + data
+            + struct.pack('>I', zlib.crc32(type_ + data)))
+
+def write_png(path, image, palette):
+    """Write an array of palette indices as a paletted PNG file."""
+    height, width = image.shape
+    raw = np.hstack((np.zeros((height, 1), np.uint8), image)).tobytes()
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        file.write(_png_chunk(b'IHDR', struct.pack(
+            '>IIBBBBB', width, height, 8, 3, 0, 0, 0)))
+        file.write(_png_chunk(b'PLTE', bytes(
+            value for color in palette for value in color)))
+        file.write(_png_chunk(b'IDAT', zlib.compress(raw, 9)))
+        file.write(_png_chunk(b'IEND', b''))
+
+def _lzw_encode(data, min_code_size):
+    # Return the GIF LZW compressed bytes of a sequence of palette indices.
+    clear = 1 << min_code_size
+    output = bytearray()
+    buffer = 0
+    bits = 0
+    code_size = min_code_size + 1
+
+    def emit(code):
+        nonlocal buffer, bits
+        buffer |= code << bits
+        bits += code_size
+        while bits >= 8:
+            output.append(buffer & 0xff)
+            buffer >>= 8
+            bits -= 8
+
+    table = {}
+    next_code = clear + 2
+    emit(clear)
+    prefix = data[0]
+    for value in data[1:]:
+        key = prefix << 8 | value
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix)
+        if next_code < 4096:
+            table[key] = next_code
+            next_code += 1
+            if next_code > 1 << code_size and code_size < 12:
+                code_size += 1
+        else:
+            emit(clear)
+            table.clear()
+            next_code = clear + 2
+            code_size = min_code_size + 1
+        prefix = value
+    emit(prefix)
+    emit(clear + 1)
+    if bits:
+        output.append(buffer & 0xff)
+    return bytes(output)
+
+def write_gif(path, images, palette, duration=50):
+    """Write arrays of palette indices as an animated (looping) GIF file.
+    Keyword arguments:
+    duration: the duration of each frame in 1/100 seconds (default: 50)
+    """
+    height, width = images[0].shape
+    table_bits = max(1, (len(palette)-1).bit_length())
+    min_code_size = max(2, table_bits)
+    colors = palette + [(0, 0, 0)] * ((1 << table_bits) - len(palette))
+    with open(path, 'wb') as file:
+        file.write(b'GIF89a')
+        file.write(struct.pack('<HHBBB', width, height,
+                               0xf0 | table_bits-1, 0, 0))
+        file.write(bytes(value for color in colors for value in color))
+        file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+        for image in images:
+            file.write(struct.pack('<BBBBHBB', 0x21, 0xf9, 4, 0,
+                                   duration, 0, 0))
+            file.write(struct.pack('<BHHHHB', 0x2c, 0, 0, width, height, 0))
+            file.write(bytes([min_code_size]))
+            data = _lzw_encode(image.tobytes(), min_code_size)
+            for i in range(0, len(data), 255):
+                block = data[i:i+255]
+                file.write(bytes([len(block)]) + block)
+            file.write(b'\x00')
+        file.write(b'\x3b')
+
+def render_fumen(code, path, format_='png', mino_size=16, columns=10,
+        duration=50):
+    """Decode a fumen code and write it as a PNG sheet or an animated GIF.
+    Return the path written.
+    """
+    pages = decode(code)
+    renderer = PageRenderer(mino_size)
+    if format_ == 'png':
+        image = renderer.render_sheet(pages, columns)
+        write_png(path, image, renderer.palette())
+    elif format_ == 'gif':
+        images = [renderer.render(page) for page in pages]
+        write_gif(path, images, renderer.palette(), duration)
+    else:
+        raise ValueError(f'Unsupported format: {format_}')
+    return path
+
+def _render_fumen_job(args):
+    # Unpack the arguments of render_fumen() for Pool.imap().
+    return render_fumen(*args)
+
+def render_fumens(codes, directory, format_='png', mino_size=16, columns=10,
+        duration=50, processes=None, chunksize=16):
+    """Render many fumen codes in parallel worker processes.
+    The i-th code is written to directory/i.format_.
+    Return the list of paths written, in input order.
+    Keyword arguments:
+    processes: the number of worker processes (default: os.cpu_count())
+    chunksize: the number of codes sent to a worker at once (default: 16)
+    """
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(code, os.path.join(directory, f'{i}.{format_}'), format_,
+             mino_size, columns, duration)
+            for i, code in enumerate(codes)]
+    with Pool(processes) as pool:
+        return list(pool.imap(_render_fumen_job, jobs, chunksize))
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+
+from py_fumen_py import Flags, Mino, Operation, Page, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from .bitboard import SHAPE_OFFSETS
+
+_QUEUE_MINOS = {mino.name: mino for mino in Mino if mino.is_colored()}
+# Spawn first, so that the duplicate shapes of the I, O, S and Z minos are
+# found in their spawn rotation.
+_ROTATIONS = [Rotation.SPAWN, Rotation.RIGHT, Rotation.REVERSE,
+              Rotation.LEFT]
+_FULL_ROW = (1 << Consts.WIDTH) - 1
+# The bits of all the lines but the leftmost (rightmost) column, so that
+# shifting a board by one column does not wrap around the lines.
+_NOT_LEFT = sum(_FULL_ROW - 1 << y*Consts.WIDTH
+                for y in range(Consts.HEIGHT))
+_NOT_RIGHT = sum(_FULL_ROW >> 1 << y*Consts.WIDTH
+                 for y in range(Consts.HEIGHT))
+_TABLES = {}
+# The number of nodes searched between two checks of the cancel event.
+_CANCEL_INTERVAL = 1024
+# The cancel event of a worker process, set by _init_worker().
+_worker_cancelled = None
+
+def parse_queue(string):
+    """Parse a queue of mino names (e.g. 'TIOLJSZ') into a list of Mino.
+    Spaces are ignored. Raise ValueError on other characters.
+    """
+    try:
+        return [_QUEUE_MINOS[name] for name in string.upper()
+                if not name.isspace()]
+    except KeyError as e:
+        raise ValueError(f'Unknown mino name in queue: {e}') from None
+
+def board_of(field, height):
+    """Return the bitboard of the lines 0 to height-1 of a Field, as an int
+    where bit y*WIDTH+x is set if the mino at (x, y) is not empty.
+    Raise ValueError if a mino is above these lines.
+    """
+    if field.height() > height:
+        raise ValueError(f'The field is higher than {height} lines')
+    board = 0
+    for y in range(height):
+        for x, mino in enumerate(field[y]):
+            if mino is not Mino._:
+                board |= 1 << (y*Consts.WIDTH + x)
+    return board
+
+def _placements(height):
+    """Return the placements of each mino within the lines 0 to height-1,
+    as lists of (mask, above, below, on_floor, operation) tuples:
+    mask: the bits of the mino
+    above: the bits above the mino, which must be empty for a hard drop
+    below: the bits right below the mino, one of which must be filled for
+        the mino to be grounded, unless on_floor
+    operation: the (mino, rotation, x, y) tuple of the placement
+    Placements of the same bits are only listed once.
+    """
+    table = _TABLES.get(height)
+    if table is not None:
+        return table
+    table = {}
+    for mino in _QUEUE_MINOS.values():
+        placements = []
+        masks = set()
+        for rotation in _ROTATIONS:
+            for y in range(height):
+                for x in range(Consts.WIDTH):
+                    shape = [(x+dx, y+dy) for dx, dy
+                             in SHAPE_OFFSETS[mino, rotation]]
+                    if not all(0 <= sx < Consts.WIDTH and 0 <= sy < height
+                               for sx, sy in shape):
+                        continue
+                    mask = sum(1 << (sy*Consts.WIDTH + sx)
+                               for sx, sy in shape)
+                    if mask in masks:
+                        continue
+                    masks.add(mask)
+                    above = below = 0
+                    for sx, sy in shape:
+                        for ay in range(sy+1, height):
+                            above |= 1 << (ay*Consts.WIDTH + sx)
+                        if sy > 0:
+                            below |= 1 << ((sy-1)*Consts.WIDTH + sx)
+                    placements.append((
+                        mask, above & ~mask, below & ~mask,
+                        any(sy == 0 for sx, sy in shape),
+                        (int(mino), int(rotation), x, y),
+                    ))
+        table[int(mino)] = placements
+    _TABLES[height] = table
+    return table
+
+def _clear_lines(board, height):
+    """Clear the filled lines of a board, and move the lines above down.
+    Return the new board and height.
+    """
+    y = 0
+    while y < height:
+        shift = y * Consts.WIDTH
+        if (board >> shift) & _FULL_ROW == _FULL_ROW:
+            board = (board & ((1 << shift) - 1)
+                     | (board >> (shift+Consts.WIDTH)) << shift)
+            height -= 1
+        else:
+            y += 1
+    return board, height
+
+def _is_splittable(board, height):
+    """Test if every region of connected empty minos can be filled by whole
+    minos, i.e. its size is a multiple of 4.
+    """
+    empty = ~board & ((1 << height*Consts.WIDTH) - 1)
+    while empty:
+        region = empty & -empty
+        while True:
+            grown = (region | region << Consts.WIDTH | region >> Consts.WIDTH
+                     | (region << 1 & _NOT_LEFT) | (region >> 1 & _NOT_RIGHT)
+                     ) & empty
+            if grown == region:
+                break
+            region = grown
+        if region.bit_count() & 3:
+            return False
+        empty ^= region
+    return True
+
+def _moves(board, height, queue, index, hold, use_hold):
+    """Yield the (placement, next index, next hold) of the next moves.
+    Once the queue is used up, the held mino is the only one left.
+    """
+    if index >= len(queue):
+        choices = [(hold, index, None)]
+    else:
+        choices = [(queue[index], index+1, hold)]
+    if use_hold and index < len(queue):
+        if hold is not None:
+            if hold != queue[index]:
+                choices.append((hold, index+1, queue[index]))
+        elif index+1 < len(queue) and queue[index+1] != queue[index]:
+            choices.append((queue[index+1], index+2, queue[index]))
+    table = _placements(height)
+    for mino, next_index, next_hold in choices:
+        for placement in table[mino]:
+            mask, above, below, on_floor, operation = placement
+            if (board & mask or board & above
+                    or not (on_floor or board & below)):
+                continue
+            yield placement, next_index, next_hold
+
+class _Cancelled(Exception):
+    """Raised by _Search.run() once its cancel event is set."""
+
+class _Search:
+    """A depth-first perfect clear search with a transposition table of the
+    states (board, height, queue index, hold) known to have no solution.
+    """
+    def __init__(self, queue, use_hold, limit, cancelled=None):
+        self.queue = queue
+        self.use_hold = use_hold
+        self.limit = limit
+        self.cancelled = cancelled
+        self.failed = set()
+        self.solutions = []
+        self.nodes = 0
+
+    def run(self, board, height, index, hold, path):
+        """Search from a state, appending the solutions found to
+        self.solutions. Return if any solution was found.
+        Raise _Cancelled once self.cancelled is set.
+        """
+        if height == 0:
+            self.solutions.append(path[:])
+            return True
+        empty = height*Consts.WIDTH - board.bit_count()
+        pieces = len(self.queue) - index + (hold is not None)
+        if pieces == 0 or empty > 4*pieces:
+            return False
+        key = (board, height, index, hold)
+        if key in self.failed:
+            return False
+        self.nodes += 1
+        if (self.cancelled is not None
+                and self.nodes % _CANCEL_INTERVAL == 1
+                and self.cancelled.is_set()):
+            raise _Cancelled
+        found = False
+        for (mask, above, below, on_floor, operation), next_index, next_hold \
+                in _moves(board, height, self.queue, index, hold,
+                          self.use_hold):
+            next_board, next_height = _clear_lines(board | mask, height)
+            if not _is_splittable(next_board, next_height):
+                continue
+            path.append(operation)
+            found |= self.run(next_board, next_height, next_index,
+                              next_hold, path)
+            path.pop()
+            if len(self.solutions) >= self.limit:
+                return True
+        if not found:
+            self.failed.add(key)
+        return found
+
+def _branches(board, height, queue, use_hold):
+    """Split the search by its first move. Return a list of the
+    (board, height, index, hold, path) states after each first move.
+    """
+    branches = []
+    for (mask, above, below, on_floor, operation), index, hold \
+            in _moves(board, height, queue, 0, None, use_hold):
+        next_board, next_height = _clear_lines(board | mask, height)
+        if _is_splittable(next_board, next_height):
+            branches.append((next_board, next_height, index, hold,
+                             [operation]))
+    return branches
+
+def solve_branch(branch, queue, use_hold, limit, cancelled=None):
+    """Search a branch made by _branches() in the calling process.
+    Return a list of at most limit solutions, each a list of
+    (mino, rotation, x, y) tuples.
+    Keyword arguments:
+    cancelled: an Event which stops the search when set; the solutions
+        found so far are returned. (default: None)
+    """
+    board, height, index, hold, path = branch
+    search = _Search(queue, use_hold, limit, cancelled)
+    try:
+        search.run(board, height, index, hold, list(path))
+    except _Cancelled:
+        pass
+    return search.solutions
+
+def _init_worker(cancelled):
+    # Synchronization primitives can only be shared with a process when it
+    # starts, so the cancel event is handed over once per worker.
+    global _worker_cancelled
+    _worker_cancelled = cancelled
+
+def _solve_branch_in_worker(branch, queue, use_hold, limit):
+    return solve_branch(branch, queue, use_hold, limit, _worker_cancelled)
+
+def solve(field, queue, height=4, use_hold=True, limit=1, workers=None,
+          cancelled=None):
+    """Search the perfect clears of the lines 0 to height-1 of a Field with
+    the minos of a queue, placed by hard drops (no spins).
+    Yield (the number of branches searched, the number of branches, the new
+    solutions) as the search progresses; each solution is a list of
+    Operations, one per page.
+    The search is split by its first move, and the branches are searched by
+    a pool of worker processes (workers: the number of processes, default:
+    os.cpu_count(); 1 to search in the calling process). It stops once
+    limit solutions are found, or when the generator is closed.
+    Raise ValueError if the field cannot be perfectly cleared.
+    Keyword arguments:
+    cancelled: an Event which stops the branches being searched when set,
+        including those of the worker processes, so that the generator
+        yields their solutions so far soon after. It must come from
+        multiprocessing.get_context('spawn') to be shared with the workers.
+        It is set when the search ends. (default: None)
+    """
+    board = board_of(field, height)
+    if (height*Consts.WIDTH - board.bit_count()) % 4:
+        raise ValueError(f'The empty minos of the {height} lines '
+                         'are not a multiple of 4')
+    queue = [int(mino) for mino in queue]
+    branches = _branches(board, height, queue, use_hold) if queue else []
+    found = 0
+
+    def operations(solutions):
+        nonlocal found
+        solutions = solutions[:limit-found]
+        found += len(solutions)
+        return [[Operation(Mino(mino), Rotation(rotation), x, y)
+                 for mino, rotation, x, y in solution]
+                for solution in solutions]
+
+    yield 0, len(branches), []
+    if workers == 1 or len(branches) <= 1:
+        for i, branch in enumerate(branches):
+            solutions = solve_branch(branch, queue, use_hold, limit-found,
+                                     cancelled)
+            yield i+1, len(branches), operations(solutions)
+            if found >= limit:
+                return
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Forking a process running Tk and other threads is unsafe, so the
+    # workers are spawned instead.
+    context = multiprocessing.get_context('spawn')
+    if cancelled is None:
+        cancelled = context.Event()
+    executor = ProcessPoolExecutor(
+        workers or os.cpu_count() or 1,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(cancelled,),
+    )
+    try:
+        futures = [executor.submit(_solve_branch_in_worker, branch, queue,
+                                   use_hold, limit)
+                   for branch in branches]
+        for i, future in enumerate(as_completed(futures)):
+            yield i+1, len(branches), operations(future.result())
+            if found >= limit:
+                return
+    finally:
+        # Stop the branches being searched, not only the pending ones, so
+        # that the workers exit instead of searching on in the background.
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def solution_pages(field, solution, comment=None):
+    """Return the Pages of a solution, starting from a Field. Each page
+    locks its Operation and clears the filled lines, as fumen does.
+    Keyword arguments:
+    comment: the comment of the first page (default: None)
+    """
+    field = field.copy()
+    pages = []
+    for operation in solution:
+        pages.append(Page(field=field.copy(), operation=operation,
+                          flags=Flags(), comment=comment))
+        comment = None
+        field.lock(operation)
+        field.clear_line()
+    return pages
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+_DIRECTORY = os.path.dirname(__file__)
+
+sys.path.insert(0, os.path.join(_DIRECTORY, '..', 'src'))
+# The canvas frames are tested against the recording Tk stub of the
+# benchmarks, so that no display is needed.
+sys.path.insert(0, os.path.join(_DIRECTORY, '..', 'benchmarks', 'tk_stub'))
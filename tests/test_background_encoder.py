@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import os
+import stat
+import time
+
+import pytest
+from py_fumen_py import encode, Field, Flags, Mino, Page
+
+from Better_Than_Fumen.fumen_canvas._background_encoder import (
+    _BackgroundEncoder
+)
+from Better_Than_Fumen.page_store import PageStore
+
+def pages():
+    field = Field()
+    field.fill(0, 0, Mino.I)
+    return [Page(field=field, flags=Flags(), comment=str(i))
+            for i in range(100)]
+
+def export(path, chunk_size=1 << 16):
+    """Export pages() to path on the worker pool, and wait for the end."""
+    encoder = _BackgroundEncoder(PageStore(pages()).snapshot(), path,
+                                 chunk_size)
+    encoder.start()
+    while True:
+        progress, done, string, error = encoder.poll()
+        if done:
+            assert error is None
+            return
+        time.sleep(0.01)
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+def test_export_writes_the_fumen(tmp_path):
+    path = tmp_path / 'out.txt'
+    export(path, chunk_size=10)
+    assert path.read_text(encoding='utf-8') == encode(pages()) + '\n'
+    assert os.listdir(tmp_path) == ['out.txt']
+
+def test_new_file_mode_follows_the_umask(tmp_path):
+    umask = os.umask(0o027)
+    try:
+        export(tmp_path / 'out.txt')
+    finally:
+        os.umask(umask)
+    assert mode(tmp_path / 'out.txt') == 0o640
+
+@pytest.mark.parametrize('permissions', [0o600, 0o644, 0o664])
+def test_existing_file_mode_is_kept(tmp_path, permissions):
+    path = tmp_path / 'out.txt'
+    path.write_text('old')
+    path.chmod(permissions)
+    export(path)
+    assert mode(path) == permissions
+    assert path.read_text(encoding='utf-8') != 'old'
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+from py_fumen_py import Field, Mino, Operation, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.bitboard import FieldBitboard, shape_cells
+
+def random_step(rng, field, bitboard):
+    """Apply the same random operation to a Field and its FieldBitboard.
+    Return the Field (a new one when cleared) and the operation as text,
+    for the assertion messages.
+    """
+    operation = rng.choice(['fill', 'fill', 'fill', 'shift_up',
+                            'shift_down', 'shift_left', 'shift_right',
+                            'mirror', 'clear'])
+    if operation == 'fill':
+        x = rng.randrange(Consts.WIDTH)
+        y = rng.randrange(-Consts.GARBAGE_HEIGHT, Consts.HEIGHT)
+        mino = Mino(rng.randrange(len(Mino)))
+        field.fill(x, y, mino)
+        bitboard.fill(x, y, mino)
+        return field, f'fill({x}, {y}, {mino})'
+    if operation in ('shift_up', 'shift_down'):
+        amount = rng.randrange(1, 4)
+        getattr(field, operation)(amount)
+        getattr(bitboard, operation)(amount)
+        return field, f'{operation}({amount})'
+    if operation in ('shift_left', 'shift_right'):
+        amount = rng.randrange(1, Consts.WIDTH)
+        warp = rng.random() < 0.5
+        getattr(field, operation)(amount, warp)
+        getattr(bitboard, operation)(amount, warp)
+        return field, f'{operation}({amount}, warp={warp})'
+    if operation == 'mirror':
+        field.mirror()
+        bitboard.mirror()
+        return field, 'mirror()'
+    bitboard.clear()
+    return Field(), 'clear()'
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_operations_stay_in_sync(seed):
+    rng = random.Random(seed)
+    field = Field()
+    bitboard = FieldBitboard(field)
+    steps = []
+    for i in range(300):
+        field, step = random_step(rng, field, bitboard)
+        steps.append(step)
+        assert bitboard.matches(field), steps
+
+def garbage_field():
+    """Return a field with distinct minos on the garbage line(s) and the
+    lines above them.
+    """
+    field = Field()
+    for y in range(-Consts.GARBAGE_HEIGHT, 3):
+        for x in range(Consts.WIDTH):
+            if (x + y) % 3:
+                field.fill(x, y, Mino.Z if y < 0 else Mino.T)
+    return field
+
+@pytest.mark.parametrize('operation, args', [
+    ('shift_up', (1,)),
+    ('shift_up', (3,)),
+    ('shift_down', (1,)),
+    ('shift_down', (3,)),
+    ('mirror', ()),
+])
+def test_garbage_lines_are_kept(operation, args):
+    # Field leaves the garbage line(s) alone when shifting vertically or
+    # mirroring, so the bitboard must too.
+    field = garbage_field()
+    bitboard = FieldBitboard(field)
+    garbage = [field[y][:] for y in range(-Consts.GARBAGE_HEIGHT, 0)]
+    getattr(field, operation)(*args)
+    getattr(bitboard, operation)(*args)
+    assert bitboard.matches(field)
+    assert [field[y] for y in range(-Consts.GARBAGE_HEIGHT, 0)] == garbage
+
+@pytest.mark.parametrize('operation', ['shift_left', 'shift_right'])
+@pytest.mark.parametrize('warp', [False, True])
+def test_garbage_lines_shift_sideways(operation, warp):
+    # Field shifts the garbage line(s) sideways along with the field.
+    field = garbage_field()
+    bitboard = FieldBitboard(field)
+    getattr(field, operation)(2, warp)
+    getattr(bitboard, operation)(2, warp)
+    assert bitboard.matches(field)
+    for y in range(-Consts.GARBAGE_HEIGHT, 0):
+        assert bitboard.row(y) == FieldBitboard.row_of(field[y])
+
+def test_shift_up_drops_the_top_line():
+    field = Field()
+    for x in range(Consts.WIDTH):
+        field.fill(x, Consts.HEIGHT-1, Mino.I)
+    bitboard = FieldBitboard(field)
+    field.shift_up()
+    bitboard.shift_up()
+    assert bitboard.matches(field)
+    assert bitboard.is_empty(Consts.HEIGHT-1)
+
+def random_field(rng, density):
+    """Return a field filled with the density at the bottom, decreasing to
+    0 at the top.
+    """
+    field = Field()
+    for y in range(-Consts.GARBAGE_HEIGHT, Consts.HEIGHT):
+        for x in range(Consts.WIDTH):
+            if rng.random() < density * (1 - y/Consts.HEIGHT):
+                field.fill(x, y, Mino(rng.randrange(1, len(Mino))))
+    return field
+
+def sweep():
+    """Yield every operation, including those partly outside the field."""
+    for mino in Mino:
+        for rotation in Rotation:
+            for x in range(-3, Consts.WIDTH+3):
+                for y in range(-4, Consts.HEIGHT+4):
+                    yield Operation(mino, rotation, x, y)
+
+def dropped(drop, operation):
+    try:
+        return drop(operation)
+    except ValueError:
+        return None
+
+@pytest.mark.parametrize('density', [0, 0.2, 0.4, 0.6, 0.8, 1])
+def test_placement_checks_match_field(density):
+    field = random_field(random.Random(density), density)
+    bitboard = FieldBitboard(field)
+    for operation in sweep():
+        assert shape_cells(operation) == [tuple(cell) for cell
+                                          in operation.shape()], operation
+        assert (bitboard.is_placeable(operation)
+                == field.is_placeable(operation)), operation
+        assert (dropped(bitboard.drop, operation)
+                == dropped(lambda op: field.drop(op, False), operation)
+                ), operation
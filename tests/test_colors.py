@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from Better_Than_Fumen.colors import to_hex, to_rgb
+
+@pytest.mark.parametrize('color, rgb', [
+    ('#00C8c8', (0, 200, 200)),
+    ('purple', (160, 32, 240)),
+    # The shades of purple are not scaled versions of purple.
+    ('purple1', (155, 48, 255)),
+    ('purple4', (85, 26, 139)),
+    ('cyan3', (0, 205, 205)),
+    ('Orange4', (139, 90, 0)),
+    ('gray', (190, 190, 190)),
+    ('grey0', (0, 0, 0)),
+    # The gray levels are not all level*255/100 rounded.
+    ('gray30', (77, 77, 77)),
+    ('gray50', (127, 127, 127)),
+    ('grey90', (229, 229, 229)),
+    ('gray100', (255, 255, 255)),
+])
+def test_x11_colors(color, rgb):
+    assert to_rgb(color) == rgb
+
+@pytest.mark.parametrize('color', [
+    'white1', 'black3', 'cyan5', 'gray101', 'navy', '#fff', ''])
+def test_unsupported_colors(color):
+    with pytest.raises(ValueError):
+        to_rgb(color)
+
+def test_to_hex():
+    assert to_hex('purple2') == '#912cee'
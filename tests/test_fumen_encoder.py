@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+from py_fumen_py import encode, Field, Flags, Mino, Operation, Page, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+from py_fumen_py.quiz import Quiz
+
+from Better_Than_Fumen.fumen_encoder import (
+    encode_records, iter_encode_records
+)
+from Better_Than_Fumen.page_store import pack_field, pack_flags, PageStore
+
+_QUIZ_MINOS = 'IOLZTJS'
+
+def random_quiz(rng):
+    minos = ''.join(rng.choice(_QUIZ_MINOS) for i in range(7))
+    return f'#Q=[{minos[0]}]({minos[1]}){minos[2:]}'
+
+def random_comment(rng, previous):
+    """Return a random comment: none, a repeat of the previous page's, the
+    quiz of the previous page stepped by its operation, plain text (with
+    characters escaped by fumen), or a quiz.
+    """
+    choice = rng.randrange(6)
+    if choice == 0:
+        return None
+    if choice == 1 and previous is not None:
+        return previous.comment
+    if choice == 2 and previous is not None and previous.comment:
+        quiz = Quiz(previous.comment)
+        if previous.operation is not None and previous.flags.lock:
+            quiz.step(previous.operation.mino)
+        return str(quiz)
+    if choice == 3:
+        return ''.join(rng.choice('ab #%?éあ')
+                       for i in range(rng.randrange(1, 40)))
+    if choice == 4:
+        return random_quiz(rng)
+    return None
+
+def random_operation(rng, field):
+    """Return a random operation placeable on field, dropped, or None."""
+    if rng.random() < 0.4:
+        return None
+    for i in range(20):
+        operation = Operation(rng.choice(list(Mino)[1:8]),
+                              rng.choice(list(Rotation)),
+                              rng.randrange(Consts.WIDTH),
+                              Consts.HEIGHT - 3)
+        if field.is_placeable(operation):
+            return field.drop(operation, False)
+    return None
+
+def random_page(rng, previous):
+    """Return a random Page following previous (None for the first page).
+    The field often repeats the previous one, so that runs of repeated
+    fields are encoded.
+    """
+    if previous is not None and rng.random() < 0.5:
+        field = previous.field.copy()
+    else:
+        field = Field()
+        for i in range(rng.randrange(12)):
+            field.fill(rng.randrange(Consts.WIDTH),
+                       rng.randrange(-Consts.GARBAGE_HEIGHT, 6),
+                       Mino(rng.randrange(1, len(Mino))))
+    # The rise flag is left out: Field.rise() of py_fumen_py raises
+    # NameError, so encode() fails on it.
+    flags = Flags(lock=rng.random() < 0.7, mirror=rng.random() < 0.1,
+                  colorize=rng.random() < 0.9, quiz=rng.random() < 0.2)
+    return Page(field=field, operation=random_operation(rng, field),
+                comment=random_comment(rng, previous), flags=flags)
+
+def random_pages(rng, count):
+    pages = []
+    for i in range(count):
+        pages.append(random_page(rng, pages[-1] if pages else None))
+    return pages
+
+def random_edit(rng, store, pages):
+    """Apply the same random insertion, deletion or update to a PageStore
+    and a list of Pages.
+    """
+    index = rng.randrange(len(pages))
+    choice = rng.randrange(4)
+    if choice == 0:
+        page = random_page(rng, pages[index-1] if index else None)
+        store.insert(index, page)
+        pages.insert(index, page)
+    elif choice == 1 and len(pages) > 1:
+        del store[index]
+        del pages[index]
+    elif choice == 2:
+        page = random_page(rng, pages[index-1] if index else None)
+        store[index] = page
+        pages[index] = page
+    else:
+        page = random_page(rng, pages[index-1] if index else None)
+        store.update(index, cells=pack_field(page.field),
+                     operation=page.operation, flags=pack_flags(page.flags),
+                     comment=page.comment)
+        pages[index] = page
+
+@pytest.mark.parametrize('seed', range(30))
+def test_encode_records_matches_encode(seed):
+    rng = random.Random(seed)
+    pages = random_pages(rng, rng.choice([1, 2, 10, 80]))
+    store = PageStore(pages)
+    assert encode_records(store.records()) == encode(pages)
+    for i in range(20):
+        random_edit(rng, store, pages)
+        # The segments cached by the previous encoding are reused.
+        assert encode_records(store.records()) == encode(pages)
+
+def test_long_repeated_field_runs():
+    # The repeat count of a field is capped, and then starts again.
+    rng = random.Random(0)
+    field = Field()
+    field.fill(0, 0, Mino.I)
+    pages = [Page(field=field.copy(), flags=Flags(lock=False))
+             for i in range(200)]
+    pages[100].comment = 'x'
+    store = PageStore(pages)
+    assert encode_records(store.records()) == encode(pages)
+    store.update(150, comment='y')
+    pages[150].comment = 'y'
+    assert encode_records(store.records()) == encode(pages)
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 47, 100, 1 << 16])
+@pytest.mark.parametrize('seed', range(5))
+def test_iter_encode_records_chunks(seed, chunk_size):
+    rng = random.Random(seed)
+    pages = random_pages(rng, rng.choice([1, 30, 150]))
+    chunks = list(iter_encode_records(PageStore(pages).records(),
+                                      chunk_size))
+    assert ''.join(chunks) == encode(pages)
+    if len(pages) > 1 and chunk_size <= 7:
+        assert len(chunks) > 1
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+from py_fumen_py import Field, Mino, Operation, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.bitboard import FieldBitboard
+from Better_Than_Fumen.fumen_canvas._ghost_cache import _GhostCache
+
+def as_tuple(operation):
+    return (operation.mino, operation.rotation, operation.x, operation.y)
+
+def random_operation(rng, field):
+    """Return a random operation placeable on field, or None."""
+    for i in range(50):
+        operation = Operation(rng.choice(list(Mino)[1:8]),
+                              rng.choice(list(Rotation)),
+                              rng.randrange(Consts.WIDTH),
+                              rng.randrange(8, Consts.HEIGHT-2))
+        if field.is_placeable(operation):
+            return operation
+    return None
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_fills_keep_the_ghost_in_sync(seed):
+    rng = random.Random(seed)
+    field = Field()
+    bitboard = FieldBitboard(field)
+    cache = _GhostCache(bitboard)
+    operation = random_operation(rng, field)
+    steps = []
+    for i in range(400):
+        if operation is None or rng.random() < 0.1:
+            operation = random_operation(rng, field)
+        # Fill mostly low, where the ghosts land, including the garbage
+        # line(s), which never affect a drop.
+        x = rng.randrange(Consts.WIDTH)
+        y = rng.randrange(-Consts.GARBAGE_HEIGHT, rng.choice([4, 10]))
+        mino = Mino._ if rng.random() < 0.4 else Mino.X
+        field.fill(x, y, mino)
+        bitboard.fill(x, y, mino)
+        cache.on_fill(x, y)
+        steps.append((x, y, mino))
+        assert cache._heights == [cache._column_height(x)
+                                  for x in range(Consts.WIDTH)], steps
+        if operation is not None and field.is_placeable(operation):
+            for repeat in range(2):
+                assert (as_tuple(cache.drop(operation))
+                        == as_tuple(field.drop(operation, False))), steps
+    assert cache.hits > 0
+
+def test_fill_under_the_ghost_invalidates_it():
+    field = Field()
+    bitboard = FieldBitboard(field)
+    cache = _GhostCache(bitboard)
+    operation = Operation(Mino.T, Rotation.SPAWN, 4, 15)
+    assert cache.drop(operation).y == 0
+    # A mino right under the ghost raises it.
+    field.fill(4, 0, Mino.X)
+    bitboard.fill(4, 0, Mino.X)
+    cache.on_fill(4, 0)
+    assert cache.drop(operation).y == 1
+    # A mino in another column does not.
+    misses = cache.misses
+    field.fill(0, 3, Mino.X)
+    bitboard.fill(0, 3, Mino.X)
+    cache.on_fill(0, 3)
+    assert cache.drop(operation).y == 1
+    assert cache.misses == misses
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+import tkinter
+from py_fumen_py import Field, Flags, Mino, Page
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.fumen_canvas.fumen_canvas_frame import (
+    FumenCanvasFrame
+)
+from Better_Than_Fumen.history import (
+    diff_cells, CellsEdit, History, PagesEdit, _ENTRY_OVERHEAD
+)
+from Better_Than_Fumen.page_store import PageRecord, PageStore, pack_field
+
+class _Event:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+def random_cells(rng):
+    field = Field()
+    for y in range(-Consts.GARBAGE_HEIGHT, rng.randrange(1, 8)):
+        for x in range(Consts.WIDTH):
+            field.fill(x, y, Mino(rng.randrange(len(Mino))))
+    return pack_field(field)
+
+def apply_diff(cells, changes, undo):
+    """Apply changes made by diff_cells() to cells, as bytes."""
+    cells = bytearray(cells)
+    for i in range(0, len(changes), 3):
+        index, old, new = changes[i:i+3]
+        assert cells[index] == (new if undo else old)
+        cells[index] = old if undo else new
+    return bytes(cells)
+
+@pytest.mark.parametrize('seed', range(10))
+def test_diff_cells_round_trips(seed):
+    rng = random.Random(seed)
+    old, new = random_cells(rng), random_cells(rng)
+    changes = diff_cells(old, new)
+    assert len(changes) == 3 * sum(a != b for a, b in zip(old, new))
+    assert apply_diff(old, changes, undo=False) == new
+    assert apply_diff(new, changes, undo=True) == old
+    assert diff_cells(old, old) == b''
+
+def cells_edit(page, length):
+    return CellsEdit(page, bytes(3 * length), None, None)
+
+def test_budget_drops_the_oldest_edits():
+    history = History(budget=3*_ENTRY_OVERHEAD + 30)
+    for page in range(5):
+        history.push(cells_edit(page, 3))
+    assert len(history) == 3
+    assert history.size() == 3 * (_ENTRY_OVERHEAD + 9)
+    assert [history.undo().page for i in range(3)] == [4, 3, 2]
+    assert history.undo() is None
+    # Undone edits still count until they are dropped by a new edit.
+    assert history.size() == 3 * (_ENTRY_OVERHEAD + 9)
+    history.push(cells_edit(5, 0))
+    assert history.size() == _ENTRY_OVERHEAD
+    assert history.redo() is None
+
+def test_budget_keeps_the_last_edit():
+    history = History(budget=10)
+    history.push(cells_edit(0, 3))
+    history.push(cells_edit(1, 3))
+    assert len(history) == 1
+    assert history.size() == _ENTRY_OVERHEAD + 9
+    assert history.undo().page == 1
+
+def test_undo_and_redo_move_between_the_stacks():
+    history = History(budget=10**6)
+    edits = [cells_edit(page, 1) for page in range(3)]
+    for edit in edits:
+        history.push(edit)
+    assert history.undo() is edits[2]
+    assert history.undo() is edits[1]
+    assert history.redo() is edits[1]
+    assert len(history) == 2
+    history.clear()
+    assert history.size() == 0
+    assert history.undo() is None and history.redo() is None
+
+@pytest.fixture
+def frame():
+    tkinter.reset()
+    frame = FumenCanvasFrame(tkinter.Tk())
+    frame._pages = PageStore(
+        Page(field=Field(), flags=Flags()) for i in range(3))
+    frame._to_page(0)
+    frame._mode.mino = Mino.S
+    frame._mode.direct_place = False
+    tkinter.update()
+    yield frame
+    frame.close()
+
+def cell_event(frame, x, y):
+    """Return an event at the center of the field cell (x, y)."""
+    size = frame._field_frame._mino_size
+    return _Event(x=x*size + size//2,
+                  y=(Consts.TOTAL_HEIGHT-2-y)*size + size//2)
+
+def page_cells(frame):
+    frame._save_current_page()
+    return [record.cells for record in frame._pages.records()]
+
+def stroke(frame, cells, release=True):
+    field_frame = frame._field_frame
+    field_frame._on_draw(cell_event(frame, *cells[0]))
+    for cell in cells[1:]:
+        field_frame._on_draw_motion(cell_event(frame, *cell))
+    if release:
+        field_frame._on_draw_reset(None)
+
+def test_a_stroke_is_one_step(frame):
+    before = page_cells(frame)
+    stroke(frame, [(x, 0) for x in range(Consts.WIDTH)])
+    after = page_cells(frame)
+    assert after[0] != before[0]
+    assert len(frame._history) == 1
+    frame._undo()
+    assert page_cells(frame) == before
+    frame._redo()
+    assert page_cells(frame) == after
+
+def test_a_stroke_across_a_page_switch(frame):
+    empty = page_cells(frame)
+    stroke(frame, [(x, 0) for x in range(4)], release=False)
+    frame._next_page()
+    drawn = page_cells(frame)
+    assert drawn[0] != empty[0] and drawn[1] == empty[1]
+    stroke(frame, [(x, 1) for x in range(4, 8)])
+    assert frame._current_page == 1
+    assert len(frame._history) == 2
+    frame._undo()
+    assert page_cells(frame) == drawn
+    frame._undo()
+    assert frame._current_page == 0
+    assert page_cells(frame) == empty
+
+def test_page_edits_undo_and_redo(frame):
+    stroke(frame, [(0, 0), (1, 0)])
+    pages = page_cells(frame)
+    frame._insert_page()
+    frame._copy_page()
+    assert len(frame._pages) == 5
+    frame._next_page()
+    frame._delete_page()
+    assert len(frame._pages) == 4
+    edited = page_cells(frame)
+    frame._undo()
+    assert len(frame._pages) == 5
+    for i in range(2):
+        frame._undo()
+    assert page_cells(frame) == pages
+    for i in range(3):
+        frame._redo()
+    assert page_cells(frame) == edited
+    assert frame._redo() is None and page_cells(frame) == edited
+
+def test_pages_edit_undoes_all_its_pages(frame):
+    pages = page_cells(frame)
+    records = [PageRecord(cells=random_cells(random.Random(i)))
+               for i in range(4)]
+    for i, record in enumerate(records):
+        frame._pages.insert_record(2+i, record)
+    frame._history.push(PagesEdit(2, records))
+    frame._to_page(2)
+    added = page_cells(frame)
+    frame._undo()
+    assert page_cells(frame) == pages
+    assert frame._current_page == 1
+    frame._redo()
+    assert page_cells(frame) == added
+    assert frame._current_page == 2
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from threading import Thread
+
+import pytest
+
+from Better_Than_Fumen.fumen_canvas._field_canvas_frame import (
+    _FieldCanvasFrame
+)
+
+def line_cells(start, end):
+    """Return _line_cells(start, end), failing instead of hanging if it
+    never reaches the end.
+    """
+    result = []
+    thread = Thread(target=lambda: result.append(
+        _FieldCanvasFrame._line_cells(start, end)), daemon=True)
+    thread.start()
+    thread.join(1)
+    assert result, f'_line_cells({start}, {end}) did not end'
+    return result[0]
+
+def check_line(start, end):
+    cells = line_cells(start, end)
+    assert cells[0] == start
+    assert cells[-1] == end
+    # One cell per step of the longer axis, each a neighbour of the last.
+    assert len(cells) == max(abs(end[0]-start[0]),
+                             abs(end[1]-start[1])) + 1
+    for (x0, y0), (x1, y1) in zip(cells, cells[1:]):
+        assert max(abs(x1-x0), abs(y1-y0)) == 1
+
+@pytest.mark.parametrize('direction', [
+    (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+@pytest.mark.parametrize('length', [1, 2, 5, 13])
+def test_eight_directions(direction, length):
+    start = (4, 10)
+    check_line(start, (start[0] + direction[0]*length,
+                       start[1] + direction[1]*length))
+
+@pytest.mark.parametrize('direction', [
+    (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+def test_slopes_between_directions(direction):
+    # Every segment of the octant next to the direction.
+    start = (4, 10)
+    for major in range(1, 13):
+        for minor in range(major+1):
+            if direction[0] and direction[1]:
+                end = (start[0] + direction[0]*major,
+                       start[1] + direction[1]*minor)
+            else:
+                end = (start[0] + direction[0]*major + direction[1]*minor,
+                       start[1] + direction[1]*major + direction[0]*minor)
+            check_line(start, end)
+
+def test_repeated_point():
+    assert line_cells((3, 7), (3, 7)) == [(3, 7)]
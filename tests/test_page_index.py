@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+from py_fumen_py import Field, Flags, Mino, Page
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen import page_index
+from Better_Than_Fumen.page_index import occupancy_rows, parse_pattern
+from Better_Than_Fumen.page_store import PageStore
+
+def random_field(rng):
+    field = Field()
+    for y in range(rng.randrange(1, 6)):
+        hole = rng.randrange(Consts.WIDTH)
+        for x in range(Consts.WIDTH):
+            if x != hole and rng.random() < 0.8:
+                field.fill(x, y, Mino(rng.randrange(1, len(Mino))))
+    return field
+
+def scan(store, pattern):
+    """Return the page indices containing the pattern, by a linear scan."""
+    length = len(pattern)
+    return [i for i, record in enumerate(store.records())
+            if any(rows[j:j+length] == pattern
+                   for rows in [occupancy_rows(record.cells)]
+                   for j in range(len(rows) - length + 1))]
+
+def patterns(rng, store, count):
+    records = store.records()
+    while count:
+        rows = occupancy_rows(rng.choice(records).cells)
+        top = rng.randrange(Consts.TOTAL_HEIGHT - 3)
+        pattern = rows[top:top+rng.randrange(1, 4)]
+        if any(pattern):
+            count -= 1
+            yield pattern
+
+@pytest.mark.parametrize('modulus', [page_index._MODULUS, 1, 7])
+def test_containing_matches_a_scan(monkeypatch, modulus):
+    # With a tiny modulus, most windows have the hash of the pattern, so
+    # only the rows tell the matches apart.
+    monkeypatch.setattr(page_index, '_MODULUS', modulus)
+    monkeypatch.setattr(page_index, '_POWERS', [
+        pow(page_index._BASE, k, modulus)
+        for k in range(Consts.TOTAL_HEIGHT+1)
+    ])
+    rng = random.Random(0)
+    store = PageStore(Page(field=random_field(rng), flags=Flags())
+                      for i in range(300))
+    index = store.index()
+    for pattern in patterns(rng, store, 30):
+        expected = scan(store, pattern)
+        # The patterns are taken from the pages, so each has a match.
+        assert 0 < len(expected)
+        assert store.positions(index.containing(pattern)) == expected
+
+def test_parse_pattern():
+    assert parse_pattern('XX____XXXX/XXX___XXXX\n') == (0b1100001111,
+                                                        0b1110001111)
+    with pytest.raises(ValueError):
+        parse_pattern('XX')
+    with pytest.raises(ValueError):
+        parse_pattern('__________')
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import random
+import threading
+import time
+
+import pytest
+from py_fumen_py import Field, Mino, Operation, Rotation
+from py_fumen_py.constant import FieldConstants as Consts
+
+from Better_Than_Fumen.solver import parse_queue, solve
+
+# A search of 6 empty lines with 15 minos, which takes far longer than
+# the tests below wait for.
+LONG_QUEUE = 'TILJSZOTILJSZOT'
+
+def solutions(field, queue, height, use_hold, limit=1):
+    """Return the solutions found by a search in the calling process."""
+    found = []
+    for searched, branches, new in solve(field, parse_queue(queue), height,
+                                         use_hold, limit, workers=1):
+        found += new
+    return found
+
+def filled_field(height, empty):
+    """Return a field whose lines 0 to height-1 are filled, except the
+    minos at the coords in empty.
+    """
+    field = Field()
+    for y in range(height):
+        for x in range(Consts.WIDTH):
+            if (x, y) not in empty:
+                field.fill(x, y, Mino.X)
+    return field
+
+def test_held_mino_is_placed_last():
+    # J must be placed first: I on top of it would block its drop. With the
+    # queue IJ, I is held, J placed, then I placed from hold.
+    field = filled_field(2, {(0, 0), (1, 0), (2, 0),
+                             (0, 1), (1, 1), (2, 1), (3, 1), (4, 1)})
+    assert solutions(field, 'JI', 2, use_hold=False)
+    assert not solutions(field, 'IJ', 2, use_hold=False)
+    found = solutions(field, 'IJ', 2, use_hold=True)
+    assert [[operation.mino for operation in solution]
+            for solution in found] == [[Mino.J, Mino.I]]
+
+def two_mino_cases(count):
+    """Yield random (field, first mino, second mino) of two lines that are
+    perfectly cleared by dropping the first mino, then the second one.
+    """
+    rng = random.Random(0)
+    minos = [mino for mino in Mino if mino.is_colored()]
+    while count:
+        first, second = rng.choice(minos), rng.choice(minos)
+        field = Field()
+        empty = set()
+        for mino in (first, second):
+            operation = Operation(mino, rng.choice(list(Rotation)),
+                                  rng.randrange(Consts.WIDTH), 3)
+            if not field.is_placeable(operation):
+                break
+            operation = field.drop(operation)
+            empty |= {tuple(cell) for cell in operation.shape()}
+        else:
+            if all(y < 2 for x, y in empty):
+                field = filled_field(2, empty)
+                if solutions(field, first.name + second.name, 2, False):
+                    count -= 1
+                    yield field, first, second
+
+@pytest.mark.parametrize('field, first, second', list(two_mino_cases(40)))
+def test_hold_allows_either_order(field, first, second):
+    assert solutions(field, second.name + first.name, 2, use_hold=True)
+
+def test_cancel_stops_the_search_in_process():
+    cancelled = threading.Event()
+    timer = threading.Timer(0.2, cancelled.set)
+    timer.start()
+    start = time.perf_counter()
+    for progress in solve(Field(), parse_queue(LONG_QUEUE), 6, True,
+                          limit=10**6, workers=1, cancelled=cancelled):
+        pass
+    timer.cancel()
+    assert time.perf_counter() - start < 10
+
+def test_cancel_stops_the_worker_processes():
+    cancelled = multiprocessing.get_context('spawn').Event()
+    search = solve(Field(), parse_queue(LONG_QUEUE), 6, True, limit=10**6,
+                   workers=2, cancelled=cancelled)
+    searched, branches, found = next(search)
+    # Let the workers start on their first branches before cancelling.
+    timer = threading.Timer(2, cancelled.set)
+    timer.start()
+    start = time.perf_counter()
+    for searched, branches, found in search:
+        pass
+    timer.cancel()
+    assert time.perf_counter() - start < 30
+    # The workers exit instead of searching on.
+    deadline = time.perf_counter() + 10
+    while multiprocessing.active_children():
+        assert time.perf_counter() < deadline
+        time.sleep(0.05)